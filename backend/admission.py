@@ -0,0 +1,191 @@
+"""
+Admission control for LLM-backed requests with priority classes and backpressure.
+"""
+
+import heapq
+import itertools
+import math
+import threading
+import time
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Dict, Iterator, List, Set, Tuple
+
+
+class Priority(IntEnum):
+    """Request classes, most important first."""
+    TURN = 0            # Answer within a round
+    TRANSITION = 1      # Answer that completes a round
+    NEW_INTERVIEW = 2   # Start of a new interview
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted; carries a Retry-After hint."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Bounds the number of in-flight LLM-backed requests.
+
+    Requests wait in a priority queue when all slots are busy: mid-round turns
+    are admitted before round transitions, which are admitted before new
+    interviews. New interviews may only occupy part of the slots, so candidates
+    already in an interview keep capacity when the provider slows down. When the
+    queue is full, the newest lower-priority waiter is evicted to make room; if
+    there is none, or a request waits longer than max_wait, it is rejected
+    immediately so the caller can answer 429 instead of timing out.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 16,
+        max_queue: int = 64,
+        max_wait: float = 5.0,
+        new_interview_share: float = 0.5
+    ):
+        """
+        Args:
+            max_in_flight: Maximum concurrent LLM-backed requests
+            max_queue: Maximum requests waiting for a slot
+            max_wait: Seconds a queued request waits before it is rejected
+            new_interview_share: Fraction of slots new interviews may occupy
+        """
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.new_interview_limit = max(1, int(max_in_flight * new_interview_share))
+
+        self._condition = threading.Condition()
+        self._waiters: List[Tuple[int, int]] = []
+        self._evicted: Set[Tuple[int, int]] = set()
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._in_flight_by_class: Dict[Priority, int] = {priority: 0 for priority in Priority}
+        self._queued_by_class: Dict[Priority, int] = {priority: 0 for priority in Priority}
+        self._admitted: Dict[Priority, int] = {priority: 0 for priority in Priority}
+        self._rejected: Dict[Priority, int] = {priority: 0 for priority in Priority}
+        # Exponentially weighted average time a request holds a slot
+        self._service_time = 1.0
+
+    def _has_capacity(self, priority: Priority) -> bool:
+        if self._in_flight >= self.max_in_flight:
+            return False
+        if priority == Priority.NEW_INTERVIEW:
+            return self._in_flight_by_class[priority] < self.new_interview_limit
+        return True
+
+    def _retry_after(self) -> int:
+        """Estimate seconds until a slot frees up for a new request."""
+        backlog = len(self._waiters) + 1
+        return max(1, math.ceil(self._service_time * backlog / self.max_in_flight))
+
+    def _reject(self, priority: Priority, reason: str):
+        self._rejected[priority] += 1
+        raise AdmissionRejected(reason, self._retry_after())
+
+    def _acquire(self, priority: Priority):
+        with self._condition:
+            if not self._waiters and self._has_capacity(priority):
+                self._take_slot(priority)
+                return
+
+            if len(self._waiters) >= self.max_queue and not self._evict_lower(priority):
+                self._reject(priority, "Server is busy, please retry shortly")
+
+            entry = (int(priority), next(self._sequence))
+            heapq.heappush(self._waiters, entry)
+            self._queued_by_class[priority] += 1
+            deadline = time.monotonic() + self.max_wait
+
+            try:
+                while True:
+                    if entry in self._evicted:
+                        self._evicted.discard(entry)
+                        self._reject(priority, "Server is busy, please retry shortly")
+                    # Only the highest-priority waiter that fits may take a slot;
+                    # a capped new interview must not block turns queued behind it.
+                    if self._first_admissible() == entry:
+                        self._take_slot(priority)
+                        return
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._reject(priority, "Server is busy, please retry shortly")
+                    self._condition.wait(remaining)
+            finally:
+                if entry in self._waiters:
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+                self._queued_by_class[priority] -= 1
+                self._condition.notify_all()
+
+    def _evict_lower(self, priority: Priority) -> bool:
+        """Make room in a full queue by evicting the newest lower-priority waiter."""
+        if not self._waiters:
+            # max_queue is 0: there is nobody to make room from
+            return False
+        lowest = max(self._waiters)
+        if lowest[0] <= priority:
+            return False
+
+        self._waiters.remove(lowest)
+        heapq.heapify(self._waiters)
+        self._evicted.add(lowest)
+        self._condition.notify_all()
+        return True
+
+    def _first_admissible(self):
+        for entry in sorted(self._waiters):
+            if self._has_capacity(Priority(entry[0])):
+                return entry
+        return None
+
+    def _take_slot(self, priority: Priority):
+        self._in_flight += 1
+        self._in_flight_by_class[priority] += 1
+        self._admitted[priority] += 1
+
+    def _release(self, priority: Priority, elapsed: float):
+        with self._condition:
+            self._in_flight -= 1
+            self._in_flight_by_class[priority] -= 1
+            self._service_time = 0.8 * self._service_time + 0.2 * elapsed
+            self._condition.notify_all()
+
+    @contextmanager
+    def admit(self, priority: Priority) -> Iterator[None]:
+        """
+        Hold an in-flight slot for the duration of an LLM-backed request.
+
+        Raises:
+            AdmissionRejected: If the queue is full or the wait exceeds max_wait
+        """
+        self._acquire(priority)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release(priority, time.monotonic() - started)
+
+    def stats(self) -> Dict:
+        """Get in-flight counts, queue depth and admission counters per class."""
+        with self._condition:
+            return {
+                "max_in_flight": self.max_in_flight,
+                "in_flight": self._in_flight,
+                "queue_depth": len(self._waiters),
+                "avg_service_seconds": round(self._service_time, 3),
+                "classes": {
+                    priority.name.lower(): {
+                        "in_flight": self._in_flight_by_class[priority],
+                        "queued": self._queued_by_class[priority],
+                        "admitted": self._admitted[priority],
+                        "rejected": self._rejected[priority]
+                    }
+                    for priority in Priority
+                }
+            }
@@ -0,0 +1,292 @@
+"""
+Incrementally maintained cohort analytics and leaderboards per job role.
+"""
+
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from sortedcontainers import SortedList
+
+from models import InterviewSession
+
+# Width of each score histogram bucket (scores are 0-100)
+HISTOGRAM_BUCKET_WIDTH = 10
+HISTOGRAM_BUCKETS = 100 // HISTOGRAM_BUCKET_WIDTH
+
+
+def _empty_histogram() -> List[int]:
+    return [0] * HISTOGRAM_BUCKETS
+
+
+def _histogram_bucket(score: float) -> int:
+    """Map a 0-100 score to its histogram bucket (100 falls in the last bucket)."""
+    return min(max(int(score // HISTOGRAM_BUCKET_WIDTH), 0), HISTOGRAM_BUCKETS - 1)
+
+
+def _histogram_labels() -> List[str]:
+    return [
+        f"{low}-{low + HISTOGRAM_BUCKET_WIDTH}"
+        for low in range(0, 100, HISTOGRAM_BUCKET_WIDTH)
+    ]
+
+
+def _finished_rounds(session: InterviewSession):
+    """The rounds of a session that were passed or failed."""
+    return [
+        (round_number, round_data) for round_number, round_data in session.rounds.items()
+        if round_data.status in ("completed", "failed")
+    ]
+
+
+class RoundAggregate:
+    """Running totals for one round of one job role."""
+
+    def __init__(self):
+        self.attempted = 0
+        self.passed = 0
+        self.score_sum = 0.0
+        self.histogram = _empty_histogram()
+
+    def record(self, round_score: float, passed: bool):
+        self.attempted += 1
+        self.passed += int(passed)
+        self.score_sum += round_score
+        self.histogram[_histogram_bucket(round_score)] += 1
+
+    def remove(self, round_score: float, passed: bool):
+        self.attempted -= 1
+        self.passed -= int(passed)
+        self.score_sum -= round_score
+        self.histogram[_histogram_bucket(round_score)] -= 1
+
+    def to_dict(self) -> Dict:
+        return {
+            "attempted": self.attempted,
+            "passed": self.passed,
+            "pass_rate": round(self.passed / self.attempted * 100, 2) if self.attempted else 0.0,
+            "average_score": round(self.score_sum / self.attempted, 2) if self.attempted else 0.0,
+            "score_histogram": self.histogram
+        }
+
+
+class RoleAggregate:
+    """Running totals and leaderboard for one job role."""
+
+    def __init__(self):
+        self.started = 0
+        self.completed = 0
+        self.terminated = 0
+        self.overall_score_sum = 0.0
+        self.rounds: Dict[int, RoundAggregate] = {}
+        self.batches: Counter = Counter()
+        self.recommendations: Counter = Counter()
+        self.histogram = _empty_histogram()
+        # Sorted by descending overall score, then by completion order
+        self.leaderboard = SortedList()
+        self.entries: Dict[str, Dict] = {}
+        # session_id -> its key in the leaderboard
+        self.leaderboard_keys: Dict[str, Tuple[float, int, str]] = {}
+        self._sequence = 0
+
+    def next_sequence(self) -> int:
+        self._sequence += 1
+        return self._sequence
+
+
+class CohortAnalytics:
+    """
+    Aggregates interview outcomes per job role as rounds and interviews complete.
+
+    Stats reads only touch the running aggregates, and leaderboard reads walk
+    the first k entries of a sorted index, so neither scans stored sessions.
+    """
+
+    def __init__(self):
+        self._roles: Dict[str, RoleAggregate] = {}
+        self._lock = threading.Lock()
+
+    def _role(self, job_role: str) -> RoleAggregate:
+        aggregate = self._roles.get(job_role)
+        if aggregate is None:
+            aggregate = self._roles[job_role] = RoleAggregate()
+        return aggregate
+
+    def record_start(self, job_role: str):
+        """Record that an interview was started for a job role."""
+        with self._lock:
+            self._role(job_role).started += 1
+
+    def record_round(self, job_role: str, round_number: int, round_score: float, passed: bool):
+        """
+        Record a completed (passed or failed) round.
+
+        Args:
+            job_role: The job role being interviewed for
+            round_number: Round that was completed
+            round_score: Final score for the round
+            passed: Whether the candidate passed the round
+        """
+        with self._lock:
+            aggregate = self._role(job_role)
+            round_aggregate = aggregate.rounds.get(round_number)
+            if round_aggregate is None:
+                round_aggregate = aggregate.rounds[round_number] = RoundAggregate()
+            round_aggregate.record(round_score, passed)
+
+    def record_terminated(self, job_role: str):
+        """Record an interview that ended with a failed round."""
+        with self._lock:
+            self._role(job_role).terminated += 1
+
+    def record_final(self, job_role: str, session_id: str, candidate_name: Optional[str],
+                     final_evaluation: Dict):
+        """
+        Record a completed interview and add it to the leaderboard.
+
+        Args:
+            job_role: The job role being interviewed for
+            session_id: Session that completed
+            candidate_name: Candidate name, if provided
+            final_evaluation: Result of InterviewEvaluator.calculate_final_evaluation
+        """
+        with self._lock:
+            self._add_final(self._role(job_role), session_id, candidate_name, final_evaluation)
+
+    @staticmethod
+    def _add_final(aggregate: RoleAggregate, session_id: str, candidate_name: Optional[str],
+                   final_evaluation: Dict):
+        if session_id in aggregate.entries:
+            return
+
+        overall_score = final_evaluation['overall_score']
+        aggregate.completed += 1
+        aggregate.overall_score_sum += overall_score
+        aggregate.batches[final_evaluation['batch']] += 1
+        aggregate.recommendations[final_evaluation['recommendation']] += 1
+        aggregate.histogram[_histogram_bucket(overall_score)] += 1
+
+        aggregate.entries[session_id] = {
+            "session_id": session_id,
+            "candidate_name": candidate_name,
+            "overall_score": overall_score,
+            "confidence_score": final_evaluation['confidence_score'],
+            "batch": final_evaluation['batch'],
+            "recommendation": final_evaluation['recommendation']
+        }
+        key = aggregate.leaderboard_keys[session_id] = (-overall_score, aggregate.next_sequence(), session_id)
+        aggregate.leaderboard.add(key)
+
+    @staticmethod
+    def _remove_final(aggregate: RoleAggregate, session_id: str):
+        entry = aggregate.entries.pop(session_id, None)
+        if entry is None:
+            return
+
+        overall_score = entry['overall_score']
+        aggregate.completed -= 1
+        aggregate.overall_score_sum -= overall_score
+        aggregate.batches[entry['batch']] -= 1
+        aggregate.recommendations[entry['recommendation']] -= 1
+        aggregate.histogram[_histogram_bucket(overall_score)] -= 1
+        aggregate.leaderboard.remove(aggregate.leaderboard_keys.pop(session_id))
+
+    def record_session(self, session: InterviewSession):
+        """
+        Record everything a session has done so far, as the record_* calls of its
+        turns did. Used for sessions taken over from another process or worker.
+        """
+        with self._lock:
+            aggregate = self._role(session.job_role)
+            if session.conversation_history:
+                # Interviews count as started once their greeting was sent
+                aggregate.started += 1
+            for round_number, round_data in _finished_rounds(session):
+                round_aggregate = aggregate.rounds.get(round_number)
+                if round_aggregate is None:
+                    round_aggregate = aggregate.rounds[round_number] = RoundAggregate()
+                round_aggregate.record(round_data.round_score, round_data.passed)
+            if session.status == "terminated":
+                aggregate.terminated += 1
+            elif session.status == "completed" and session.final_evaluation:
+                self._add_final(aggregate, session.session_id, session.candidate_name, session.final_evaluation)
+
+    def remove_session(self, session: InterviewSession):
+        """Take back what a session added, when it moves to another worker."""
+        with self._lock:
+            aggregate = self._roles.get(session.job_role)
+            if aggregate is None:
+                return
+            if session.conversation_history:
+                aggregate.started -= 1
+            for round_number, round_data in _finished_rounds(session):
+                if round_number in aggregate.rounds:
+                    aggregate.rounds[round_number].remove(round_data.round_score, round_data.passed)
+            if session.status == "terminated":
+                aggregate.terminated -= 1
+            self._remove_final(aggregate, session.session_id)
+
+    def job_roles(self) -> List[Dict]:
+        """List job roles with interview counts."""
+        with self._lock:
+            return [
+                {
+                    "job_role": job_role,
+                    "started": aggregate.started,
+                    "completed": aggregate.completed,
+                    "terminated": aggregate.terminated
+                }
+                for job_role, aggregate in sorted(self._roles.items())
+            ]
+
+    def role_stats(self, job_role: str) -> Optional[Dict]:
+        """
+        Get aggregate stats for a job role.
+
+        Returns:
+            Stats dict, or None if nothing has been recorded for the role
+        """
+        with self._lock:
+            aggregate = self._roles.get(job_role)
+            if aggregate is None:
+                return None
+
+            return {
+                "job_role": job_role,
+                "started": aggregate.started,
+                "completed": aggregate.completed,
+                "terminated": aggregate.terminated,
+                "average_overall_score": (
+                    round(aggregate.overall_score_sum / aggregate.completed, 2)
+                    if aggregate.completed else 0.0
+                ),
+                "rounds": {
+                    round_number: round_aggregate.to_dict()
+                    for round_number, round_aggregate in sorted(aggregate.rounds.items())
+                },
+                "batch_distribution": dict(aggregate.batches),
+                "recommendation_distribution": dict(aggregate.recommendations),
+                "histogram_buckets": _histogram_labels(),
+                "overall_score_histogram": list(aggregate.histogram)
+            }
+
+    def leaderboard(self, job_role: str, k: int = 10) -> List[Dict]:
+        """
+        Get the top-k completed interviews for a job role by overall score.
+
+        Args:
+            job_role: The job role to rank
+            k: Number of entries to return
+
+        Returns:
+            Ranked leaderboard entries
+        """
+        with self._lock:
+            aggregate = self._roles.get(job_role)
+            if aggregate is None:
+                return []
+
+            return [
+                {"rank": rank, **aggregate.entries[session_id]}
+                for rank, (_, _, session_id) in enumerate(aggregate.leaderboard.islice(0, k), 1)
+            ]
@@ -0,0 +1,185 @@
+"""
+Local pre-filter for answers that are not worth an LLM call.
+
+Empty, one-word, copied-question and gibberish answers are recognised with a
+few string checks, before admission control and before evaluate_answer and
+ask_next_question are called.
+Depending on the mode such an answer is either
+
+- "elaborate": answered with a templated request to elaborate; the question
+  stays open, and after max_elaborations requests the next junk answer is
+  scored instead, so a candidate can still move on, or
+- "score": scored locally (quality signals only, no AI feedback) with a
+  templated feedback; only the next question is generated by the LLM.
+
+"off" disables the filter. Every decision is counted, including the provider
+calls it saved.
+
+Configuration (environment variables):
+    ANSWER_PREFILTER                  off, elaborate or score (default: elaborate)
+    ANSWER_PREFILTER_MIN_WORDS        Answers with fewer words are too short (default: 2)
+    ANSWER_PREFILTER_MAX_ELABORATIONS Elaboration requests per question (default: 1)
+    ANSWER_PREFILTER_COPY_THRESHOLD   Share of answer words taken from the question
+                                      at which it counts as copied (default: 0.9)
+"""
+
+import re
+import threading
+import time
+from typing import Dict, Optional
+
+PREFILTER_MODES = ("off", "elaborate", "score")
+
+# Reasons, in the order they are checked
+REASONS = ("empty", "too_short", "copied_question", "gibberish")
+
+ELABORATION_MESSAGES = {
+    "empty": "It looks like your answer came through empty. Could you share your thoughts on the question?",
+    "too_short": (
+        "Could you elaborate a little? A few sentences about your reasoning, or an example "
+        "from your experience, would help me understand your answer."
+    ),
+    "copied_question": "It looks like you repeated the question. Could you answer it in your own words?",
+    "gibberish": "I couldn't make sense of that answer. Could you try again in a few sentences?"
+}
+
+SCORED_FEEDBACK = "This answer didn't address the question, so it can't be credited. Let's move on."
+
+# Copied answers shorter than this are left to the length check
+MIN_COPY_WORDS = 3
+
+# Answers of this many words are checked for a single repeated word
+MIN_REPETITION_WORDS = 4
+
+_WORD = re.compile(r"\w+")
+_REPEATED_CHAR = re.compile(r"(.)\1{3}")
+_CONSONANT_RUN = re.compile(r"[bcdfghjklmnpqrstvwxz]{6}")
+_KEYBOARD_ROWS = ("qwertyuiop", "asdfghjkl", "zxcvbnm")
+
+
+def _implausible_word(word: str) -> bool:
+    """Whether a lowercase ASCII word looks like keyboard mashing."""
+    if len(word) > 25 or _REPEATED_CHAR.search(word) or _CONSONANT_RUN.search(word):
+        return True
+    if len(word) > 3 and not any(vowel in word for vowel in "aeiouy"):
+        return True
+    return len(word) >= 4 and any(word in row for row in _KEYBOARD_ROWS)
+
+
+class PrefilterVerdict:
+    """Outcome for an answer the filter caught."""
+
+    def __init__(self, reason: str, action: str, message: str):
+        self.reason = reason
+        self.action = action  # "elaborate" or "score"
+        self.message = message
+
+
+class AnswerPrefilter:
+    """Classifies answers locally and counts what that saved."""
+
+    def __init__(self, mode: str = "elaborate", min_words: int = 2, max_elaborations: int = 1,
+                 copy_threshold: float = 0.9):
+        """
+        Args:
+            mode: "off", "elaborate" or "score"
+            min_words: Answers with fewer words are too short
+            max_elaborations: Elaboration requests per question before junk answers are scored
+            copy_threshold: Share of answer words found in the question at which it counts as copied
+        """
+        if mode not in PREFILTER_MODES:
+            raise ValueError(f"mode must be one of: {', '.join(PREFILTER_MODES)}")
+        self.mode = mode
+        self.min_words = min_words
+        self.max_elaborations = max_elaborations
+        self.copy_threshold = copy_threshold
+        self.checked = 0
+        self.check_seconds = 0.0
+        self.reasons = dict.fromkeys(REASONS, 0)
+        self.actions = {"elaborate": 0, "score": 0}
+        self.calls_saved = 0
+        self._lock = threading.Lock()
+
+    def classify(self, answer: str, question: str = "") -> Optional[str]:
+        """
+        Get why an answer is not worth evaluating, or None if it is.
+
+        Uses the same whitespace word count as InterviewEvaluator.evaluate_response_quality,
+        so too-short answers are the ones whose length score is close to 0.
+        """
+        words = answer.split()
+        tokens = [token.lower() for token in _WORD.findall(answer)]
+        if not tokens:
+            return "empty"
+        if len(words) < self.min_words:
+            return "too_short"
+
+        if question and len(tokens) >= MIN_COPY_WORDS:
+            question_tokens = {token.lower() for token in _WORD.findall(question)}
+            copied = sum(token in question_tokens for token in tokens)
+            if copied / len(tokens) >= self.copy_threshold:
+                return "copied_question"
+
+        visible = [char for char in answer if not char.isspace()]
+        if sum(char.isalpha() for char in visible) / len(visible) < 0.5:
+            return "gibberish"
+        # Acronyms (all capitals) and words in other scripts are not judged
+        candidates = [word for word in (w.strip(".,;:!?'\"()") for w in words)
+                      if word.isascii() and word.isalpha() and not word.isupper()]
+        if candidates and sum(_implausible_word(word.lower()) for word in candidates) * 2 >= len(candidates):
+            return "gibberish"
+        if len(tokens) >= MIN_REPETITION_WORDS and len(set(tokens)) * 10 < len(tokens) * 3:
+            return "gibberish"
+        return None
+
+    def check(self, answer: str, question: str = "", elaborations: int = 0,
+              last_question: bool = False) -> Optional[PrefilterVerdict]:
+        """
+        Decide how to handle an answer.
+
+        Args:
+            answer: The candidate's answer
+            question: The question it answers (for the copy check)
+            elaborations: Elaboration requests already made for this question
+            last_question: Whether it is the round's last question (no next question follows)
+
+        Returns:
+            None if the answer goes to the LLM as usual
+        """
+        if self.mode == "off":
+            return None
+
+        started = time.perf_counter()
+        reason = self.classify(answer, question)
+        elapsed = time.perf_counter() - started
+
+        verdict = None
+        if reason is not None:
+            if self.mode == "elaborate" and elaborations < self.max_elaborations:
+                verdict = PrefilterVerdict(reason, "elaborate", ELABORATION_MESSAGES[reason])
+            else:
+                verdict = PrefilterVerdict(reason, "score", SCORED_FEEDBACK)
+
+        with self._lock:
+            self.checked += 1
+            self.check_seconds += elapsed
+            if verdict is not None:
+                self.reasons[reason] += 1
+                self.actions[verdict.action] += 1
+                # evaluate_answer is always skipped; ask_next_question too unless the answer is scored
+                self.calls_saved += 1 if verdict.action == "score" or last_question else 2
+        return verdict
+
+    def stats(self) -> Dict:
+        with self._lock:
+            caught = sum(self.actions.values())
+            return {
+                "mode": self.mode,
+                "checked": self.checked,
+                "caught": caught,
+                "caught_share": round(caught / self.checked, 3) if self.checked else 0.0,
+                "reasons": dict(self.reasons),
+                "actions": dict(self.actions),
+                "llm_calls_saved": self.calls_saved,
+                "avg_check_us": round(self.check_seconds / self.checked * 1e6, 1) if self.checked else 0.0
+            }
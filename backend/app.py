@@ -2,76 +2,718 @@
 Main Flask application for the multi-round interview system.
 """
 
+import functools
+import hmac
+import json
+import logging
 import os
+import signal
+import threading
+import time
+import urllib.error
+import urllib.request
 import uuid
-from flask import Flask, request, jsonify
-from flask_cors import CORS
-from dotenv import load_dotenv
-from typing import Dict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from flask import Blueprint, Flask, Response, current_app, g, request, jsonify, stream_with_context
+from flask_sock import Sock
+from pydantic import ValidationError
+from simple_websocket import ConnectionClosed
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
 
 from models import (
     InterviewSession, RoundData, Message, QuestionAnswer,
-    StartInterviewRequest, ChatRequest, ChatResponse
+    StartInterviewRequest, BulkStartInterviewRequest, ChatRequest, ChatResponse
 )
-from groq_service import GroqService
-from evaluator import InterviewEvaluator
-from prompts import get_round_prompt, get_round_info
+from round_registry import DEFAULT_CONFIG_PATH, Pipeline, RoundConfig, RoundRegistry, default_registry
+from shared_cache import SharedCachePublisher, default_shared_cache
+from similarity import MinHashLSHIndex
+from analytics import CohortAnalytics
+from search_index import TranscriptSearchIndex
+from concurrency import (
+    SessionLockRegistry, IdempotencyCache, TurnCheckpoint,
+    SessionBusyError, IdempotencyConflictError
+)
+from deadlines import (
+    Deadline, DeadlineExceeded, ClientDisconnected, deadline_scope, connection_probe
+)
+from admission import AdmissionController, AdmissionRejected, Priority
+from tracing import tracer
+from compression import compress_response
+from projection import parse_fields, session_payload
+from summaries import SessionSummaryStore
+from job_queue import JobQueue
+from reports import REPORT_JOB, report_payload, build_report
+from sharding import (
+    ShardConfigError, ShardMembership, owned_session_id, merge_leaderboards, merge_ranked, merge_role_counts,
+    merge_role_stats, merge_term_statistics
+)
+from prompt_builder import PromptBuilderRegistry
+from handoff import DrainState, announce_handoff, claim_handoff, handoff_pending, write_handoff
+from turn_events import emit, event_scope
+from structured_logging import setup_logging, reset_context, bind_context, dropped_records
+from profiling import SamplingProfiler, RequestProfiler
+from answer_prefilter import AnswerPrefilter, PrefilterVerdict
+from memory_profiling import AllocationTracer, session_footprint, aggregate_footprints, process_memory
+
+logger = logging.getLogger(__name__)
+
+# Routes are registered on a blueprint; create_app() builds the Flask app
+api = Blueprint('api', __name__)
+sock = Sock()
+
+@api.before_app_request
+def _start_log_context():
+    """Start the per-request logging context."""
+    g.request_started = time.perf_counter()
+    reset_context(
+        request_id=request.headers.get('X-Request-Id') or uuid.uuid4().hex,
+        method=request.method,
+        route=request.url_rule.rule if request.url_rule else request.path
+    )
+
+@api.after_app_request
+def _log_request(response):
+    """Log one structured line per request with its status and latency."""
+    logger.info("Request completed", extra={
+        "status": response.status_code,
+        "latency_ms": round((time.perf_counter() - g.request_started) * 1000, 1)
+    })
+    return response
+
+@api.after_app_request
+def _compress_response(response):
+    """Compress JSON responses with gzip or brotli when the client accepts it."""
+    return compress_response(
+        response, request.accept_encodings, current_app.config['COMPRESSION_MIN_BYTES']
+    )
+
+@api.before_app_request
+def _start_request_span():
+    """Open the root trace span for the request (sampled per TRACE_SAMPLE_RATE)."""
+    route = request.url_rule.rule if request.url_rule else request.path
+    g.trace_span, g.trace_token = tracer.start_root(
+        f"{request.method} {route}",
+        traceparent=request.headers.get('traceparent'),
+        force=request.headers.get('X-Trace') == '1',
+        **{"http.method": request.method, "http.route": route}
+    )
+
+@api.after_app_request
+def _record_response_span(response):
+    """Record the status code and expose the trace ID of sampled requests."""
+    span = g.get('trace_span')
+    if span is not None and span.sampled:
+        span.set_attribute("http.status_code", response.status_code)
+        response.headers['X-Trace-Id'] = span.trace_id
+    return response
+
+@api.teardown_app_request
+def _end_request_span(error):
+    """Close the root span and queue the trace for export."""
+    tracer.end_root(g.get('trace_span'), g.pop('trace_token', None), error)
+
+def _is_admin_request() -> bool:
+    """Check the X-Admin-Token header against ADMIN_TOKEN (admin is disabled when unset)."""
+    admin_token = current_app.config['ADMIN_TOKEN']
+    token = request.headers.get('X-Admin-Token', '')
+    return bool(admin_token) and hmac.compare_digest(token, admin_token)
+
+def _profile_dir() -> str:
+    """Output directory for profiles."""
+    return os.getenv('PROFILE_DIR', 'profiles')
+
+def _arm_profiler_from_signal():
+    try:
+        get_sampling_profiler().arm(seconds=float(os.getenv('PROFILE_SIGNAL_SECONDS', 30)))
+    except (RuntimeError, ValueError) as e:
+        logger.warning("Profiler not armed by signal: %s", e)
 
-# Load environment variables
-load_dotenv()
+def _profile_on_signal(signum, frame):
+    """
+    SIGUSR2: sample the watched routes for PROFILE_SIGNAL_SECONDS.
+    The handler may interrupt a thread holding the profiler's lock, so arming runs on its own thread.
+    """
+    threading.Thread(target=_arm_profiler_from_signal, name="profile-signal", daemon=True).start()
+
+@api.before_app_request
+def _start_profiling():
+    """Attach the sampling profiler or a per-request cProfile when requested."""
+    route = request.url_rule.rule if request.url_rule else None
+    g.sampling_profiled = get_sampling_profiler().request_started(route)
+    
+    if request.headers.get('X-Profile') == 'cprofile' and _is_admin_request():
+        g.request_profiler = RequestProfiler(_profile_dir())
+        g.request_profiler.start()
 
-# Initialize Flask app
-app = Flask(__name__)
-CORS(app)
+@api.after_app_request
+def _finish_request_profile(response):
+    """Dump the cProfile stats of a profiled request."""
+    profiler = g.pop('request_profiler', None)
+    if profiler is not None:
+        response.headers['X-Profile-File'] = profiler.stop(request.path)
+    return response
 
-# Initialize Groq service
-GROQ_API_KEY = os.getenv('GROQ_API_KEY')
-if not GROQ_API_KEY:
-    raise ValueError("GROQ_API_KEY not found in environment variables")
+@api.teardown_app_request
+def _stop_profiling(error):
+    """Release the sampling profiler and any cProfile left running by an error."""
+    if g.pop('sampling_profiled', False):
+        get_sampling_profiler().request_finished()
+    profiler = g.pop('request_profiler', None)
+    if profiler is not None:
+        profiler.stop(request.path)
 
-groq_service = GroqService(GROQ_API_KEY)
-evaluator = InterviewEvaluator()
+T = TypeVar('T')
+
+def _lazy_service(factory: Callable[[], T]) -> Callable[[], T]:
+    """
+    Build a shared service on first use and return the same instance afterwards.
+    Keeps imports and worker startup cheap; services are created after any fork.
+    """
+    lock = threading.Lock()
+    instance: List[T] = []
+    
+    @functools.wraps(factory)
+    def get() -> T:
+        if not instance:
+            with lock:
+                if not instance:
+                    instance.append(factory())
+        return instance[0]
+    
+    return get
+
+@_lazy_service
+def get_groq_service():
+    """LLM client wrapper; provider SDKs are only imported when first needed."""
+    from groq_service import GroqService
+    from llm_providers import GroqProvider, OpenAICompatibleProvider, ProviderPool
+    
+    timeout = float(os.getenv('LLM_PROVIDER_TIMEOUT_SECONDS', 30))
+    fallback_url = os.getenv('LLM_FALLBACK_URL')
+    providers = []
+    api_key = os.getenv('GROQ_API_KEY')
+    if api_key:
+        # With a fallback, failed calls move to it instead of being retried against Groq
+        providers.append(GroqProvider(api_key, timeout=timeout, max_retries=0 if fallback_url else 2))
+    if fallback_url:
+        providers.append(OpenAICompatibleProvider(
+            fallback_url,
+            api_key=os.getenv('LLM_FALLBACK_API_KEY'),
+            model=os.getenv('LLM_FALLBACK_MODEL'),
+            name="fallback",
+            timeout=timeout
+        ))
+    if not providers:
+        raise ValueError("GROQ_API_KEY not found in environment variables")
+    return GroqService(providers=ProviderPool(
+        providers,
+        cooldown_seconds=float(os.getenv('LLM_PROVIDER_COOLDOWN_SECONDS', 30)),
+        probe_share=float(os.getenv('LLM_PROBE_SHARE', 0.05))
+    ))
+
+@_lazy_service
+def get_answer_prefilter() -> AnswerPrefilter:
+    """Local checks that keep junk answers away from the LLM."""
+    return AnswerPrefilter(
+        mode=os.getenv('ANSWER_PREFILTER', 'elaborate'),
+        min_words=int(os.getenv('ANSWER_PREFILTER_MIN_WORDS', 2)),
+        max_elaborations=int(os.getenv('ANSWER_PREFILTER_MAX_ELABORATIONS', 1)),
+        copy_threshold=float(os.getenv('ANSWER_PREFILTER_COPY_THRESHOLD', 0.9))
+    )
+
+@_lazy_service
+def get_evaluator():
+    """Scoring logic for questions, rounds and final evaluations."""
+    from evaluator import InterviewEvaluator
+    
+    return InterviewEvaluator()
 
-# In-memory storage for active sessions (use database in production)
-active_sessions: Dict[str, InterviewSession] = {}
+@_lazy_service
+def get_session_store() -> Dict[str, InterviewSession]:
+    """In-memory storage for active sessions (use database in production)."""
+    return {}
 
-@app.route('/health', methods=['GET'])
+@_lazy_service
+def get_session_summaries() -> SessionSummaryStore:
+    """Compact status records maintained alongside each session."""
+    return SessionSummaryStore()
+
+@_lazy_service
+def get_prompt_builders() -> PromptBuilderRegistry:
+    """Per-session prompt prefixes, appended to turn by turn."""
+    return PromptBuilderRegistry()
+
+def _session_config(session: InterviewSession) -> RoundConfig:
+    """Round config a session is pinned to (the active one if that version is gone)."""
+    return default_registry().config(session.config_version)
+
+def _session_pipeline(session: InterviewSession) -> Pipeline:
+    """Round pipeline of a session (chosen from its job role when it started)."""
+    return _session_config(session).pipeline(session.pipeline)
+
+# Timeout of calls between shard workers
+SHARD_CALL_TIMEOUT_SECONDS = 10
+
+def _shard_node() -> str:
+    """URL of this worker on the shard ring ('' when not sharded)."""
+    return os.getenv('SHARD_NODE', '').rstrip('/')
+
+@_lazy_service
+def get_shard_membership() -> Optional[ShardMembership]:
+    """Shard ring of a sharded deployment; None unless SHARD_NODE is set."""
+    if not _shard_node():
+        return None
+    membership = ShardMembership(
+        os.getenv('SHARD_NODES_FILE', 'shards.json'),
+        reload_interval=float(os.getenv('SHARD_RELOAD_INTERVAL', 2))
+    )
+    threading.Thread(target=_rebalance_loop, args=(membership,), name="shard-rebalancer", daemon=True).start()
+    return membership
+
+def _new_session_id() -> str:
+    """New session ID; in sharded mode one that hashes to this worker."""
+    membership = get_shard_membership()
+    if membership is None:
+        return str(uuid.uuid4())
+    return owned_session_id(membership.ring(), _shard_node())
+
+# Header of calls between shard workers; such calls are only answered with the worker's own data
+SHARD_SCOPE_HEADER = 'X-Shard-Scope'
+
+def _shard_call(node: str, path: str, payload: Optional[Dict] = None, method: str = "POST") -> Optional[Dict]:
+    """Call another worker's API with the admin token. Returns None if it answered 404."""
+    call = urllib.request.Request(
+        node + path,
+        data=json.dumps(payload or {}).encode("utf-8") if method == "POST" else None,
+        headers={
+            "Content-Type": "application/json",
+            "X-Admin-Token": os.getenv('ADMIN_TOKEN', ''),
+            SHARD_SCOPE_HEADER: "local"
+        },
+        method=method
+    )
+    try:
+        with urllib.request.urlopen(call, timeout=SHARD_CALL_TIMEOUT_SECONDS) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        if e.code == 404:
+            return None
+        raise
+
+@_lazy_service
+def get_shard_executor() -> ThreadPoolExecutor:
+    """Worker threads asking the other shard workers for their part of a read."""
+    return ThreadPoolExecutor(
+        max_workers=int(os.getenv('SHARD_FAN_OUT_CONCURRENCY', 16)),
+        thread_name_prefix="shard-fan-out"
+    )
+
+def _peer_nodes() -> List[str]:
+    """The other workers on the shard ring (none when not sharded)."""
+    membership = get_shard_membership()
+    if membership is None:
+        return []
+    node = _shard_node()
+    return [other for other in membership.ring().nodes if other != node]
+
+def _fans_out() -> bool:
+    """Whether a cross-session read must include the other workers' sessions."""
+    return bool(_peer_nodes()) and request.headers.get(SHARD_SCOPE_HEADER) != "local"
+
+def _gather(path: str, payload: Optional[Dict] = None) -> Tuple[Dict[str, Optional[Dict]], List[str]]:
+    """
+    Ask every other worker for its own part of a read, in parallel.
+    GET when there is no payload, POST otherwise.
+    Returns: ({node: response, or None if it answered 404}, unreachable nodes)
+    """
+    method = "GET" if payload is None else "POST"
+    futures = {
+        node: get_shard_executor().submit(_shard_call, node, path, payload, method)
+        for node in _peer_nodes()
+    }
+    responses, unreachable = {}, []
+    for node, future in futures.items():
+        try:
+            responses[node] = future.result()
+        except Exception as e:
+            logger.warning("Shard worker did not answer: %s", e, extra={"node": node, "path": path})
+            unreachable.append(node)
+    return responses, unreachable
+
+def _answer_key(session_id: str, round_number: int, question_number: int) -> str:
+    """Key of an answer in the duplicate index."""
+    return f"{session_id}:{round_number}:{question_number}"
+
+def _register_session(session: InterviewSession):
+    """Store a session received from another worker or process and build its local indexes."""
+    if get_session_store().get(session.session_id) is not None:
+        # Replaced by a newer copy; its old index entries must not be counted twice
+        _remove_session_indexes(get_session_store()[session.session_id])
+    get_session_store()[session.session_id] = session
+    if session.status == "active":
+        registry = default_registry()
+        config = registry.config(session.config_version)
+        if session.config_version is not None and config.version != session.config_version:
+            # Started under a config this process never loaded; continue on the active one
+            logger.warning("Round config of session not available, using the active one",
+                           extra={"session_id": session.session_id, "rounds_version": session.config_version})
+        session.config_version = config.version
+        registry.pin(session.session_id, config)
+    _refresh_summary(session)
+    
+    answer_index = get_answer_index()
+    for round_number, round_data in session.rounds.items():
+        for qa in round_data.questions:
+            answer_index.add(
+                _answer_key(session.session_id, round_number, qa.question_number), qa.answer,
+                owner=session.session_id
+            )
+    
+    transcript_index = get_transcript_index()
+    transcript_index.update_session(
+        session.session_id, job_role=session.job_role, candidate_name=session.candidate_name,
+        status=session.status
+    )
+    for round_number, round_data in session.rounds.items():
+        for qa in round_data.questions:
+            if qa.answer_message_index is not None:
+                transcript_index.index_message(
+                    session.session_id, qa.answer_message_index, "answer", round_number, qa.answer
+                )
+            if qa.feedback_message_index is not None:
+                transcript_index.index_message(
+                    session.session_id, qa.feedback_message_index, "feedback", round_number, qa.ai_feedback
+                )
+    get_cohort_analytics().record_session(session)
+
+# Near-duplicate matches reported per answer
+MAX_DUPLICATE_MATCHES = 5
+
+@_lazy_service
+def get_duplicate_check_executor() -> ThreadPoolExecutor:
+    """Worker threads asking the other shard workers for near-duplicates of committed answers."""
+    return ThreadPoolExecutor(
+        max_workers=int(os.getenv('SHARD_DUPLICATE_CHECK_CONCURRENCY', 4)),
+        thread_name_prefix="peer-duplicates"
+    )
+
+def _check_peer_duplicates(session_id: str, round_number: int, question_number: int, text: str):
+    """
+    Merge near-duplicates of an answer held by the other shard workers into its stored flags.
+    Runs after the turn, off the request path, so a turn never waits for the other workers.
+    """
+    try:
+        responses, _ = _gather("/api/internal/answers/similar", {
+            "text": text, "owner": session_id, "limit": MAX_DUPLICATE_MATCHES
+        })
+        peer_matches = [response["matches"] for response in responses.values() if response and response["matches"]]
+        if not peer_matches or get_session_store().get(session_id) is None:
+            # Nothing to add, or the session moved to another worker or was removed meanwhile
+            return
+        
+        with get_session_locks().hold(session_id):
+            session = get_session_store().get(session_id)
+            round_data = session.rounds.get(round_number) if session is not None else None
+            if round_data is None:
+                return
+            for qa in round_data.questions:
+                if qa.question_number == question_number and qa.answer == text:
+                    qa.duplicate_matches = merge_ranked(
+                        [qa.duplicate_matches] + peer_matches, "similarity", MAX_DUPLICATE_MATCHES
+                    )
+                    qa.near_duplicate = True
+    except Exception as e:
+        logger.warning("Cross-shard duplicate check failed: %s", e, extra={"session_id": session_id})
+
+def _remove_session_indexes(session: InterviewSession):
+    """Remove a session's answers, transcript and cohort analytics from this worker's indexes."""
+    answer_index = get_answer_index()
+    for round_number, round_data in session.rounds.items():
+        for qa in round_data.questions:
+            answer_index.remove(_answer_key(session.session_id, round_number, qa.question_number))
+    get_transcript_index().remove_session(session.session_id)
+    get_cohort_analytics().remove_session(session)
+
+def _forget_session(session_id: str):
+    """Drop the per-session state kept next to a session that left the session store."""
+    get_session_summaries().remove(session_id)
+    get_prompt_builders().discard(session_id)
+    get_session_locks().discard(session_id)
+    default_registry().release(session_id)
+
+def _release_session(session_id: str) -> Optional[InterviewSession]:
+    """Remove a session from this worker, after any turn in flight has finished."""
+    with get_session_locks().hold(session_id):
+        session = get_session_store().pop(session_id, None)
+    if session is not None:
+        _forget_session(session_id)
+        # Searched and compared against on its new owner only
+        _remove_session_indexes(session)
+    return session
+
+def _find_session(session_id: str) -> Optional[InterviewSession]:
+    """
+    Look up a session. A session this process does not have yet may still be on its
+    way from a draining process (rolling restart). In sharded mode a session this
+    worker owns but does not have is pulled from the worker that held it before the
+    ring changed.
+    """
+    session = get_session_store().get(session_id)
+    if session is None and not get_drain_state().draining and handoff_pending(_handoff_path()):
+        session = _await_handoff(session_id)
+    membership = get_shard_membership()
+    if session is not None or membership is None:
+        return session
+    
+    node = _shard_node()
+    ring = membership.ring()
+    if len(ring.nodes) < 2 or ring.owner(session_id) != node:
+        return None
+    
+    # The previous owner first; other workers in case this one missed a ring change
+    holders = [other for other in ring.nodes if other != node]
+    if membership.previous is not None:
+        previous_owner = membership.previous.owner(session_id)
+        if previous_owner != node:
+            holders = [previous_owner] + [other for other in holders if other != previous_owner]
+    
+    for holder in holders:
+        try:
+            data = _shard_call(holder, f"/api/internal/sessions/{session_id}/release")
+        except Exception as e:
+            logger.warning("Could not pull session from another worker: %s", e, extra={"node": holder})
+            continue
+        if data is not None:
+            session = InterviewSession(**data)
+            _register_session(session)
+            return session
+    
+    # Pushed here by the previous owner in the meantime, or unknown
+    return get_session_store().get(session_id)
+
+def _rebalance_loop(membership: ShardMembership):
+    """Hand the sessions this worker no longer owns to their new owners when the ring changes."""
+    node = _shard_node()
+    version = membership.version
+    while True:
+        time.sleep(max(membership.reload_interval, 1))
+        ring = membership.ring()
+        if membership.version == version:
+            continue
+        version = membership.version
+        
+        moved = 0
+        for session_id in [sid for sid in list(get_session_store()) if ring.owner(sid) != node]:
+            owner = ring.owner(session_id)
+            session = _release_session(session_id)
+            if session is None:
+                continue
+            try:
+                _shard_call(owner, "/api/internal/sessions", {"sessions": [session.dict()]})
+                moved += 1
+            except Exception as e:
+                # Kept here; the new owner pulls it on first use. Its index entries were
+                # removed on release, so registering adds them back exactly once
+                logger.warning("Could not hand session to its new owner: %s", e, extra={"node": owner})
+                _register_session(session)
+        logger.info("Shard rebalance finished", extra={"moved_sessions": moved, "ring_version": version})
+
+def _new_session(req: StartInterviewRequest, config: RoundConfig) -> InterviewSession:
+    """
+    Create a session with its first round started (the greeting is added separately).
+    It is pinned to the config once it is stored.
+    """
+    pipeline = config.pipeline_for(req.job_role)
+    session = InterviewSession(
+        session_id=_new_session_id(),
+        job_role=req.job_role,
+        candidate_name=req.candidate_name,
+        pipeline=pipeline.name,
+        config_version=config.version,
+        current_round=1,
+        current_question=0
+    )
+    session.rounds[1] = RoundData(
+        round_number=1,
+        round_name=pipeline.round(1).name,
+        status="in_progress"
+    )
+    return session
+
+def _refresh_summary(session: InterviewSession):
+    """Rebuild the status summary of a session after it changed."""
+    total_questions = _session_pipeline(session).round(session.current_round).questions_count
+    get_session_summaries().update(session, total_questions)
+
+@_lazy_service
+def get_answer_index() -> MinHashLSHIndex:
+    """Near-duplicate detection across all submitted answers."""
+    return MinHashLSHIndex(threshold=float(os.getenv('DUPLICATE_THRESHOLD', 0.8)))
+
+@_lazy_service
+def get_cohort_analytics() -> CohortAnalytics:
+    """Running per-role aggregates for recruiter dashboards."""
+    return CohortAnalytics()
+
+@_lazy_service
+def get_transcript_index() -> TranscriptSearchIndex:
+    """Full-text index over answers and feedback, built in the background."""
+    return TranscriptSearchIndex()
+
+@_lazy_service
+def get_session_locks() -> SessionLockRegistry:
+    """Serializes turns per session."""
+    return SessionLockRegistry()
+
+@_lazy_service
+def get_idempotency_cache() -> IdempotencyCache:
+    """Replays responses of retried requests."""
+    return IdempotencyCache(ttl_seconds=float(os.getenv('IDEMPOTENCY_TTL_SECONDS', 3600)))
+
+@_lazy_service
+def get_admission() -> AdmissionController:
+    """Bounds in-flight LLM-backed requests, prioritizing candidates mid-interview."""
+    return AdmissionController(
+        max_in_flight=int(os.getenv('ADMISSION_MAX_IN_FLIGHT', 16)),
+        max_queue=int(os.getenv('ADMISSION_MAX_QUEUE', 64)),
+        max_wait=float(os.getenv('ADMISSION_MAX_WAIT_SECONDS', 5)),
+        new_interview_share=float(os.getenv('ADMISSION_NEW_INTERVIEW_SHARE', 0.5))
+    )
+
+def _notify_report(job: Dict):
+    """POST a finished report job to REPORT_WEBHOOK_URL, if one is configured."""
+    url = os.getenv('REPORT_WEBHOOK_URL')
+    if not url:
+        return
+    body = json.dumps({"session_id": job["subject"], "job_id": job["job_id"], "status": job["status"]})
+    notification = urllib.request.Request(
+        url, data=body.encode("utf-8"), headers={"Content-Type": "application/json"}, method="POST"
+    )
+    with urllib.request.urlopen(notification, timeout=5):
+        pass
+
+@_lazy_service
+def get_report_jobs() -> JobQueue:
+    """Durable queue generating detailed final reports off the request path."""
+    return JobQueue(
+        os.getenv('REPORT_DB_PATH', 'reports.db'),
+        {REPORT_JOB: lambda payload: build_report(payload, get_groq_service())},
+        workers=int(os.getenv('REPORT_WORKERS', 2)),
+        on_finished=_notify_report
+    )
+
+@_lazy_service
+def get_greeting_executor() -> ThreadPoolExecutor:
+    """Worker threads generating greetings for bulk-created interviews."""
+    return ThreadPoolExecutor(
+        max_workers=int(os.getenv('BULK_GREETING_CONCURRENCY', 8)),
+        thread_name_prefix="bulk-greeting"
+    )
+
+@_lazy_service
+def get_sampling_profiler() -> SamplingProfiler:
+    """On-demand profiling of hot routes."""
+    return SamplingProfiler(_profile_dir())
+
+@_lazy_service
+def get_allocation_tracer() -> AllocationTracer:
+    """On-demand tracemalloc snapshots and diffs."""
+    return AllocationTracer()
+
+@_lazy_service
+def get_drain_state() -> DrainState:
+    """Whether this process has stopped taking work ahead of a restart."""
+    return DrainState()
+
+# Checkpoints of the turns in flight, so a drain can hand off their pre-turn state
+_turn_checkpoints: Dict[str, TurnCheckpoint] = {}
+
+# Largest number of sessions returned by one batch status request
+MAX_BATCH_STATUS_IDS = 1000
+
+# Largest number of interviews opened by one bulk start request
+MAX_BULK_START_SESSIONS = 1000
+
+# Longest a report request waits for a pending report
+MAX_REPORT_WAIT_SECONDS = 30
+
+# Retry-After sent while draining; about the time the next process needs to start
+DRAIN_RETRY_AFTER_SECONDS = 5
+
+# Time a drain may take beyond its timeout to write the handoff file
+HANDOFF_WRITE_GRACE_SECONDS = 10
+
+# How often requests held for an announced handoff check whether it has been written
+HANDOFF_POLL_SECONDS = 0.1
+
+# Serializes loading handoff files, and starting a drain against loading one
+_handoff_lock = threading.Lock()
+
+def _deadline_budget(timeout_ms: Optional[int]) -> float:
+    """Time budget for an LLM-backed request, capped by the client's own timeout."""
+    budget = current_app.config['REQUEST_DEADLINE_SECONDS']
+    if timeout_ms and timeout_ms > 0:
+        budget = min(budget, timeout_ms / 1000)
+    return budget
+
+def _request_deadline() -> Deadline:
+    """Build the deadline for the current request from its timeout header."""
+    return Deadline(
+        _deadline_budget(request.headers.get('X-Request-Timeout-Ms', type=int)),
+        connection_probe(request.environ)
+    )
+
+def _deadline_response(error: DeadlineExceeded):
+    """Build the response for a request that ran out of time or lost its client."""
+    # 499 (client closed request) is never read, but keeps access logs accurate
+    status_code = 499 if isinstance(error, ClientDisconnected) else 504
+    return jsonify({"error": str(error)}), status_code
+
+def _draining_response():
+    """Build a 503 response asking the client to retry against the next process."""
+    response = jsonify({"error": "Server is restarting, please retry", "retry_after": DRAIN_RETRY_AFTER_SECONDS})
+    response.headers['Retry-After'] = str(DRAIN_RETRY_AFTER_SECONDS)
+    return response, 503
+
+def _overloaded_response(error: AdmissionRejected):
+    """Build a 429 response telling the client when to retry."""
+    response = jsonify({"error": str(error), "retry_after": error.retry_after})
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, 429
+
+@api.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
+    if get_drain_state().draining:
+        return jsonify({"status": "draining", "service": "interview-backend"}), 503
     return jsonify({"status": "healthy", "service": "interview-backend"}), 200
 
-@app.route('/api/start-interview', methods=['POST'])
+@api.route('/api/start-interview', methods=['POST'])
 def start_interview():
     """
     Start a new interview session.
     Expects: { "job_role": "string", "candidate_name": "string" (optional) }
     Returns: session details and initial greeting
     """
+    if get_drain_state().draining:
+        return _draining_response()
+    
     try:
         data = request.get_json()
         req = StartInterviewRequest(**data)
         
         # Create new session
-        session_id = str(uuid.uuid4())
-        session = InterviewSession(
-            session_id=session_id,
-            job_role=req.job_role,
-            candidate_name=req.candidate_name,
-            current_round=1,
-            current_question=0
-        )
-        
-        # Initialize Round 1
-        round_info = get_round_info(1)
-        round_1 = RoundData(
-            round_number=1,
-            round_name=round_info['name'],
-            status="in_progress"
-        )
-        session.rounds[1] = round_1
+        config = default_registry().current()
+        session = _new_session(req, config)
+        session_id = session.session_id
+        pipeline = config.pipeline(session.pipeline)
+        bind_context(session_id=session_id, round=1, question=0)
+        round_info = pipeline.round(1).info
         
         # Generate initial greeting and first question
-        greeting = groq_service.generate_greeting(req.job_role, 1, round_info)
+        with get_admission().admit(Priority.NEW_INTERVIEW), deadline_scope(_request_deadline()):
+            greeting = get_groq_service().generate_greeting(req.job_role, 1, round_info)
         
         # Add to conversation history
         session.conversation_history.append(Message(
@@ -80,7 +722,13 @@ def start_interview():
         ))
         
         # Store session
-        active_sessions[session_id] = session
+        get_session_store()[session_id] = session
+        default_registry().pin(session_id, config)
+        _refresh_summary(session)
+        get_cohort_analytics().record_start(req.job_role)
+        get_transcript_index().update_session(
+            session_id, job_role=req.job_role, candidate_name=req.candidate_name, status="active"
+        )
         
         return jsonify({
             "session_id": session_id,
@@ -88,154 +736,414 @@ def start_interview():
             "current_round": 1,
             "round_name": round_info['name'],
             "greeting": greeting,
-            "total_questions": round_info['questions_count']
+            "total_questions": round_info['questions_count'],
+            "total_rounds": pipeline.total_rounds
         }), 200
         
+    except AdmissionRejected as e:
+        return _overloaded_response(e)
+    
+    except DeadlineExceeded as e:
+        return _deadline_response(e)
+    
     except Exception as e:
+        logger.exception("Error starting interview: %s", e)
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/chat', methods=['POST'])
-def chat():
+def _bulk_greeting(batch_id: str, job_role: str, pipeline: Pipeline,
+                   sessions: List[InterviewSession], budget: float) -> Dict:
     """
-    Handle chat messages during interview.
-    Expects: { "session_id": "string", "message": "string" }
-    Returns: AI response and session status
+    Generate one greeting for a group of bulk-created sessions with the same role.
+    Runs on the greeting executor. Sessions whose greeting failed are removed again.
+    Returns: readiness event for the group
     """
+    reset_context(batch_id=batch_id, job_role=job_role)
+    session_ids = [session.session_id for session in sessions]
+    
     try:
-        data = request.get_json()
-        req = ChatRequest(**data)
-        
-        # Get session
-        session = active_sessions.get(req.session_id)
-        if not session:
-            return jsonify({"error": "Session not found"}), 404
-        
-        if session.status != "active":
-            return jsonify({"error": "Interview is not active"}), 400
-        
+        with get_admission().admit(Priority.NEW_INTERVIEW), deadline_scope(Deadline(budget)):
+            greeting = get_groq_service().generate_greeting(job_role, 1, pipeline.round(1).info)
+    except Exception as e:
+        logger.error("Bulk greeting failed: %s", e, extra={"sessions": len(sessions)})
+        for session in sessions:
+            if get_session_store().pop(session.session_id, None) is not None:
+                _remove_session_indexes(session)
+            _forget_session(session.session_id)
+        return {"event": "failed", "job_role": job_role, "session_ids": session_ids, "error": str(e)}
+    
+    for session in sessions:
+        with get_session_locks().hold(session.session_id):
+            session.conversation_history.append(Message(role="assistant", content=greeting))
+        get_cohort_analytics().record_start(job_role)
+        get_transcript_index().update_session(
+            session.session_id, job_role=job_role, candidate_name=session.candidate_name, status="active"
+        )
+    total_questions = pipeline.round(1).questions_count
+    get_session_summaries().update_many((session, total_questions) for session in sessions)
+    
+    return {"event": "ready", "job_role": job_role, "session_ids": session_ids, "greeting": greeting}
+
+@api.route('/api/start-interview/bulk', methods=['POST'])
+def start_interviews_bulk():
+    """
+    Start interviews for many candidates at once.
+    Expects: { "candidates": [{ "job_role": "string", "candidate_name": "string" (optional) }] }
+    Returns: newline-delimited JSON; a "created" event with every session ID right away,
+    then one "ready" (or "failed") event per job role as its greeting is generated
+    """
+    if get_drain_state().draining:
+        return _draining_response()
+    
+    try:
+        req = BulkStartInterviewRequest(**(request.get_json(silent=True) or {}))
+    except ValidationError:
+        return jsonify({"error": "Field 'candidates' must be a list of objects with a 'job_role'"}), 400
+    if not req.candidates or len(req.candidates) > MAX_BULK_START_SESSIONS:
+        return jsonify({"error": f"Expected between 1 and {MAX_BULK_START_SESSIONS} candidates"}), 400
+    
+    batch_id = str(uuid.uuid4())
+    bind_context(batch_id=batch_id)
+    config = default_registry().current()
+    
+    # Candidates for the same role share one greeting
+    groups: Dict[Tuple[str, str], List[InterviewSession]] = {}
+    sessions = []
+    for candidate in req.candidates:
+        session = _new_session(candidate, config)
+        sessions.append(session)
+        groups.setdefault((candidate.job_role, session.pipeline), []).append(session)
+    
+    # Store every session at once; chat turns wait for the greeting (409 until ready)
+    get_session_store().update((session.session_id, session) for session in sessions)
+    for session in sessions:
+        default_registry().pin(session.session_id, config)
+    get_session_summaries().update_many(
+        (session, config.pipeline(session.pipeline).round(1).questions_count) for session in sessions
+    )
+    
+    budget = _deadline_budget(request.headers.get('X-Request-Timeout-Ms', type=int))
+    futures = [
+        get_greeting_executor().submit(
+            _bulk_greeting, batch_id, job_role, config.pipeline(pipeline_name), group, budget
+        )
+        for (job_role, pipeline_name), group in groups.items()
+    ]
+    logger.info("Bulk interviews created", extra={"sessions": len(sessions), "greetings": len(futures)})
+    
+    def events():
+        yield json.dumps({
+            "event": "created",
+            "batch_id": batch_id,
+            "sessions": [
+                {"session_id": session.session_id, "job_role": session.job_role,
+                 "candidate_name": session.candidate_name}
+                for session in sessions
+            ]
+        }) + "\n"
+        ready = failed = 0
+        for future in as_completed(futures):
+            event = future.result()
+            if event["event"] == "ready":
+                ready += len(event["session_ids"])
+            else:
+                failed += len(event["session_ids"])
+            yield json.dumps(event) + "\n"
+        yield json.dumps({"event": "done", "batch_id": batch_id, "ready": ready, "failed": failed}) + "\n"
+    
+    # Greetings keep being generated if the client stops reading
+    return Response(stream_with_context(events()), mimetype="application/x-ndjson")
+
+def _roll_back_turn(session: InterviewSession, checkpoint: TurnCheckpoint):
+    """Restore a session to its state before a turn, including its duplicate-index entry."""
+    checkpoint.restore(session)
+    get_answer_index().remove(
+        _answer_key(session.session_id, checkpoint.current_round, checkpoint.current_question + 1)
+    )
+
+def _run_chat_turn(session: InterviewSession, req: ChatRequest,
+                   verdict: Optional[PrefilterVerdict] = None) -> Tuple[Dict, int]:
+    """
+    Run one interview turn atomically.
+    If the turn fails part-way (provider error, deadline, client gone), the session
+    is rolled back so the same answer can be retried. Side effects outside the
+    session (search index, analytics) only run once the turn has succeeded, and
+    not at all if a drain handed the session off without the turn.
+    """
+    checkpoint = _turn_checkpoints[session.session_id] = TurnCheckpoint(session)
+    on_commit: List[Callable[[], None]] = []
+    
+    try:
+        body, status_code = _process_chat_turn(session, req, on_commit, verdict)
+    except Exception:
+        _roll_back_turn(session, checkpoint)
+        raise
+    finally:
+        _turn_checkpoints.pop(session.session_id, None)
+    
+    if not get_drain_state().commit_turn(session.session_id):
+        # Handed off as it was before this turn; the next process runs the resent answer
+        _roll_back_turn(session, checkpoint)
+        return body, status_code
+    
+    for effect in on_commit:
+        effect()
+    _refresh_summary(session)
+    if session.status != "active":
+        get_prompt_builders().discard(session.session_id)
+        default_registry().release(session.session_id)
+    
+    return body, status_code
+
+def _prefilter_answer(session: InterviewSession, answer: str) -> Optional[PrefilterVerdict]:
+    """
+    Check an answer with the local pre-filter before its turn runs.
+    Must be called while holding the session's lock.
+    Returns: the verdict, or None if the answer goes to the LLM (or the turn answers no question)
+    """
+    total_questions = _session_pipeline(session).round(session.current_round).questions_count
+    if session.status != "active" or session.current_question >= total_questions:
+        return None
+    
+    # The question precedes any elaboration requests
+    question_index = len(session.conversation_history) - 1 - 2 * session.elaboration_requests
+    return get_answer_prefilter().check(
+        answer,
+        session.conversation_history[question_index].content if question_index >= 0 else "",
+        session.elaboration_requests,
+        session.current_question == total_questions - 1
+    )
+
+def _process_chat_turn(session: InterviewSession, req: ChatRequest, on_commit: List[Callable[[], None]],
+                       verdict: Optional[PrefilterVerdict] = None) -> Tuple[Dict, int]:
+    """
+    Run one interview turn for a session.
+    Must be called while holding the session's lock.
+    Side effects outside the session are queued on on_commit.
+    verdict is the pre-filter's verdict on the answer (see _prefilter_answer).
+    Returns: (response body, status code)
+    """
+    if session.status != "active":
+        return {"error": "Interview is not active"}, 400
+    
+    config = _session_config(session)
+    pipeline = config.pipeline(session.pipeline)
+    current_round = session.current_round
+    round_data = session.rounds[current_round]
+    round_spec = pipeline.round(current_round)
+    total_questions = round_spec.questions_count
+    
+    # Check if we're waiting for an answer
+    if session.current_question < total_questions:
         # Add user message to history
         session.conversation_history.append(Message(
             role="user",
             content=req.message
         ))
+        answer_message_index = len(session.conversation_history) - 1
         
-        current_round = session.current_round
-        round_data = session.rounds[current_round]
-        round_info = get_round_info(current_round)
-        total_questions = round_info['questions_count']
+        # Process the answer
+        question_idx = session.current_question
         
-        # Check if we're waiting for an answer
-        if session.current_question < total_questions:
-            # Process the answer
-            question_idx = session.current_question
-            
-            # Get AI feedback on the answer
-            system_prompt = get_round_prompt(current_round, session.job_role)
-            is_last_question = (question_idx == total_questions - 1)
-            
-            feedback = groq_service.evaluate_answer(
+        # Get AI feedback on the answer
+        with tracer.span("get_round_prompt"):
+            system_prompt = config.prompt(pipeline, current_round, session.job_role)
+        is_last_question = (question_idx == total_questions - 1)
+        
+        # Junk answers are handled locally
+        if verdict is not None:
+            tracer.current_span().set_attributes(prefilter_reason=verdict.reason, prefilter_action=verdict.action)
+            emit("answer_prefiltered", reason=verdict.reason, action=verdict.action)
+        
+        if verdict is not None and verdict.action == "elaborate":
+            # The question stays open; no provider call for this turn
+            session.elaboration_requests += 1
+            session.conversation_history.append(Message(
+                role="assistant",
+                content=verdict.message
+            ))
+            response = ChatResponse(
+                session_id=session.session_id,
+                ai_message=verdict.message,
+                current_round=current_round,
+                current_question=session.current_question,
+                total_questions=total_questions,
+                round_complete=False
+            )
+            return response.dict(), 200
+        
+        if verdict is not None:
+            feedback = verdict.message
+        else:
+            feedback = get_groq_service().evaluate_answer(
                 session.conversation_history,
                 system_prompt,
                 current_round,
-                is_last_question
+                is_last_question,
+                prompt_builder=get_prompt_builders().get(session.session_id)
             )
-            
-            # Store Q&A
-            last_question = (
-                session.conversation_history[-3].content 
-                if len(session.conversation_history) >= 3 
-                else "Initial question"
+        
+        # Store Q&A (skipping the answers that were answered with elaboration requests)
+        question_offset = 3 + 2 * session.elaboration_requests
+        has_question = len(session.conversation_history) >= question_offset
+        last_question = (
+            session.conversation_history[-question_offset].content 
+            if has_question 
+            else "Initial question"
+        )
+        
+        qa = QuestionAnswer(
+            question_number=question_idx + 1,
+            question=last_question,
+            answer=req.message,
+            ai_feedback=feedback,
+            prefiltered=verdict.reason if verdict is not None else None,
+            question_message_index=len(session.conversation_history) - question_offset if has_question else None,
+            answer_message_index=answer_message_index
+        )
+        
+        # Calculate score for this question
+        with tracer.span("evaluator.calculate_question_score"):
+            qa.score = get_evaluator().calculate_question_score(
+                req.message, feedback, question_idx + 1, total_questions,
+                ai_score=0 if verdict is not None else None
             )
-            
-            qa = QuestionAnswer(
-                question_number=question_idx + 1,
-                question=last_question,
-                answer=req.message,
-                ai_feedback=feedback
+        
+        # Flag answers copied from other candidates
+        with tracer.span("answer_index.check_and_add"):
+            duplicate_matches = get_answer_index().check_and_add(
+                _answer_key(session.session_id, current_round, question_idx + 1),
+                req.message,
+                owner=session.session_id
             )
+        if duplicate_matches:
+            qa.near_duplicate = True
+            qa.duplicate_matches = duplicate_matches
+        emit(
+            "question_scored", round=current_round, question_number=qa.question_number,
+            score=qa.score, near_duplicate=qa.near_duplicate
+        )
+        
+        round_data.questions.append(qa)
+        if _peer_nodes():
+            on_commit.append(lambda: get_duplicate_check_executor().submit(
+                _check_peer_duplicates, session.session_id, current_round, qa.question_number, req.message
+            ))
+        
+        # Add feedback to conversation
+        session.conversation_history.append(Message(
+            role="assistant",
+            content=feedback
+        ))
+        
+        # Index the answer and feedback for transcript search
+        feedback_message_index = len(session.conversation_history) - 1
+        qa.feedback_message_index = feedback_message_index
+        on_commit.append(lambda: get_transcript_index().index_message(
+            session.session_id, answer_message_index, "answer", current_round, req.message
+        ))
+        on_commit.append(lambda: get_transcript_index().index_message(
+            session.session_id, feedback_message_index, "feedback", current_round, feedback
+        ))
+        
+        # Move to next question
+        session.current_question += 1
+        session.elaboration_requests = 0
+        
+        # Check if round is complete
+        if session.current_question >= total_questions:
+            # Round complete - evaluate
+            question_scores = [qa.score for qa in round_data.questions]
+            with tracer.span("evaluator.calculate_round_score"):
+                round_score = get_evaluator().calculate_round_score(
+                    question_scores, round_spec.question_weights
+                )
+            round_data.round_score = round_score
             
-            # Calculate score for this question
-            qa.score = evaluator.calculate_question_score(
-                req.message, feedback, question_idx + 1, total_questions
+            # Determine pass/fail
+            passed, round_feedback = get_evaluator().determine_round_pass(
+                round_score, round_spec.pass_threshold
             )
-            
-            round_data.questions.append(qa)
-            
-            # Add feedback to conversation
-            session.conversation_history.append(Message(
-                role="assistant",
-                content=feedback
+            round_data.passed = passed
+            round_data.feedback = round_feedback
+            round_data.status = "completed" if passed else "failed"
+            emit(
+                "round_complete", round=current_round, round_score=round_score,
+                passed=passed, feedback=round_feedback
+            )
+            on_commit.append(lambda: get_cohort_analytics().record_round(
+                session.job_role, current_round, round_score, passed
             ))
             
-            # Move to next question
-            session.current_question += 1
-            
-            # Check if round is complete
-            if session.current_question >= total_questions:
-                # Round complete - evaluate
-                question_scores = [qa.score for qa in round_data.questions]
-                round_score = evaluator.calculate_round_score(question_scores, current_round)
-                round_data.round_score = round_score
+            if passed and not pipeline.is_last(current_round):
+                # Move to next round
+                session.current_round += 1
+                session.current_question = 0
+                
+                # Initialize next round
+                next_round_info = pipeline.round(session.current_round).info
+                next_round = RoundData(
+                    round_number=session.current_round,
+                    round_name=next_round_info['name'],
+                    status="in_progress"
+                )
+                session.rounds[session.current_round] = next_round
+                emit(
+                    "round_started", round=session.current_round, round_name=next_round.round_name,
+                    total_questions=next_round_info['questions_count']
+                )
                 
-                # Determine pass/fail
-                passed, round_feedback = evaluator.determine_round_pass(round_score, current_round)
-                round_data.passed = passed
-                round_data.feedback = round_feedback
-                round_data.status = "completed" if passed else "failed"
+                # Generate greeting for next round
+                next_greeting = get_groq_service().generate_greeting(
+                    session.job_role, 
+                    session.current_round, 
+                    next_round_info
+                )
                 
-                if passed and current_round < 3:
-                    # Move to next round
-                    session.current_round += 1
-                    session.current_question = 0
-                    
-                    # Initialize next round
-                    next_round_info = get_round_info(session.current_round)
-                    next_round = RoundData(
-                        round_number=session.current_round,
-                        round_name=next_round_info['name'],
-                        status="in_progress"
-                    )
-                    session.rounds[session.current_round] = next_round
-                    
-                    # Generate greeting for next round
-                    next_greeting = groq_service.generate_greeting(
-                        session.job_role, 
-                        session.current_round, 
-                        next_round_info
-                    )
-                    
-                    session.conversation_history.append(Message(
-                        role="assistant",
-                        content=f"\n\n{round_feedback}\n\n{next_greeting}"
-                    ))
-                    
-                    response = ChatResponse(
-                        session_id=session.session_id,
-                        ai_message=f"{feedback}\n\n{round_feedback}\n\n{next_greeting}",
-                        current_round=session.current_round,
-                        current_question=0,
-                        total_questions=next_round_info['questions_count'],
-                        round_complete=True,
-                        round_passed=True,
-                        round_feedback=round_feedback
-                    )
-                    
-                elif passed and current_round == 3:
-                    # All rounds complete - final evaluation
-                    round_scores = {
-                        round_num: round_data.round_score 
-                        for round_num, round_data in session.rounds.items()
-                    }
-                    final_eval = evaluator.calculate_final_evaluation(round_scores)
-                    
-                    session.final_evaluation = final_eval
-                    session.status = "completed"
-                    
-                    final_message = f"""{feedback}
+                session.conversation_history.append(Message(
+                    role="assistant",
+                    content=f"\n\n{round_feedback}\n\n{next_greeting}"
+                ))
+                
+                response = ChatResponse(
+                    session_id=session.session_id,
+                    ai_message=f"{feedback}\n\n{round_feedback}\n\n{next_greeting}",
+                    current_round=session.current_round,
+                    current_question=0,
+                    total_questions=next_round_info['questions_count'],
+                    round_complete=True,
+                    round_passed=True,
+                    round_feedback=round_feedback
+                )
+                
+            elif passed:
+                # All rounds complete - final evaluation
+                round_scores = {
+                    round_num: round_data.round_score 
+                    for round_num, round_data in session.rounds.items()
+                }
+                final_eval = get_evaluator().calculate_final_evaluation(
+                    round_scores, pipeline.final_weights
+                )
+                
+                session.final_evaluation = final_eval
+                emit("interview_complete", final_evaluation=final_eval)
+                session.status = "completed"
+                session.completed_at = datetime.now().isoformat()
+                on_commit.append(lambda: get_cohort_analytics().record_final(
+                    session.job_role, session.session_id, session.candidate_name, final_eval
+                ))
+                on_commit.append(lambda: get_transcript_index().update_session(
+                    session.session_id, status="completed"
+                ))
+                on_commit.append(lambda: get_report_jobs().enqueue(
+                    REPORT_JOB, session.session_id, report_payload(session)
+                ))
+                
+                final_message = f"""{feedback}
 
 {round_feedback}
 
-🎉 Congratulations! You've completed all three rounds of the interview.
+🎉 Congratulations! You've completed all {pipeline.total_rounds} rounds of the interview.
 
 Final Evaluation:
 - Overall Score: {final_eval['overall_score']:.1f}%
@@ -246,99 +1154,343 @@ Final Evaluation:
 {final_eval['summary']}
 
 Thank you for your time and effort in this interview process!"""
-                    
-                    session.conversation_history.append(Message(
-                        role="assistant",
-                        content=final_message
-                    ))
-                    
-                    response = ChatResponse(
-                        session_id=session.session_id,
-                        ai_message=final_message,
-                        current_round=current_round,
-                        current_question=session.current_question,
-                        total_questions=total_questions,
-                        round_complete=True,
-                        round_passed=True,
-                        interview_complete=True,
-                        round_feedback=round_feedback,
-                        final_evaluation=final_eval
-                    )
-                    
-                else:
-                    # Failed round - interview terminated
-                    session.status = "terminated"
-                    
-                    termination_message = f"""{feedback}
+                
+                session.conversation_history.append(Message(
+                    role="assistant",
+                    content=final_message
+                ))
+                
+                response = ChatResponse(
+                    session_id=session.session_id,
+                    ai_message=final_message,
+                    current_round=current_round,
+                    current_question=session.current_question,
+                    total_questions=total_questions,
+                    round_complete=True,
+                    round_passed=True,
+                    interview_complete=True,
+                    round_feedback=round_feedback,
+                    final_evaluation=final_eval
+                )
+                
+            else:
+                # Failed round - interview terminated
+                session.status = "terminated"
+                session.completed_at = datetime.now().isoformat()
+                on_commit.append(lambda: get_cohort_analytics().record_terminated(session.job_role))
+                on_commit.append(lambda: get_transcript_index().update_session(
+                    session.session_id, status="terminated"
+                ))
+                on_commit.append(lambda: get_report_jobs().enqueue(
+                    REPORT_JOB, session.session_id, report_payload(session)
+                ))
+                
+                termination_message = f"""{feedback}
 
 {round_feedback}
 
 Unfortunately, you did not meet the requirements to proceed to the next round. 
 
 Thank you for your time and interest. We encourage you to continue developing your skills and apply again in the future."""
-                    
-                    session.conversation_history.append(Message(
-                        role="assistant",
-                        content=termination_message
-                    ))
-                    
-                    response = ChatResponse(
-                        session_id=session.session_id,
-                        ai_message=termination_message,
-                        current_round=current_round,
-                        current_question=session.current_question,
-                        total_questions=total_questions,
-                        round_complete=True,
-                        round_passed=False,
-                        interview_complete=True,
-                        round_feedback=round_feedback
-                    )
-                
-                return jsonify(response.dict()), 200
-            
-            else:
-                # Ask next question
-                next_question = groq_service.ask_next_question(
-                    session.conversation_history,
-                    system_prompt,
-                    current_round,
-                    session.current_question,
-                    total_questions
-                )
                 
                 session.conversation_history.append(Message(
                     role="assistant",
-                    content=next_question
+                    content=termination_message
                 ))
                 
                 response = ChatResponse(
                     session_id=session.session_id,
-                    ai_message=f"{feedback}\n\n{next_question}",
+                    ai_message=termination_message,
                     current_round=current_round,
                     current_question=session.current_question,
                     total_questions=total_questions,
-                    round_complete=False
+                    round_complete=True,
+                    round_passed=False,
+                    interview_complete=True,
+                    round_feedback=round_feedback
                 )
-                
-                return jsonify(response.dict()), 200
+            
+            return response.dict(), 200
+        
+        else:
+            # Ask next question
+            next_question = get_groq_service().ask_next_question(
+                session.conversation_history,
+                system_prompt,
+                current_round,
+                session.current_question,
+                total_questions,
+                prompt_builder=get_prompt_builders().get(session.session_id)
+            )
+            
+            session.conversation_history.append(Message(
+                role="assistant",
+                content=next_question
+            ))
+            
+            response = ChatResponse(
+                session_id=session.session_id,
+                ai_message=f"{feedback}\n\n{next_question}",
+                current_round=current_round,
+                current_question=session.current_question,
+                total_questions=total_questions,
+                round_complete=False
+            )
+            
+            return response.dict(), 200
+
+    return {"error": "No question is awaiting an answer"}, 400
+
+
+def _submit_answer(session: InterviewSession, req: ChatRequest, idempotency_key,
+                   deadline: Deadline) -> Tuple[Dict, int, bool]:
+    """
+    Submit a candidate answer, shared by POST /api/chat and the WebSocket transport.
+    Serializes turns per session, replays retried idempotency keys and applies
+    admission control and the request deadline.
+    Returns: (response body, status code, whether the response was replayed)
+    """
+    tracer.current_span().set_attributes(
+        session_id=session.session_id,
+        round=session.current_round,
+        question=session.current_question
+    )
+    bind_context(
+        session_id=session.session_id,
+        round=session.current_round,
+        question=session.current_question
+    )
+    
+    # Turns for the same session run one at a time
+    with get_session_locks().hold(session.session_id):
+        if get_session_store().get(session.session_id) is not session:
+            # Handed to another worker while this turn waited for the lock
+            return {"error": "Session moved to another worker, please retry"}, 503, False
+        
+        if not session.conversation_history:
+            # Checked before the idempotency cache, so the retry after the greeting is processed
+            return {"error": "Interview greeting is not ready yet"}, 409, False
+        
+        if idempotency_key:
+            cached = get_idempotency_cache().get(session.session_id, idempotency_key, req.message)
+            if cached is not None:
+                body, status_code = cached
+                return body, status_code, True
+        
+        if get_drain_state().draining:
+            # The session has been handed off to the next process
+            return {"error": "Server is restarting, please retry"}, 503, False
         
+        # Answers that complete a round also trigger scoring and the next greeting
+        total_questions = _session_pipeline(session).round(session.current_round).questions_count
+        priority = (
+            Priority.TRANSITION if session.current_question >= total_questions - 1
+            else Priority.TURN
+        )
+        verdict = _prefilter_answer(session, req.message)
+        if verdict is not None and verdict.action == "elaborate":
+            # Answered locally, so it takes no admission slot from turns that call the LLM
+            with deadline_scope(deadline):
+                body, status_code = _run_chat_turn(session, req, verdict)
+        else:
+            with get_admission().admit(priority), deadline_scope(deadline):
+                body, status_code = _run_chat_turn(session, req, verdict)
+        
+        if get_drain_state().rolled_back(session.session_id):
+            # Handed off without this turn while it ran; the next process takes the resent answer
+            return {"error": "Server is restarting, please retry"}, 503, False
+        
+        if idempotency_key:
+            get_idempotency_cache().put(session.session_id, idempotency_key, req.message, body, status_code)
+        get_drain_state().turn_done(session.session_id)
+    
+    return body, status_code, False
+
+@api.route('/api/chat', methods=['POST'])
+def chat():
+    """
+    Handle chat messages during interview.
+    Expects: { "session_id": "string", "message": "string" }
+    Optional header: Idempotency-Key - replays of the same key return the original response
+    Returns: AI response and session status
+    """
+    try:
+        data = request.get_json()
+        req = ChatRequest(**data)
+        
+        # Get session
+        session = _find_session(req.session_id)
+        if not session:
+            return jsonify({"error": "Session not found"}), 404
+        
+        body, status_code, replayed = _submit_answer(
+            session, req, request.headers.get('Idempotency-Key'), _request_deadline()
+        )
+        if replayed:
+            response = jsonify(body)
+            response.headers['Idempotent-Replayed'] = 'true'
+            return response, status_code
+        
+        with tracer.span("encode"):
+            return jsonify(body), status_code
+        
+    except AdmissionRejected as e:
+        return _overloaded_response(e)
+    
+    except DeadlineExceeded as e:
+        return _deadline_response(e)
+    
+    except SessionBusyError as e:
+        return jsonify({"error": str(e)}), 409
+    
+    except IdempotencyConflictError as e:
+        return jsonify({"error": str(e)}), 422
+    
     except Exception as e:
-        print(f"Error in chat: {str(e)}")
+        logger.exception("Error in chat: %s", e)
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/session/<session_id>', methods=['GET'])
+@sock.route('/ws/interview/<session_id>', bp=api)
+def interview_socket(ws, session_id: str):
+    """
+    WebSocket transport for interview turns.
+    Query params: since - message index to resume from after a reconnect (default 0)
+    Client sends: { "type": "answer", "message": "string", "idempotency_key": "string" (optional),
+                    "timeout_ms": number (optional) } or { "type": "ping" }
+    Server sends: session and history on connect; token, question_scored, round_complete,
+                  round_started and interview_complete events while a turn runs; then turn or error
+    """
+    def send(event: Dict):
+        ws.send(json.dumps(event, default=str))
+    
+    session = _find_session(session_id)
+    if not session:
+        send({"type": "error", "status": 404, "error": "Session not found"})
+        return
+    
+    # Wait for a turn in flight so the replayed history is consistent
+    since = max(request.args.get('since', 0, type=int), 0)
+    with get_session_locks().hold(session_id):
+        send(_session_event(session))
+        send({
+            "type": "history",
+            "since": since,
+            "messages": [
+                {"index": index, **message.dict()}
+                for index, message in enumerate(session.conversation_history[since:], start=since)
+            ]
+        })
+    
+    idle_timeout = current_app.config['WS_IDLE_TIMEOUT_SECONDS']
+    while True:
+        raw = ws.receive(timeout=idle_timeout)
+        if raw is None:
+            return
+        
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            send({"type": "error", "status": 400, "error": "Messages must be JSON"})
+            continue
+        
+        if data.get('type') == 'ping':
+            send({"type": "pong"})
+        elif data.get('type') == 'answer':
+            if not _socket_turn(ws, send, session, data):
+                return
+        else:
+            send({"type": "error", "status": 400, "error": "Unknown message type"})
+
+def _session_event(session: InterviewSession) -> Dict:
+    """Current progress of a session, sent when a socket (re)connects."""
+    return {
+        "type": "session",
+        "session_id": session.session_id,
+        "status": session.status,
+        "current_round": session.current_round,
+        "current_question": session.current_question,
+        "total_questions": _session_pipeline(session).round(session.current_round).questions_count,
+        "message_index": len(session.conversation_history)
+    }
+
+def _socket_turn(ws, send: Callable[[Dict], None], session: InterviewSession, data: Dict) -> bool:
+    """
+    Run one turn received over a WebSocket, streaming its events to the client.
+    Returns: False if the client went away and the socket should be closed
+    """
+    def send_event(event: Dict):
+        try:
+            send(event)
+        except ConnectionClosed:
+            # The deadline's disconnect probe cancels the turn
+            pass
+    
+    try:
+        req = ChatRequest(session_id=session.session_id, message=data.get('message'))
+    except ValidationError:
+        send({"type": "error", "status": 400, "error": "Field 'message' is required"})
+        return True
+    
+    deadline = Deadline(_deadline_budget(data.get('timeout_ms')), lambda: not ws.connected)
+    try:
+        with event_scope(send_event), tracer.span("ws.turn"):
+            body, status_code, replayed = _submit_answer(
+                session, req, data.get('idempotency_key'), deadline
+            )
+    
+    except ClientDisconnected:
+        return False
+    
+    except AdmissionRejected as e:
+        send({"type": "error", "status": 429, "error": str(e), "retry_after": e.retry_after})
+    
+    except DeadlineExceeded as e:
+        send({"type": "error", "status": 504, "error": str(e)})
+    
+    except SessionBusyError as e:
+        send({"type": "error", "status": 409, "error": str(e)})
+    
+    except IdempotencyConflictError as e:
+        send({"type": "error", "status": 422, "error": str(e)})
+    
+    except Exception as e:
+        logger.exception("Error in WebSocket turn: %s", e)
+        send({"type": "error", "status": 500, "error": str(e)})
+    
+    else:
+        send({
+            "type": "turn",
+            "status": status_code,
+            "replayed": replayed,
+            "message_index": len(session.conversation_history),
+            "response": body
+        })
+    
+    return True
+
+@api.route('/api/session/<session_id>', methods=['GET'])
 def get_session(session_id: str):
-    """Get current session status."""
-    session = active_sessions.get(session_id)
+    """
+    Get current session status.
+    Query params: fields (comma-separated, dotted paths, e.g. status,rounds.round_score),
+                  dedupe (true to replace round Q&A texts with conversation_history indices)
+    """
+    session = _find_session(session_id)
     if not session:
         return jsonify({"error": "Session not found"}), 404
     
-    return jsonify(session.dict()), 200
+    try:
+        include = parse_fields(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    dedupe = request.args.get('dedupe', 'false').lower() in ('1', 'true', 'yes')
+    return jsonify(session_payload(session, include, dedupe)), 200
 
-@app.route('/api/session/<session_id>/history', methods=['GET'])
+@api.route('/api/session/<session_id>/history', methods=['GET'])
 def get_conversation_history(session_id: str):
     """Get conversation history for a session."""
-    session = active_sessions.get(session_id)
+    session = _find_session(session_id)
     if not session:
         return jsonify({"error": "Session not found"}), 404
     
@@ -347,6 +1499,691 @@ def get_conversation_history(session_id: str):
         "history": [msg.dict() for msg in session.conversation_history]
     }), 200
 
+@api.route('/api/session/<session_id>/report', methods=['GET', 'POST'])
+def session_report(session_id: str):
+    """
+    Get the detailed report of a finished interview, generated in the background.
+    GET query params: wait (seconds to wait for a pending report, up to 30)
+    POST queues a new report for a finished session still in memory
+    Returns: 200 with the report when done, 202 while it is queued or running
+    """
+    if request.method == 'POST':
+        session = _find_session(session_id)
+        if not session:
+            return jsonify({"error": "Session not found"}), 404
+        if session.status == "active":
+            return jsonify({"error": "Interview is still active"}), 400
+        get_report_jobs().enqueue(REPORT_JOB, session_id, report_payload(session))
+    
+    wait = min(max(request.args.get('wait', 0, type=float), 0), MAX_REPORT_WAIT_SECONDS)
+    if wait:
+        job = get_report_jobs().wait(REPORT_JOB, session_id, wait)
+    else:
+        job = get_report_jobs().latest(REPORT_JOB, session_id)
+    if job is None:
+        return jsonify({"error": "No report for this session"}), 404
+    
+    return jsonify({
+        "session_id": session_id,
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "attempts": job["attempts"],
+        "error": job["error"],
+        "report": job["result"]
+    }), 200 if job["status"] in ("done", "failed") else 202
+
+@api.route('/api/internal/sessions', methods=['POST'])
+def import_sessions():
+    """
+    Take over sessions handed over by another shard worker.
+    Expects: { "sessions": [session, ...] } and the admin token
+    """
+    if not _is_admin_request():
+        return jsonify({"error": "Admin token required"}), 403
+    
+    try:
+        sessions = [InterviewSession(**data) for data in (request.get_json(silent=True) or {}).get('sessions', [])]
+    except (ValidationError, TypeError):
+        return jsonify({"error": "Field 'sessions' must be a list of sessions"}), 400
+    for session in sessions:
+        _register_session(session)
+    
+    return jsonify({"imported": len(sessions)}), 200
+
+@api.route('/api/internal/sessions/<session_id>/release', methods=['POST'])
+def release_session(session_id: str):
+    """
+    Hand a session to the shard worker that now owns it; it is removed here.
+    Requires the admin token. Returns: the full session
+    """
+    if not _is_admin_request():
+        return jsonify({"error": "Admin token required"}), 403
+    
+    session = _release_session(session_id)
+    if not session:
+        return jsonify({"error": "Session not found"}), 404
+    return jsonify(session.dict()), 200
+
+@api.route('/api/internal/answers/similar', methods=['POST'])
+def similar_answers():
+    """
+    Find near-duplicates of another worker's answer among this worker's sessions.
+    Expects: { "text": str, "owner": session ID to skip, "limit": int } and the admin token
+    """
+    if not _is_admin_request():
+        return jsonify({"error": "Admin token required"}), 403
+    
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data.get('text'), str):
+        return jsonify({"error": "Field 'text' must be a string"}), 400
+    matches = get_answer_index().query(
+        data['text'], exclude_owner=data.get('owner'), limit=int(data.get('limit', MAX_DUPLICATE_MATCHES))
+    )
+    return jsonify({"matches": matches}), 200
+
+@api.route('/api/internal/search/statistics', methods=['POST'])
+def search_statistics():
+    """
+    Get this worker's transcript statistics for a search answered by another worker.
+    Expects: { "query": str } and the admin token
+    """
+    if not _is_admin_request():
+        return jsonify({"error": "Admin token required"}), 403
+    
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data.get('query'), str):
+        return jsonify({"error": "Field 'query' must be a string"}), 400
+    return jsonify(get_transcript_index().term_statistics(data['query'])), 200
+
+@api.route('/api/internal/search', methods=['POST'])
+def search_local_transcripts():
+    """
+    Search this worker's transcripts for a search answered by another worker.
+    Expects: { "query": str, "statistics": cluster-wide statistics, "limit": int,
+               "job_role", "round_number", "status" filters } and the admin token
+    """
+    if not _is_admin_request():
+        return jsonify({"error": "Admin token required"}), 403
+    
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data.get('query'), str) or not isinstance(data.get('statistics'), dict):
+        return jsonify({"error": "Fields 'query' and 'statistics' are required"}), 400
+    hits = get_transcript_index().search(
+        data['query'],
+        job_role=data.get('job_role'),
+        round_number=data.get('round_number'),
+        status=data.get('status'),
+        limit=int(data.get('limit', 20)),
+        statistics=data['statistics']
+    )
+    return jsonify({"results": hits}), 200
+
+@api.route('/api/internal/sessions/finished', methods=['POST'])
+def finished_sessions():
+    """
+    Get this worker's finished sessions for an export answered by another worker.
+    Expects: { "since": ISO timestamp or null, "until": ISO timestamp or null } and the admin token
+    """
+    if not _is_admin_request():
+        return jsonify({"error": "Admin token required"}), 403
+    
+    data = request.get_json(silent=True) or {}
+    sessions = _finished_sessions(data.get('since'), data.get('until'))
+    return jsonify({"sessions": [session.dict() for session in sessions]}), 200
+
+@api.route('/api/sessions/status', methods=['GET', 'POST'])
+def get_sessions_status():
+    """
+    Get compact status records for many sessions in one call.
+    POST expects: { "session_ids": ["uuid", ...] }
+    GET query params: ids (comma-separated), or job_role / status filters, limit
+    Returns: current round/question, status, latest round score and final batch per session
+    """
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        session_ids = data.get('session_ids')
+        if not isinstance(session_ids, list):
+            return jsonify({"error": "Field 'session_ids' must be a list"}), 400
+    else:
+        ids = request.args.get('ids')
+        session_ids = [sid for sid in ids.split(',') if sid] if ids else None
+    
+    if session_ids is not None:
+        if len(session_ids) > MAX_BATCH_STATUS_IDS:
+            return jsonify({"error": f"At most {MAX_BATCH_STATUS_IDS} session IDs per request"}), 400
+        summaries, missing = get_session_summaries().get_many(session_ids)
+        body = {}
+        if missing and _fans_out():
+            # Only the sessions this worker does not have are looked up elsewhere
+            responses, unreachable = _gather('/api/sessions/status', {"session_ids": missing})
+            found = {
+                summary["session_id"]: summary
+                for response in responses.values() if response for summary in response["sessions"]
+            }
+            found.update((summary["session_id"], summary) for summary in summaries)
+            summaries = [found[sid] for sid in session_ids if sid in found]
+            missing = [sid for sid in session_ids if sid not in found]
+            body["unreachable_nodes"] = unreachable
+        return jsonify({"count": len(summaries), "sessions": summaries, "missing": missing, **body}), 200
+    
+    limit = min(max(request.args.get('limit', 200, type=int), 1), MAX_BATCH_STATUS_IDS)
+    summaries = get_session_summaries().filter(
+        job_role=request.args.get('job_role'),
+        status=request.args.get('status'),
+        limit=limit
+    )
+    body = {}
+    if _fans_out():
+        responses, body["unreachable_nodes"] = _gather(request.full_path)
+        parts = [summaries] + [response["sessions"] for response in responses.values() if response]
+        summaries = merge_ranked(parts, "created_at", limit)
+    return jsonify({"count": len(summaries), "sessions": summaries, **body}), 200
+
+def _provider_stats() -> Optional[Dict]:
+    """Health and latency of the LLM providers (None when none is configured)."""
+    try:
+        return get_groq_service().providers.stats()
+    except ValueError:
+        return None
+
+@api.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """
+    Get runtime metrics for load shedding, caches and indexes.
+    In sharded mode: the metrics of every worker under "nodes", and the total active sessions.
+    """
+    metrics = _local_metrics()
+    if not _fans_out():
+        return jsonify(metrics), 200
+    
+    responses, unreachable = _gather('/api/metrics')
+    nodes = {_shard_node(): metrics, **{node: response for node, response in responses.items() if response}}
+    return jsonify({
+        "active_sessions": sum(node_metrics["active_sessions"] for node_metrics in nodes.values()),
+        "nodes": nodes,
+        "unreachable_nodes": unreachable
+    }), 200
+
+def _local_metrics() -> Dict:
+    """Runtime metrics of this process."""
+    return {
+        "active_sessions": len(get_session_store()),
+        "session_locks": len(get_session_locks()),
+        "admission": get_admission().stats(),
+        "idempotency": get_idempotency_cache().stats(),
+        "duplicate_index": get_answer_index().stats(),
+        "search_index": get_transcript_index().stats(),
+        "tracing": tracer.stats(),
+        "rounds": default_registry().stats(),
+        "prompt_prefix": get_prompt_builders().snapshot(),
+        "reports": get_report_jobs().stats(),
+        "sharding": get_shard_membership().stats() if get_shard_membership() else None,
+        "drain": get_drain_state().stats(),
+        "answer_prefilter": get_answer_prefilter().stats(),
+        "shared_cache": default_shared_cache().stats() if default_shared_cache() else None,
+        "llm_providers": _provider_stats(),
+        "logging": {"dropped_records": dropped_records()}
+    }
+
+@api.route('/api/admin/profile', methods=['GET', 'POST'])
+def admin_profile():
+    """
+    Inspect or start a sampling profile of the hot routes.
+    POST expects: { "seconds": number } or { "requests": number }, optional "interval_ms"
+    Returns: profiler status, including the last collapsed-stack file written
+    """
+    if not _is_admin_request():
+        return jsonify({"error": "Admin token required"}), 403
+    
+    if request.method == 'GET':
+        return jsonify(get_sampling_profiler().status()), 200
+    
+    data = request.get_json(silent=True) or {}
+    interval_ms = data.get('interval_ms')
+    if interval_ms is not None and (isinstance(interval_ms, bool) or not isinstance(interval_ms, (int, float))
+                                    or interval_ms <= 0):
+        return jsonify({"error": "Field 'interval_ms' must be a positive number"}), 400
+    try:
+        status = get_sampling_profiler().arm(
+            seconds=data.get('seconds'),
+            requests=data.get('requests'),
+            interval=interval_ms / 1000 if interval_ms is not None else None
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 409
+    
+    return jsonify(status), 202
+
+def _handoff_path() -> str:
+    """File sessions are handed to the next process through."""
+    return os.getenv('HANDOFF_PATH', 'handoff.json')
+
+def _handoff_snapshot(session: InterviewSession) -> Dict:
+    """Serialized state of a session whose turn is still running, as it was before that turn."""
+    checkpoint = _turn_checkpoints.get(session.session_id)
+    if checkpoint is None:
+        # The turn holds the lock but has not started changing the session yet
+        checkpoint = TurnCheckpoint(session)
+    return checkpoint.session_data(session)
+
+def drain_and_handoff(timeout: Optional[float] = None) -> Dict:
+    """
+    Stop taking new work and hand all sessions to the next process.
+    New interviews and turns are refused from now on; turns in flight get until the
+    timeout to finish. Sessions whose turn is still running then are handed off as they
+    were before that turn, so the candidate can resend the answer. Bulk-created sessions
+    still waiting for their greeting are handed off too; the next process greets them.
+    Safe to call from a gunicorn worker_exit hook.
+    Returns: counts of sessions written to the handoff file
+    """
+    if timeout is None:
+        timeout = float(os.getenv('DRAIN_TIMEOUT_SECONDS', 30))
+    path = _handoff_path()
+    with _handoff_lock:
+        if not get_drain_state().start():
+            logger.warning("Drain already started; writing the handoff again")
+    # A replacement already running holds requests for these sessions until they arrive
+    announce_handoff(path, timeout + HANDOFF_WRITE_GRACE_SECONDS)
+    deadline = time.monotonic() + timeout
+    
+    drain_state = get_drain_state()
+    sessions, rolled_back, awaiting_greeting, failed = [], 0, 0, 0
+    for session_id, session in list(get_session_store().items()):
+        try:
+            try:
+                with get_session_locks().hold(session_id, timeout=max(deadline - time.monotonic(), 0)):
+                    sessions.append(session.dict())
+                    if not session.conversation_history:
+                        awaiting_greeting += 1
+            except SessionBusyError:
+                if drain_state.mark_rolled_back(session_id):
+                    # The running turn is answered with 503 once it finishes, so it gets resent
+                    sessions.append(_handoff_snapshot(session))
+                    rolled_back += 1
+                else:
+                    # The turn has finished and is being answered; its result goes along
+                    sessions.append(session.dict())
+        except Exception as e:
+            # One broken session must not cost the others their handoff
+            logger.exception("Could not hand off session: %s", e, extra={"session_id": session_id})
+            failed += 1
+    
+    handed_off = {session["session_id"] for session in sessions}
+    idempotency = [entry for entry in get_idempotency_cache().export() if entry["session_id"] in handed_off]
+    write_handoff(path, sessions, idempotency)
+    # No new turns run here any more; sessions stay stored only to replay cached answers
+    for session_id in handed_off:
+        get_prompt_builders().discard(session_id)
+    
+    result = {"sessions": len(sessions), "rolled_back": rolled_back, "awaiting_greeting": awaiting_greeting,
+              "failed": failed, "path": path}
+    logger.info("Sessions handed off", extra=result)
+    return result
+
+def _load_handoff() -> int:
+    """
+    Take over the sessions handed off by the previous process, if any.
+    Returns: number of sessions loaded
+    """
+    with _handoff_lock:
+        if get_drain_state().draining:
+            # Never take back this process's own handoff
+            return 0
+        state = claim_handoff(_handoff_path())
+        if state is None:
+            return 0
+        
+        loaded, awaiting_greeting = 0, []
+        for data in state["sessions"]:
+            try:
+                session = InterviewSession(**data)
+            except ValidationError as e:
+                logger.error("Invalid session in handoff file: %s", e)
+                continue
+            _register_session(session)
+            loaded += 1
+            if not session.conversation_history:
+                awaiting_greeting.append(session)
+        get_idempotency_cache().load(state["idempotency"])
+    
+    _greet_handed_off(awaiting_greeting)
+    logger.info("Handed-off sessions loaded", extra={"sessions": loaded, "awaiting_greeting": len(awaiting_greeting)})
+    return loaded
+
+def _greet_handed_off(sessions: List[InterviewSession]):
+    """Generate the greetings of bulk-created sessions that were handed off before theirs was ready."""
+    groups: Dict[Tuple[str, Optional[str], Optional[str]], List[InterviewSession]] = {}
+    for session in sessions:
+        groups.setdefault((session.job_role, session.config_version, session.pipeline), []).append(session)
+    budget = float(os.getenv('REQUEST_DEADLINE_SECONDS', 60))
+    for (job_role, config_version, pipeline_name), group in groups.items():
+        pipeline = default_registry().config(config_version).pipeline(pipeline_name)
+        get_greeting_executor().submit(_bulk_greeting, str(uuid.uuid4()), job_role, pipeline, group, budget)
+
+def _await_handoff(session_id: str) -> Optional[InterviewSession]:
+    """
+    Hold a request for a session this process does not have while a draining process
+    is writing its handoff, then load the handoff and look the session up again.
+    """
+    while handoff_pending(_handoff_path()):
+        time.sleep(HANDOFF_POLL_SECONDS)
+    _load_handoff()
+    return get_session_store().get(session_id)
+
+def _watch_handoff(interval: float):
+    """Load handoff files written after startup, by a process replaced while this one runs."""
+    while True:
+        time.sleep(interval)
+        try:
+            _load_handoff()
+        except Exception as e:
+            logger.exception("Could not load handoff file: %s", e)
+
+@api.route('/api/admin/drain', methods=['GET', 'POST'])
+def admin_drain():
+    """
+    Inspect or start a drain ahead of a restart.
+    POST expects: { "timeout_seconds": number } (optional) and writes the handoff file
+    Returns: drain status, and on POST the counts of handed-off sessions
+    """
+    if not _is_admin_request():
+        return jsonify({"error": "Admin token required"}), 403
+    
+    if request.method == 'GET':
+        return jsonify(get_drain_state().stats()), 200
+    
+    timeout = (request.get_json(silent=True) or {}).get('timeout_seconds')
+    if timeout is not None and (not isinstance(timeout, (int, float)) or timeout < 0):
+        return jsonify({"error": "Field 'timeout_seconds' must be a non-negative number"}), 400
+    try:
+        result = drain_and_handoff(timeout)
+    except OSError as e:
+        logger.exception("Error writing handoff: %s", e)
+        return jsonify({"error": str(e)}), 500
+    
+    return jsonify({**get_drain_state().stats(), "handoff": result}), 200
+
+def _session_footprint(session: InterviewSession) -> Dict:
+    """Estimated bytes held by a session, including its cached prompt messages."""
+    builders = get_prompt_builders()
+    builder = builders.peek(session.session_id)
+    return session_footprint(
+        session,
+        extra={"prompt_builder": builder} if builder is not None else None,
+        shared=(builders.stats,)
+    )
+
+@api.route('/api/admin/memory', methods=['GET'])
+def admin_memory():
+    """
+    Estimate the memory held by sessions.
+    Query params: session_id - report a single session; top - largest sessions listed (default 10)
+    Returns: process RSS, bytes per part (history, rounds, final_evaluation, other, prompt_builder)
+    summed over sessions, and the largest sessions
+    """
+    if not _is_admin_request():
+        return jsonify({"error": "Admin token required"}), 403
+    
+    session_id = request.args.get('session_id')
+    if session_id:
+        session = get_session_store().get(session_id)
+        if not session:
+            return jsonify({"error": "Session not found"}), 404
+        return jsonify(_session_footprint(session)), 200
+    
+    top = min(max(request.args.get('top', 10, type=int), 0), MAX_BATCH_STATUS_IDS)
+    started = time.perf_counter()
+    footprints = [_session_footprint(session) for session in list(get_session_store().values())]
+    return jsonify({
+        "process": process_memory(),
+        "sessions": aggregate_footprints(footprints, top=top),
+        "tracemalloc": get_allocation_tracer().status(),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+    }), 200
+
+@api.route('/api/admin/memory/snapshot', methods=['POST'])
+def admin_memory_snapshot():
+    """
+    Take a tracemalloc snapshot and diff it against the previous one.
+    The first call starts tracing. Expects (all optional): { "frames": number, "limit": number,
+    "group_by": "lineno" | "filename" | "traceback", "stop": bool }
+    Returns: tracing status and the call sites that allocated the most since the previous snapshot
+    """
+    if not _is_admin_request():
+        return jsonify({"error": "Admin token required"}), 403
+    
+    data = request.get_json(silent=True) or {}
+    allocations = get_allocation_tracer()
+    if data.get('stop'):
+        return jsonify(allocations.stop()), 200
+    
+    frames, limit = data.get('frames', 10), data.get('limit', 20)
+    if not all(isinstance(value, int) and value > 0 for value in (frames, limit)):
+        return jsonify({"error": "Fields 'frames' and 'limit' must be positive integers"}), 400
+    try:
+        result = allocations.snapshot(frames=frames, limit=limit, group_by=data.get('group_by', 'lineno'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return jsonify(result), 200
+
+@api.route('/api/analytics/roles', methods=['GET'])
+def get_analytics_roles():
+    """List job roles with interview counts."""
+    roles = get_cohort_analytics().job_roles()
+    if _fans_out():
+        responses, _ = _gather(request.full_path)
+        roles = merge_role_counts([roles] + [response["roles"] for response in responses.values() if response])
+    return jsonify({"roles": roles}), 200
+
+@api.route('/api/analytics/<job_role>', methods=['GET'])
+def get_role_analytics(job_role: str):
+    """Get pass rates, batch distribution and score histograms for a job role."""
+    stats = get_cohort_analytics().role_stats(job_role)
+    if _fans_out():
+        responses, _ = _gather(request.full_path)
+        stats = merge_role_stats([stats] + list(responses.values()))
+    if stats is None:
+        return jsonify({"error": "No interviews recorded for this job role"}), 404
+    
+    return jsonify(stats), 200
+
+@api.route('/api/analytics/<job_role>/leaderboard', methods=['GET'])
+def get_role_leaderboard(job_role: str):
+    """Get the top-k completed interviews for a job role by overall score."""
+    k = min(max(request.args.get('k', 10, type=int), 1), 100)
+    leaderboard = get_cohort_analytics().leaderboard(job_role, k)
+    if _fans_out():
+        responses, _ = _gather(request.full_path)
+        leaderboard = merge_leaderboards(
+            [leaderboard] + [response["leaderboard"] for response in responses.values() if response], k
+        )
+    
+    return jsonify({
+        "job_role": job_role,
+        "leaderboard": leaderboard
+    }), 200
+
+@api.route('/api/search', methods=['GET'])
+def search_transcripts():
+    """
+    Search candidate answers and AI feedback across all sessions.
+    Query params: q (required), job_role, round, status, limit
+    Returns: ranked session hits with snippets
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({"error": "Query parameter 'q' is required"}), 400
+    
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+    filters = {
+        "job_role": request.args.get('job_role'),
+        "round_number": request.args.get('round', type=int),
+        "status": request.args.get('status')
+    }
+    index = get_transcript_index()
+    if not _fans_out():
+        hits = index.search(query, limit=limit, **filters)
+        return jsonify({"query": query, "count": len(hits), "results": hits}), 200
+    
+    # BM25 weights depend on corpus statistics; every worker scores with those
+    # of all workers together so that their scores can be merged
+    responses, unreachable = _gather('/api/internal/search/statistics', {"query": query})
+    statistics = merge_term_statistics(
+        [index.term_statistics(query)] + [response for response in responses.values() if response]
+    )
+    hits = index.search(query, limit=limit, statistics=statistics, **filters)
+    responses, unreachable_search = _gather('/api/internal/search', {
+        "query": query, "limit": limit, "statistics": statistics, **filters
+    })
+    hits = merge_ranked([hits] + [response["results"] for response in responses.values() if response],
+                        "score", limit)
+    unreachable = sorted(set(unreachable) | set(unreachable_search))
+    
+    return jsonify({
+        "query": query, "count": len(hits), "results": hits, "unreachable_nodes": unreachable
+    }), 200
+
+def _finished_sessions(since: Optional[str], until: Optional[str] = None) -> List[InterviewSession]:
+    """Sessions of this worker that finished after since and no later than until, oldest first."""
+    from exporter import FINISHED_STATUSES
+    
+    return sorted(
+        (
+            session for session in list(get_session_store().values())
+            if session.status in FINISHED_STATUSES and session.completed_at
+            and (since is None or session.completed_at > since)
+            and (until is None or session.completed_at <= until)
+        ),
+        key=lambda session: session.completed_at
+    )
+
+@api.route('/api/export/<table>', methods=['GET'])
+def export_table(table: str):
+    """
+    Stream finished sessions as one flattened analytics table.
+    Tables: sessions, rounds, question_answers
+    Query params: format (parquet, arrow, csv), since (ISO completion timestamp),
+    until (inclusive upper bound, e.g. the watermark of another table of the same export)
+    """
+    from exporter import TABLES, MIME_TYPES, FILE_EXTENSIONS, resolve_format, stream_table
+    
+    if table not in TABLES:
+        return jsonify({"error": f"Unknown table. Expected one of: {', '.join(TABLES)}"}), 404
+    
+    try:
+        export_format = resolve_format(request.args.get('format', 'parquet'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    since = request.args.get('since')
+    until = request.args.get('until')
+    # (completion time, serializer): local sessions are serialized lazily as each batch is written
+    finished = [(session.completed_at, session.dict) for session in _finished_sessions(since, until)]
+    if _fans_out():
+        responses, unreachable = _gather('/api/internal/sessions/finished', {"since": since, "until": until})
+        if unreachable:
+            # A watermark past sessions that were not exported would skip them for good
+            return jsonify({"error": "Shard workers unavailable", "unreachable_nodes": unreachable}), 503
+        finished += [
+            (data["completed_at"], lambda data=data: data)
+            for response in responses.values() for data in response["sessions"]
+        ]
+        finished.sort(key=lambda item: item[0])
+    watermark = finished[-1][0] if finished else (since if until is None else until)
+    
+    chunks = stream_table((serialize() for _, serialize in finished), table, export_format)
+    
+    return Response(
+        stream_with_context(chunks),
+        mimetype=MIME_TYPES[export_format],
+        headers={
+            "Content-Disposition": f"attachment; filename={table}.{FILE_EXTENSIONS[export_format]}",
+            "X-Export-Format": export_format,
+            "X-Export-Watermark": watermark or "",
+            "X-Export-Sessions": str(len(finished))
+        }
+    )
+
+def start_shared_cache_publisher() -> SharedCachePublisher:
+    """
+    Publish the shared cache region (SHARED_CACHE_PATH) and keep it current.
+    Meant for the process that forks the workers, e.g. a gunicorn when_ready hook:
+    it holds its own round registry, so the workers' registries are not touched.
+    Returns: the running publisher
+    """
+    from dotenv import load_dotenv
+    
+    load_dotenv()
+    path = os.getenv('SHARED_CACHE_PATH')
+    if not path:
+        raise ValueError("SHARED_CACHE_PATH not found in environment variables")
+    interval = float(os.getenv('ROUNDS_RELOAD_INTERVAL', 2))
+    registry = RoundRegistry(os.getenv('ROUNDS_CONFIG', DEFAULT_CONFIG_PATH), reload_interval=interval)
+    # Common roles outside the config are published too, so workers start with their prompts
+    roles = [role.strip() for role in os.getenv('SHARED_CACHE_ROLES', '').split(',') if role.strip()]
+    
+    def build():
+        config = registry.current()
+        return {"rounds_version": config.version}, config.shared_entries(roles)
+    
+    publisher = SharedCachePublisher(path, build, interval=interval)
+    publisher.start()
+    return publisher
+
+def create_app() -> Flask:
+    """
+    Build the Flask application.
+    Environment, logging and tracing are configured here rather than at import
+    time; services are constructed lazily on first use.
+    """
+    started = time.perf_counter()
+    
+    from dotenv import load_dotenv
+    from flask_cors import CORS
+    
+    load_dotenv()
+    setup_logging()
+    tracer.configure_from_env()
+    if _shard_node() and not os.getenv('ADMIN_TOKEN'):
+        # Calls between shard workers would all be refused with 403
+        raise ShardConfigError("SHARD_NODE is set but ADMIN_TOKEN is not; shard workers authenticate with it")
+    # Fail fast on an invalid round config instead of on the first interview
+    default_registry()
+    # Sessions from the previous process are in place before any request arrives
+    _load_handoff()
+    handoff_watch_interval = float(os.getenv('HANDOFF_WATCH_INTERVAL', 0))
+    if handoff_watch_interval > 0:
+        # Rolling restarts: the old process drains after this one has started
+        threading.Thread(
+            target=_watch_handoff, args=(handoff_watch_interval,), name="handoff-watcher", daemon=True
+        ).start()
+    # Report jobs queued or leased by a crashed or replaced process resume right away
+    get_report_jobs()
+    
+    app = Flask(__name__)
+    app.config.update(
+        ADMIN_TOKEN=os.getenv('ADMIN_TOKEN'),
+        # Time budget for LLM-backed requests; clients may ask for less via X-Request-Timeout-Ms
+        REQUEST_DEADLINE_SECONDS=float(os.getenv('REQUEST_DEADLINE_SECONDS', 60)),
+        # Smaller responses are not worth compressing
+        COMPRESSION_MIN_BYTES=int(os.getenv('COMPRESSION_MIN_BYTES', 1024)),
+        # Idle WebSocket connections are closed so they do not pin worker threads
+        WS_IDLE_TIMEOUT_SECONDS=float(os.getenv('WS_IDLE_TIMEOUT_SECONDS', 300))
+    )
+    CORS(app)
+    app.register_blueprint(api)
+    
+    if hasattr(signal, 'SIGUSR2') and threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGUSR2, _profile_on_signal)
+    
+    logger.info("Application created", extra={
+        "startup_ms": round((time.perf_counter() - started) * 1000, 1)
+    })
+    return app
+
 if __name__ == '__main__':
     port = int(os.getenv('PORT', 5000))
-    app.run(host='0.0.0.0', port=port, debug=True)
+    create_app().run(host='0.0.0.0', port=port, debug=True)
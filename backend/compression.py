@@ -0,0 +1,79 @@
+"""
+Negotiated gzip/brotli compression of API responses.
+
+Brotli is used when the client accepts it and the optional `brotli` package
+is installed; gzip otherwise. Small bodies and streamed responses (exports,
+WebSockets) are sent as-is.
+"""
+
+import gzip
+from typing import Optional
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {"application/json", "text/plain", "text/csv", "text/html"}
+
+# Fast settings: most payloads are small JSON documents served on the request path
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def choose_encoding(accept_encodings) -> Optional[str]:
+    """
+    Pick the content coding for a response.
+
+    Args:
+        accept_encodings: Parsed Accept-Encoding header (werkzeug Accept)
+
+    Returns:
+        "br", "gzip" or None to send the body uncompressed
+    """
+    br_quality = accept_encodings.quality("br") if brotli is not None else 0
+    gzip_quality = accept_encodings.quality("gzip")
+    if br_quality <= 0 and gzip_quality <= 0:
+        return None
+    return "br" if br_quality >= gzip_quality else "gzip"
+
+
+def compress_response(response, accept_encodings, min_size: int = 1024):
+    """
+    Compress a response body in place when it is worth it.
+
+    Args:
+        response: Flask response
+        accept_encodings: Parsed Accept-Encoding header of the request
+        min_size: Bodies smaller than this many bytes are left uncompressed
+
+    Returns:
+        The same response
+    """
+    if (
+        response.direct_passthrough
+        or response.is_streamed
+        or response.status_code < 200
+        or response.status_code in (204, 304)
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    body = response.get_data()
+    if len(body) < min_size:
+        return response
+
+    encoding = choose_encoding(accept_encodings)
+    if encoding is None:
+        return response
+
+    if encoding == "br":
+        compressed = brotli.compress(body, quality=BROTLI_QUALITY)
+    else:
+        compressed = gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+    response.set_data(compressed)
+    response.headers["Content-Encoding"] = encoding
+    return response
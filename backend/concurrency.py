@@ -0,0 +1,241 @@
+"""
+Per-session turn serialization, idempotent replay and rollback of chat turns.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from models import InterviewSession
+
+
+class SessionBusyError(Exception):
+    """Raised when a session lock cannot be acquired in time."""
+
+
+class IdempotencyConflictError(Exception):
+    """Raised when an idempotency key is reused with a different request body."""
+
+
+class SessionLockRegistry:
+    """Hands out one lock per session so turns for a session run one at a time."""
+
+    def __init__(self, timeout: float = 120.0):
+        """
+        Args:
+            timeout: Seconds to wait for a session's lock before giving up
+        """
+        self.timeout = timeout
+        # session_id -> [lock, turns holding or waiting for it, discarded]
+        self._locks: Dict[str, list] = {}
+        self._registry_lock = threading.Lock()
+
+    def _enter(self, session_id: str) -> list:
+        with self._registry_lock:
+            entry = self._locks.get(session_id)
+            if entry is None:
+                entry = self._locks[session_id] = [threading.Lock(), 0, False]
+            entry[1] += 1
+            return entry
+
+    def _leave(self, session_id: str, entry: list):
+        with self._registry_lock:
+            entry[1] -= 1
+            if entry[1] == 0 and entry[2] and self._locks.get(session_id) is entry:
+                del self._locks[session_id]
+
+    @contextmanager
+    def hold(self, session_id: str, timeout: Optional[float] = None) -> Iterator[None]:
+        """
+        Hold the lock for a session for the duration of a turn.
+
+        Args:
+            timeout: Seconds to wait instead of the registry's default
+
+        Raises:
+            SessionBusyError: If another turn holds the lock past the timeout
+        """
+        entry = self._enter(session_id)
+        try:
+            if not entry[0].acquire(timeout=self.timeout if timeout is None else timeout):
+                raise SessionBusyError("Another message for this session is still being processed")
+            try:
+                yield
+            finally:
+                entry[0].release()
+        finally:
+            self._leave(session_id, entry)
+
+    def discard(self, session_id: str):
+        """
+        Forget the lock of a session that is no longer stored.
+
+        A lock still held or waited for is kept until the last of those turns is
+        done, so turns that already started stay serialized.
+        """
+        with self._registry_lock:
+            entry = self._locks.get(session_id)
+            if entry is None:
+                return
+            if entry[1] == 0:
+                del self._locks[session_id]
+            else:
+                entry[2] = True
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+
+class IdempotencyCache:
+    """
+    Bounded, expiring cache of responses keyed by (session_id, Idempotency-Key).
+
+    Callers must hold the session's lock while checking and storing, so a
+    replayed request always observes the response of the original one.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 3600.0):
+        """
+        Args:
+            max_entries: Maximum cached responses before the oldest are evicted
+            ttl_seconds: How long a cached response can be replayed
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, str, Dict, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.replays = 0
+
+    @staticmethod
+    def _fingerprint(message: str) -> str:
+        return hashlib.sha256(message.encode("utf-8")).hexdigest()
+
+    def get(self, session_id: str, key: str, message: str) -> Optional[Tuple[Dict, int]]:
+        """
+        Look up the cached response for a replayed request.
+
+        Returns:
+            (body, status_code) if the key was already processed, else None
+
+        Raises:
+            IdempotencyConflictError: If the key was used for a different message
+        """
+        with self._lock:
+            entry = self._entries.get((session_id, key))
+            if entry is None:
+                return None
+
+            expires_at, fingerprint, body, status_code = entry
+            if expires_at < time.monotonic():
+                del self._entries[(session_id, key)]
+                return None
+            if fingerprint != self._fingerprint(message):
+                raise IdempotencyConflictError("Idempotency-Key was already used for a different message")
+
+            self.replays += 1
+            return body, status_code
+
+    def put(self, session_id: str, key: str, message: str, body: Dict, status_code: int):
+        """Cache the response of a processed request."""
+        with self._lock:
+            self._entries[(session_id, key)] = (
+                time.monotonic() + self.ttl_seconds,
+                self._fingerprint(message),
+                body,
+                status_code
+            )
+            self._entries.move_to_end((session_id, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def export(self) -> List[Dict]:
+        """Get the unexpired entries in a JSON-serializable form, e.g. for a session handoff."""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {"session_id": session_id, "key": key, "ttl": expires_at - now,
+                 "fingerprint": fingerprint, "body": body, "status_code": status_code}
+                for (session_id, key), (expires_at, fingerprint, body, status_code) in self._entries.items()
+                if expires_at > now
+            ]
+
+    def load(self, entries: List[Dict]):
+        """Add entries produced by export(), keeping their remaining lifetime."""
+        now = time.monotonic()
+        with self._lock:
+            for entry in entries:
+                self._entries[(entry["session_id"], entry["key"])] = (
+                    now + entry["ttl"], entry["fingerprint"], entry["body"], entry["status_code"]
+                )
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        """Get cache size and replay count."""
+        with self._lock:
+            return {"entries": len(self._entries), "replays": self.replays}
+
+
+class TurnCheckpoint:
+    """
+    Snapshot of the session state a chat turn can mutate.
+
+    Restoring it undoes a partially applied turn (history appends, question
+    progress, round results) so the same answer can be retried cleanly.
+    """
+
+    def __init__(self, session: InterviewSession):
+        self.history_length = len(session.conversation_history)
+        self.current_round = session.current_round
+        self.current_question = session.current_question
+        self.elaboration_requests = session.elaboration_requests
+        self.status = session.status
+        self.completed_at = session.completed_at
+        self.final_evaluation = session.final_evaluation
+        self.round_numbers = set(session.rounds)
+        current = session.rounds.get(session.current_round)
+        self.round_data = current.copy(deep=True) if current is not None else None
+
+    def restore(self, session: InterviewSession):
+        """Return the session to the state captured by this checkpoint."""
+        del session.conversation_history[self.history_length:]
+        session.current_round = self.current_round
+        session.current_question = self.current_question
+        session.elaboration_requests = self.elaboration_requests
+        session.status = self.status
+        session.completed_at = self.completed_at
+        session.final_evaluation = self.final_evaluation
+        for round_number in set(session.rounds) - self.round_numbers:
+            del session.rounds[round_number]
+        if self.round_data is not None:
+            session.rounds[self.current_round] = self.round_data
+
+    def session_data(self, session: InterviewSession) -> Dict:
+        """
+        Serialize the session as it was when this checkpoint was taken.
+
+        Only reads what the running turn leaves alone (the history before the
+        turn, earlier rounds, fixed fields), so it is safe without the session lock.
+        """
+        data = session.dict(exclude={"rounds", "conversation_history"})
+        data.update(
+            current_round=self.current_round,
+            current_question=self.current_question,
+            elaboration_requests=self.elaboration_requests,
+            status=self.status,
+            completed_at=self.completed_at,
+            final_evaluation=self.final_evaluation,
+            rounds={
+                round_number: (
+                    self.round_data if round_number == self.current_round else session.rounds[round_number]
+                ).dict()
+                for round_number in sorted(self.round_numbers)
+            },
+            conversation_history=[
+                message.dict() for message in session.conversation_history[:self.history_length]
+            ]
+        )
+        return data
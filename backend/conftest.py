@@ -0,0 +1,115 @@
+"""
+Shared fixtures for the backend tests.
+
+Run from the backend directory:
+    python -m pytest
+"""
+
+from collections import Counter
+from typing import Optional
+
+import pytest
+import requests
+
+import app as app_module
+import test_api
+from handoff import DrainState
+
+GOOD_ANSWER = (
+    "I would put a queue in front of the workers, retry failed jobs with backoff "
+    "and make every consumer idempotent so retries are safe."
+)
+
+
+class FakeLLM:
+    """Stands in for GroqService: answers instantly, counts calls and can be made to fail."""
+
+    def __init__(self):
+        self.calls = Counter()
+        self.fail_with: Optional[Exception] = None
+
+    def _answer(self, method: str, text: str) -> str:
+        self.calls[method] += 1
+        if self.fail_with is not None:
+            raise self.fail_with
+        return text
+
+    def generate_greeting(self, job_role, round_number, round_info):
+        return self._answer("generate_greeting", f"Welcome to the {job_role} interview. First question?")
+
+    def evaluate_answer(self, *args, **kwargs):
+        return self._answer("evaluate_answer", "Good answer, clear reasoning.")
+
+    def ask_next_question(self, *args, **kwargs):
+        return self._answer("ask_next_question", "What would you monitor?")
+
+    def generate_round_report(self, *args, **kwargs):
+        return self._answer("generate_round_report", '{"summary": "Solid round.", "strengths": ["Clear"]}')
+
+
+@pytest.fixture
+def llm(monkeypatch) -> FakeLLM:
+    fake = FakeLLM()
+    monkeypatch.setattr(app_module, "get_groq_service", lambda: fake)
+    return fake
+
+
+@pytest.fixture
+def drain_state(monkeypatch) -> DrainState:
+    state = DrainState()
+    monkeypatch.setattr(app_module, "get_drain_state", lambda: state)
+    return state
+
+
+# Services holding sessions or per-session state; each test gets fresh ones
+STATEFUL_SERVICES = (
+    "get_session_store", "get_session_summaries", "get_prompt_builders", "get_answer_index",
+    "get_cohort_analytics", "get_transcript_index", "get_session_locks", "get_idempotency_cache",
+    "get_admission"
+)
+
+
+@pytest.fixture
+def client(llm, drain_state, monkeypatch, tmp_path):
+    for name in STATEFUL_SERVICES:
+        monkeypatch.setattr(app_module, name, app_module._lazy_service(getattr(app_module, name).__wrapped__))
+    report_jobs = []
+    build_report_jobs = app_module.get_report_jobs.__wrapped__
+    monkeypatch.setattr(app_module, "get_report_jobs", app_module._lazy_service(
+        lambda: report_jobs.append(build_report_jobs()) or report_jobs[0]
+    ))
+    monkeypatch.setenv("HANDOFF_PATH", str(tmp_path / "handoff.json"))
+    monkeypatch.setenv("REPORT_DB_PATH", str(tmp_path / "reports.db"))
+    yield app_module.create_app().test_client()
+    for jobs in report_jobs:
+        jobs.close()
+
+
+@pytest.fixture
+def interview_id(client) -> str:
+    response = client.post("/api/start-interview", json={"job_role": "Software Engineer"})
+    assert response.status_code == 200
+    return response.get_json()["session_id"]
+
+
+def _backend_running() -> bool:
+    try:
+        requests.get(f"{test_api.BASE_URL}/health", timeout=1)
+    except requests.exceptions.RequestException:
+        return False
+    return True
+
+
+def pytest_collection_modifyitems(config, items):
+    # test_api.py talks to a server started with python app.py
+    live = [item for item in items if item.path.name == "test_api.py"]
+    if live and not _backend_running():
+        skip = pytest.mark.skip(reason=f"no backend running at {test_api.BASE_URL} (start it with python app.py)")
+        for item in live:
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope="module")
+def session_id() -> str:
+    """An interview started on the running backend, for test_api.py."""
+    return test_api.test_start_interview()
@@ -0,0 +1,130 @@
+"""
+Per-request deadlines and client-disconnect cancellation for provider calls.
+"""
+
+import socket
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, Optional
+
+# Minimum budget worth starting a provider call with
+MIN_CALL_TIMEOUT = 0.5
+
+# How often the client connection is probed while a call is streaming
+DISCONNECT_PROBE_INTERVAL = 0.25
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request runs out of its time budget."""
+
+
+class ClientDisconnected(DeadlineExceeded):
+    """Raised when the client went away before the request finished."""
+
+
+class Deadline:
+    """Time budget for one request, optionally tied to the client connection."""
+
+    def __init__(self, budget_seconds: float, is_disconnected: Optional[Callable[[], bool]] = None):
+        """
+        Args:
+            budget_seconds: Seconds the request may run
+            is_disconnected: Optional probe returning True once the client has gone away
+        """
+        self.expires_at = time.monotonic() + budget_seconds
+        self._is_disconnected = is_disconnected
+        self._last_probe = 0.0
+        self.cancelled = False
+
+    def remaining(self) -> float:
+        """Seconds left in the budget (never negative)."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def cancel(self):
+        """Mark the request as abandoned."""
+        self.cancelled = True
+
+    def check(self):
+        """
+        Raise if the request should stop.
+
+        Raises:
+            ClientDisconnected: If the request was cancelled or the client went away
+            DeadlineExceeded: If the budget is used up
+        """
+        if not self.cancelled and self._is_disconnected is not None:
+            now = time.monotonic()
+            if now - self._last_probe >= DISCONNECT_PROBE_INTERVAL:
+                self._last_probe = now
+                if self._is_disconnected():
+                    self.cancel()
+
+        if self.cancelled:
+            raise ClientDisconnected("Client disconnected before the response was ready")
+        if self.remaining() <= 0:
+            raise DeadlineExceeded("Request deadline exceeded")
+
+    def exhausted(self) -> bool:
+        """Whether too little budget is left to make another provider call."""
+        return self.remaining() < MIN_CALL_TIMEOUT
+
+    def call_timeout(self, max_timeout: Optional[float] = None) -> float:
+        """
+        Timeout for the next provider call, computed from the remaining budget.
+
+        Raises:
+            DeadlineExceeded: If too little budget is left to make the call
+        """
+        self.check()
+        remaining = self.remaining()
+        if remaining < MIN_CALL_TIMEOUT:
+            raise DeadlineExceeded("Request deadline exceeded")
+        return min(remaining, max_timeout) if max_timeout else remaining
+
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar("current_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Get the deadline of the request being handled, if any."""
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Deadline) -> Iterator[Deadline]:
+    """Make a deadline visible to provider calls made within the block."""
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def connection_probe(environ: Dict) -> Optional[Callable[[], bool]]:
+    """
+    Build a probe that reports whether the client closed its connection.
+
+    Works with servers that expose the client socket in the WSGI environ
+    (Werkzeug's development server and gunicorn's sync workers).
+
+    Returns:
+        Probe function, or None if the socket is not available
+    """
+    sock = environ.get("gunicorn.socket") or environ.get("werkzeug.socket")
+    if sock is None:
+        return None
+
+    def is_disconnected() -> bool:
+        try:
+            # A closed connection reads as EOF; pending request bytes are left untouched
+            return sock.recv(1, socket.MSG_PEEK | socket.MSG_DONTWAIT) == b""
+        except (BlockingIOError, InterruptedError):
+            return False
+        except ValueError:
+            # TLS sockets do not support MSG_PEEK
+            return False
+        except OSError:
+            return True
+
+    return is_disconnected
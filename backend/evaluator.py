@@ -2,18 +2,14 @@
 Evaluation logic for assessing candidate performance and determining pass/fail.
 """
 
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 import re
 
 class InterviewEvaluator:
-    """Handles evaluation of candidate responses and overall performance."""
-    
-    # Passing thresholds for each round (out of 100)
-    ROUND_THRESHOLDS = {
-        1: 60,  # Screening: 60% to pass
-        2: 65,  # Technical: 65% to pass
-        3: 70   # Scenario: 70% to pass
-    }
+    """
+    Handles evaluation of candidate responses and overall performance.
+    Pass thresholds and round/question weights come from the round config.
+    """
     
     # Batch assignment based on overall score
     BATCH_CRITERIA = {
@@ -102,12 +98,15 @@ class InterviewEvaluator:
     
     @staticmethod
     def calculate_question_score(response: str, ai_feedback: str, question_number: int, 
-                                 total_questions: int) -> float:
+                                 total_questions: int, ai_score: Optional[float] = None) -> float:
         """
         Calculate score for a single question-answer pair.
+        ai_score replaces the score read from the feedback (e.g. 0 for answers
+        rejected without asking the AI).
         """
         quality_scores = InterviewEvaluator.evaluate_response_quality(response)
-        ai_score = InterviewEvaluator.extract_ai_evaluation(ai_feedback)
+        if ai_score is None:
+            ai_score = InterviewEvaluator.extract_ai_evaluation(ai_feedback)
         
         # Weighted combination
         quality_weight = 0.3
@@ -127,24 +126,19 @@ class InterviewEvaluator:
         return min(100, question_score)
     
     @staticmethod
-    def calculate_round_score(question_scores: List[float], round_number: int) -> float:
+    def calculate_round_score(question_scores: List[float], weights: Sequence[float]) -> float:
         """
         Calculate overall score for a round based on all question scores.
+        `weights` are the round's normalized question weights.
         """
         if not question_scores:
             return 0.0
         
-        # Weight distribution based on round type
-        if round_number == 2:  # Technical round - later questions worth more
-            weights = [0.15, 0.18, 0.20, 0.22, 0.25][:len(question_scores)]
-        elif round_number == 3:  # Scenario round - all questions equally important
-            weights = [1/len(question_scores)] * len(question_scores)
-        else:  # Screening round - equal weights
-            weights = [1/len(question_scores)] * len(question_scores)
-        
-        # Normalize weights
-        total_weight = sum(weights)
-        weights = [w / total_weight for w in weights]
+        # Weights are already normalized for a complete round
+        if len(question_scores) != len(weights):
+            weights = weights[:len(question_scores)]
+            total_weight = sum(weights)
+            weights = [w / total_weight for w in weights]
         
         # Calculate weighted average
         round_score = sum(score * weight for score, weight in zip(question_scores, weights))
@@ -152,12 +146,11 @@ class InterviewEvaluator:
         return round(round_score, 2)
     
     @staticmethod
-    def determine_round_pass(round_score: float, round_number: int) -> Tuple[bool, str]:
+    def determine_round_pass(round_score: float, threshold: float) -> Tuple[bool, str]:
         """
         Determine if candidate passed the round.
         Returns (passed: bool, feedback: str)
         """
-        threshold = InterviewEvaluator.ROUND_THRESHOLDS.get(round_number, 65)
         passed = round_score >= threshold
         
         if passed:
@@ -173,17 +166,12 @@ class InterviewEvaluator:
         return passed, feedback
     
     @staticmethod
-    def calculate_final_evaluation(round_scores: Dict[int, float]) -> Dict:
+    def calculate_final_evaluation(round_scores: Dict[int, float],
+                                   round_weights: Dict[int, float]) -> Dict:
         """
         Calculate final evaluation with overall score, batch, and confidence.
+        `round_weights` are the pipeline's normalized final weights by round number.
         """
-        # Weight each round differently
-        round_weights = {
-            1: 0.20,  # Screening: 20%
-            2: 0.45,  # Technical: 45%
-            3: 0.35   # Scenario: 35%
-        }
-        
         # Calculate weighted overall score
         overall_score = sum(
             round_scores.get(round_num, 0) * weight 
@@ -0,0 +1,474 @@
+"""
+Streaming export of finished interview sessions to columnar analytics files.
+
+Sessions are flattened into three tables (sessions, rounds, question_answers)
+and written in fixed-size batches, so memory use stays bounded no matter how
+many sessions are exported. Parquet and Arrow IPC output require pyarrow;
+CSV output works without it.
+
+Usage:
+    python exporter.py --input sessions.jsonl --output-dir exports --format parquet
+    python exporter.py --url http://localhost:5000 --output-dir exports --incremental
+"""
+
+import argparse
+import csv
+import io
+import json
+import logging
+import os
+import sys
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+# Column name -> column type ('string', 'int', 'float', 'bool', 'timestamp')
+TABLE_SCHEMAS: Dict[str, List[Tuple[str, str]]] = {
+    "sessions": [
+        ("session_id", "string"),
+        ("job_role", "string"),
+        ("candidate_name", "string"),
+        ("status", "string"),
+        ("current_round", "int"),
+        ("rounds_attempted", "int"),
+        ("message_count", "int"),
+        ("created_at", "timestamp"),
+        ("completed_at", "timestamp"),
+        ("overall_score", "float"),
+        ("confidence_score", "float"),
+        ("batch", "string"),
+        ("recommendation", "string"),
+    ],
+    "rounds": [
+        ("session_id", "string"),
+        ("round_number", "int"),
+        ("round_name", "string"),
+        ("status", "string"),
+        ("round_score", "float"),
+        ("passed", "bool"),
+        ("question_count", "int"),
+        ("feedback", "string"),
+    ],
+    "question_answers": [
+        ("session_id", "string"),
+        ("round_number", "int"),
+        ("question_number", "int"),
+        ("question", "string"),
+        ("answer", "string"),
+        ("ai_feedback", "string"),
+        ("score", "float"),
+        ("near_duplicate", "bool"),
+    ],
+}
+
+TABLES = list(TABLE_SCHEMAS)
+
+FILE_EXTENSIONS = {
+    "parquet": "parquet",
+    "arrow": "arrows",
+    "csv": "csv",
+}
+
+MIME_TYPES = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "csv": "text/csv",
+}
+
+FINISHED_STATUSES = ("completed", "terminated")
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def resolve_format(requested: str) -> str:
+    """Fall back to CSV when pyarrow is not installed."""
+    if requested not in FILE_EXTENSIONS:
+        raise ValueError(f"Unsupported export format: {requested}")
+    if requested != "csv" and pa is None:
+        logger.warning("pyarrow not installed - exporting CSV instead of %s", requested)
+        return "csv"
+    return requested
+
+
+def flatten_session(session: Dict) -> Dict[str, List[Dict]]:
+    """
+    Flatten one session dict into rows for each export table.
+
+    Args:
+        session: InterviewSession.dict() output
+
+    Returns:
+        Mapping of table name to its rows for this session
+    """
+    final_evaluation = session.get("final_evaluation") or {}
+    rounds = session.get("rounds") or {}
+
+    session_row = {
+        "session_id": session["session_id"],
+        "job_role": session.get("job_role"),
+        "candidate_name": session.get("candidate_name"),
+        "status": session.get("status"),
+        "current_round": session.get("current_round"),
+        "rounds_attempted": len(rounds),
+        "message_count": len(session.get("conversation_history") or []),
+        "created_at": session.get("created_at"),
+        "completed_at": session.get("completed_at"),
+        "overall_score": final_evaluation.get("overall_score"),
+        "confidence_score": final_evaluation.get("confidence_score"),
+        "batch": final_evaluation.get("batch"),
+        "recommendation": final_evaluation.get("recommendation"),
+    }
+
+    round_rows = []
+    question_rows = []
+    for round_key, round_data in sorted(rounds.items(), key=lambda item: int(item[0])):
+        questions = round_data.get("questions") or []
+        round_rows.append({
+            "session_id": session["session_id"],
+            "round_number": round_data.get("round_number", int(round_key)),
+            "round_name": round_data.get("round_name"),
+            "status": round_data.get("status"),
+            "round_score": round_data.get("round_score"),
+            "passed": round_data.get("passed"),
+            "question_count": len(questions),
+            "feedback": round_data.get("feedback"),
+        })
+        for qa in questions:
+            question_rows.append({
+                "session_id": session["session_id"],
+                "round_number": round_data.get("round_number", int(round_key)),
+                "question_number": qa.get("question_number"),
+                "question": qa.get("question"),
+                "answer": qa.get("answer"),
+                "ai_feedback": qa.get("ai_feedback"),
+                "score": qa.get("score"),
+                "near_duplicate": qa.get("near_duplicate", False),
+            })
+
+    return {
+        "sessions": [session_row],
+        "rounds": round_rows,
+        "question_answers": question_rows,
+    }
+
+
+# ----------------------------------------------------------------------
+# Batch writers
+# ----------------------------------------------------------------------
+
+def _arrow_type(column_type: str):
+    return {
+        "string": pa.string(),
+        "int": pa.int64(),
+        "float": pa.float64(),
+        "bool": pa.bool_(),
+        "timestamp": pa.timestamp("us"),
+    }[column_type]
+
+
+def _arrow_schema(table: str):
+    return pa.schema([(name, _arrow_type(kind)) for name, kind in TABLE_SCHEMAS[table]])
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def _record_batch(table: str, rows: List[Dict]):
+    columns = []
+    for name, kind in TABLE_SCHEMAS[table]:
+        values = [row.get(name) for row in rows]
+        if kind == "timestamp":
+            values = [_parse_timestamp(value) for value in values]
+        columns.append(pa.array(values, type=_arrow_type(kind)))
+    return pa.RecordBatch.from_arrays(columns, schema=_arrow_schema(table))
+
+
+class TableWriter:
+    """Writes rows of one table to a binary file object in batches."""
+
+    def __init__(self, table: str, sink, export_format: str):
+        self.table = table
+        self.format = export_format
+        self.rows_written = 0
+        self._sink = sink
+        self._columns = [name for name, _ in TABLE_SCHEMAS[table]]
+
+        if export_format == "parquet":
+            self._writer = pq.ParquetWriter(sink, _arrow_schema(table), compression="zstd")
+        elif export_format == "arrow":
+            self._writer = pa_ipc.new_stream(sink, _arrow_schema(table))
+        else:
+            self._text = io.TextIOWrapper(sink, encoding="utf-8", newline="", write_through=True)
+            self._writer = csv.DictWriter(self._text, fieldnames=self._columns)
+            self._writer.writeheader()
+
+    def write_batch(self, rows: List[Dict]):
+        if not rows:
+            return
+        if self.format == "csv":
+            self._writer.writerows(rows)
+        else:
+            self._writer.write_batch(_record_batch(self.table, rows))
+        self.rows_written += len(rows)
+
+    def close(self):
+        if self.format == "csv":
+            self._text.flush()
+            self._text.detach()
+        else:
+            self._writer.close()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that collects bytes for a streaming response."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _table_rows(sessions: Iterable[Dict], table: str) -> Iterator[Dict]:
+    for session in sessions:
+        yield from flatten_session(session)[table]
+
+
+def _batched(rows: Iterable[Dict], batch_size: int) -> Iterator[List[Dict]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def stream_table(sessions: Iterable[Dict], table: str, export_format: str,
+                 batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[bytes]:
+    """
+    Stream one export table as encoded bytes, one batch at a time.
+
+    Args:
+        sessions: Session dicts to export (consumed lazily)
+        table: One of TABLES
+        export_format: 'parquet', 'arrow' or 'csv'
+        batch_size: Rows per written batch
+
+    Yields:
+        Encoded file chunks
+    """
+    sink = _ChunkSink()
+    writer = TableWriter(table, sink, export_format)
+    for batch in _batched(_table_rows(sessions, table), batch_size):
+        writer.write_batch(batch)
+        chunk = sink.drain()
+        if chunk:
+            yield chunk
+    writer.close()
+    chunk = sink.drain()
+    if chunk:
+        yield chunk
+
+
+class SessionExporter:
+    """Exports session archives to one file per table."""
+
+    def __init__(self, output_dir: str, export_format: str = "parquet",
+                 batch_size: int = DEFAULT_BATCH_SIZE):
+        """
+        Args:
+            output_dir: Directory the table files are written to
+            export_format: 'parquet', 'arrow' or 'csv' (falls back to CSV without pyarrow)
+            batch_size: Rows buffered per table before each write
+        """
+        self.output_dir = output_dir
+        self.format = resolve_format(export_format)
+        self.batch_size = batch_size
+
+    def export(self, sessions: Iterable[Dict], since: Optional[str] = None,
+               suffix: str = "") -> Dict:
+        """
+        Write finished sessions to table files.
+
+        Sessions are read once; each table keeps at most one batch of rows in memory.
+
+        Args:
+            sessions: Iterable of session dicts (e.g. streamed from a JSON-lines archive)
+            since: Only export sessions completed strictly after this ISO timestamp
+            suffix: Optional suffix for file names (used by incremental exports)
+
+        Returns:
+            Summary with files written, row counts and the completion watermark
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        extension = FILE_EXTENSIONS[self.format]
+        paths = {
+            table: os.path.join(self.output_dir, f"{table}{suffix}.{extension}")
+            for table in TABLES
+        }
+
+        files = {table: open(paths[table], "wb") for table in TABLES}
+        writers = {table: TableWriter(table, files[table], self.format) for table in TABLES}
+        buffers: Dict[str, List[Dict]] = {table: [] for table in TABLES}
+        watermark = since
+
+        try:
+            for session in sessions:
+                if session.get("status") not in FINISHED_STATUSES or not session.get("completed_at"):
+                    continue
+                if since is not None and session["completed_at"] <= since:
+                    continue
+
+                if watermark is None or session["completed_at"] > watermark:
+                    watermark = session["completed_at"]
+
+                for table, rows in flatten_session(session).items():
+                    buffers[table].extend(rows)
+                    if len(buffers[table]) >= self.batch_size:
+                        writers[table].write_batch(buffers[table])
+                        buffers[table] = []
+
+            for table in TABLES:
+                writers[table].write_batch(buffers[table])
+        finally:
+            for table in TABLES:
+                writers[table].close()
+                files[table].close()
+
+        return {
+            "format": self.format,
+            "files": paths,
+            "rows": {table: writers[table].rows_written for table in TABLES},
+            "watermark": watermark
+        }
+
+
+# ----------------------------------------------------------------------
+# Command line
+# ----------------------------------------------------------------------
+
+def _read_jsonl(path: str) -> Iterator[Dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def _download(url: str, output_dir: str, export_format: str, since: Optional[str],
+              suffix: str) -> Dict:
+    """
+    Stream each table from a running backend's /api/export endpoint to disk.
+
+    The first table's watermark bounds the others, so all tables cover the same
+    sessions even if more finish while they are downloaded.
+    """
+    import requests
+
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {}
+    watermark = None
+
+    for table in TABLES:
+        params = {"format": export_format}
+        if since:
+            params["since"] = since
+        if watermark is not None:
+            params["until"] = watermark
+        with requests.get(f"{url.rstrip('/')}/api/export/{table}", params=params,
+                          stream=True, timeout=60) as response:
+            response.raise_for_status()
+            actual_format = response.headers.get("X-Export-Format", export_format)
+            paths[table] = os.path.join(output_dir, f"{table}{suffix}.{FILE_EXTENSIONS[actual_format]}")
+            with open(paths[table], "wb") as f:
+                for chunk in response.iter_content(chunk_size=1 << 16):
+                    f.write(chunk)
+            if watermark is None:
+                # Empty when nothing has finished yet, which bounds the other tables to nothing too
+                watermark = response.headers.get("X-Export-Watermark", "")
+
+    return {"format": export_format, "files": paths, "watermark": watermark or since}
+
+
+def _load_state(path: str) -> Dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_state(path: str, state: Dict):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Export finished interview sessions to analytics tables.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help="JSON-lines file with one session per line")
+    source.add_argument("--url", help="Base URL of a running backend, e.g. http://localhost:5000")
+    parser.add_argument("--output-dir", default="exports", help="Directory for the table files")
+    parser.add_argument("--format", default="parquet", choices=sorted(FILE_EXTENSIONS))
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--since", help="Only export sessions completed after this ISO timestamp")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Resume from the watermark stored in the output directory")
+    args = parser.parse_args(argv)
+
+    state_path = os.path.join(args.output_dir, ".export_state.json")
+    since = args.since
+    suffix = ""
+    if args.incremental:
+        since = since or _load_state(state_path).get("watermark")
+        suffix = "-" + datetime.now().strftime("%Y%m%dT%H%M%S")
+
+    if args.input:
+        exporter = SessionExporter(args.output_dir, args.format, args.batch_size)
+        result = exporter.export(_read_jsonl(args.input), since=since, suffix=suffix)
+    else:
+        result = _download(args.url, args.output_dir, args.format, since, suffix)
+
+    if args.incremental and result.get("watermark"):
+        os.makedirs(args.output_dir, exist_ok=True)
+        _save_state(state_path, {"watermark": result["watermark"]})
+
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,10 +2,35 @@
 Groq API service for handling AI interactions.
 """
 
-import os
-from typing import List, Dict
-from groq import Groq
+import logging
+import time
+from typing import List, Dict, Optional
 from models import Message
+from prompt_builder import SessionPromptBuilder
+from deadlines import DeadlineExceeded, current_deadline
+from llm_providers import GroqProvider, ProviderPool
+from tracing import tracer
+from structured_logging import bind_context
+
+logger = logging.getLogger(__name__)
+
+# Trailing instructions are fixed texts sent after the history, so every call
+# of a session shares the same prefix; the varying parts come last.
+NEXT_QUESTION_INSTRUCTION = (
+    "Based on the conversation so far, ask the next question. Make it relevant to the "
+    "previous responses. Do NOT explicitly state the question number - keep it "
+    "conversational and natural. Ask only ONE question and wait for the response.\n\n"
+    "This is question {number} out of {total}."
+)
+FEEDBACK_INSTRUCTION = (
+    "Provide very brief feedback on this answer (1-2 sentences). Acknowledge their "
+    "response and prepare to move to the next question. Be encouraging but honest."
+)
+LAST_FEEDBACK_INSTRUCTION = (
+    "Provide brief feedback on this answer. This was the last question in this round. "
+    "Thank them and let them know the round is complete. Keep it short and professional."
+)
+
 
 class GroqService:
     """Service for interacting with Groq API."""
@@ -17,9 +42,12 @@ class GroqService:
         3: "llama-3.3-70b-versatile"       # Scenario - versatile for complex scenarios
     }
     
-    def __init__(self, api_key: str):
-        """Initialize the Groq service with API key."""
-        self.client = Groq(api_key=api_key)
+    def __init__(self, api_key: Optional[str] = None, providers: Optional[ProviderPool] = None):
+        """
+        Initialize the service with a Groq API key, or with a pool of providers
+        (e.g. Groq plus a local OpenAI-compatible fallback).
+        """
+        self.providers = providers or ProviderPool([GroqProvider(api_key)])
         self.default_model = "llama-3.3-70b-versatile"
     
     def get_model_for_round(self, round_number: int) -> str:
@@ -34,7 +62,10 @@ class GroqService:
         max_tokens: int = 1024
     ) -> str:
         """
-        Get a chat completion from Groq API.
+        Get a chat completion from the fastest healthy provider.
+        
+        With a request deadline the completion is streamed, so the deadline can be
+        re-checked as tokens arrive and tokens reach live turn listeners (WebSocket clients).
         
         Args:
             messages: List of message dicts with 'role' and 'content'
@@ -45,23 +76,36 @@ class GroqService:
         Returns:
             AI response content as string
         """
-        try:
-            model = self.get_model_for_round(round_number)
-            
-            response = self.client.chat.completions.create(
-                model=model,
-                messages=messages,
-                temperature=temperature,
-                max_tokens=max_tokens,
-                top_p=1,
-                stream=False
-            )
-            
-            return response.choices[0].message.content
-            
-        except Exception as e:
-            print(f"Error in Groq API call: {str(e)}")
-            raise Exception(f"Failed to get AI response: {str(e)}")
+        deadline = current_deadline()
+        model = self.get_model_for_round(round_number)
+        bind_context(model=model)
+        started = time.perf_counter()
+        
+        with tracer.span("llm.chat_completion", **{
+            "llm.model": model,
+            "llm.round": round_number,
+            "llm.max_tokens": max_tokens,
+            "llm.messages": len(messages)
+        }) as span:
+            try:
+                content, usage, provider = self.providers.complete(
+                    messages, model, temperature, max_tokens, deadline
+                )
+                
+                latency_ms = round((time.perf_counter() - started) * 1000, 1)
+                span.set_attribute("llm.provider", provider)
+                span.set_attributes(**{f"llm.{key}": value for key, value in usage.items()})
+                logger.info("LLM call completed", extra={"provider": provider, "latency_ms": latency_ms, **usage})
+                return content
+            
+            except DeadlineExceeded:
+                raise
+            
+            except Exception as e:
+                logger.error("Error in LLM call: %s", e, extra={
+                    "latency_ms": round((time.perf_counter() - started) * 1000, 1)
+                })
+                raise Exception(f"Failed to get AI response: {str(e)}")
     
     def generate_greeting(self, job_role: str, round_number: int, round_info: Dict) -> str:
         """
@@ -116,7 +160,8 @@ class GroqService:
         system_prompt: str,
         round_number: int,
         current_question: int,
-        total_questions: int
+        total_questions: int,
+        prompt_builder: Optional[SessionPromptBuilder] = None
     ) -> str:
         """
         Ask the next question based on conversation history.
@@ -127,26 +172,16 @@ class GroqService:
             round_number: Current round number
             current_question: Current question number (0-indexed)
             total_questions: Total questions in this round
+            prompt_builder: Builder holding the session's prompt prefix (optional)
             
         Returns:
             Next question from AI
         """
-        # Convert Message objects to dict format for API
-        messages = [{"role": "system", "content": system_prompt}]
-        
-        for msg in conversation_history:
-            if msg.role in ["user", "assistant"]:
-                messages.append({"role": msg.role, "content": msg.content})
-        
-        # Add instruction for next question
-        next_q_num = current_question + 1
-        instruction = f"""Based on the conversation so far, ask question {next_q_num} out of {total_questions}. 
-        
-        Make it relevant to the previous responses. Do NOT explicitly state "Question {next_q_num}/{total_questions}" - keep it conversational and natural.
-        
-        Ask only ONE question and wait for the response."""
-        
-        messages.append({"role": "user", "content": instruction})
+        instruction = NEXT_QUESTION_INSTRUCTION.format(number=current_question + 1, total=total_questions)
+        builder = prompt_builder or SessionPromptBuilder()
+        with tracer.span("build_messages", history=len(conversation_history)) as span:
+            messages = builder.build(conversation_history, system_prompt, instruction)
+            span.set_attribute("prefix_chars", builder.prefix_chars)
         
         return self.chat_completion(messages, round_number, temperature=0.75, max_tokens=512)
     
@@ -155,7 +190,8 @@ class GroqService:
         conversation_history: List[Message],
         system_prompt: str,
         round_number: int,
-        is_last_question: bool
+        is_last_question: bool,
+        prompt_builder: Optional[SessionPromptBuilder] = None
     ) -> str:
         """
         Evaluate the candidate's answer and provide feedback.
@@ -165,25 +201,51 @@ class GroqService:
             system_prompt: System prompt for the current round
             round_number: Current round number
             is_last_question: Whether this is the last question in the round
+            prompt_builder: Builder holding the session's prompt prefix (optional)
             
         Returns:
             Feedback from AI
         """
-        messages = [{"role": "system", "content": system_prompt}]
+        instruction = LAST_FEEDBACK_INSTRUCTION if is_last_question else FEEDBACK_INSTRUCTION
+        builder = prompt_builder or SessionPromptBuilder()
+        with tracer.span("build_messages", history=len(conversation_history)) as span:
+            messages = builder.build(conversation_history, system_prompt, instruction)
+            span.set_attribute("prefix_chars", builder.prefix_chars)
         
-        for msg in conversation_history:
-            if msg.role in ["user", "assistant"]:
-                messages.append({"role": msg.role, "content": msg.content})
+        return self.chat_completion(messages, round_number, temperature=0.6, max_tokens=256)
+    
+    def generate_round_report(self, job_role: str, round_number: int, round_name: str,
+                              questions: List[Dict]) -> str:
+        """
+        Write a detailed assessment of one finished round.
         
-        if is_last_question:
-            instruction = """Provide brief feedback on this answer. This was the last question in this round. 
-            
-            Thank them and let them know the round is complete. Keep it short and professional."""
-        else:
-            instruction = """Provide very brief feedback on this answer (1-2 sentences). 
+        Args:
+            job_role: The job role being interviewed for
+            round_number: Round number (determines model)
+            round_name: Name of the round
+            questions: Q&A records of the round (question, answer, ai_feedback, score)
             
-            Acknowledge their response and prepare to move to the next question. Be encouraging but honest."""
-        
-        messages.append({"role": "user", "content": instruction})
+        Returns:
+            JSON text with "summary", "strengths", "gaps" and "evidence" (verbatim answer quotes)
+        """
+        transcript = "\n\n".join(
+            f"Q{qa['question_number']}: {qa['question']}\n"
+            f"Answer: {qa['answer']}\n"
+            f"Score: {qa.get('score')}"
+            for qa in questions
+        )
+        prompt = f"""Review this {round_name} of an interview for a {job_role} position.
+
+{transcript}
+
+Respond with a JSON object only, using these keys:
+- "summary": two or three sentences on the candidate's performance in this round
+- "strengths": list of short strengths shown in the answers
+- "gaps": list of short gaps or weaknesses
+- "evidence": list of objects {{"question_number": int, "quote": str, "supports": "strength" or "gap"}}, where quote is copied word for word from an answer"""
         
-        return self.chat_completion(messages, round_number, temperature=0.6, max_tokens=256)
+        messages = [
+            {"role": "system", "content": "You are a senior recruiter writing precise, evidence-based interview reports."},
+            {"role": "user", "content": prompt}
+        ]
+        return self.chat_completion(messages, round_number, temperature=0.2, max_tokens=1024)
@@ -0,0 +1,180 @@
+"""
+Graceful drain and session handoff across restarts.
+
+Sessions only live in process memory, so a deploy would end every running
+interview. Before a process stops it drains: it stops taking new interviews
+and turns, lets turns in flight finish, and writes all sessions to a handoff
+file. The next process loads that file on startup, or, when it was started
+next to the old one for a rolling restart, as soon as the file appears.
+
+While the old process drains, a marker file announces the handoff, so the new
+process can hold requests for sessions it does not have yet until they arrive.
+
+The file is written atomically, and claimed by renaming it before it is read,
+so a handoff is loaded by exactly one process.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+HANDOFF_FORMAT_VERSION = 1
+
+
+class DrainState:
+    """Whether this process is draining, and since when."""
+
+    def __init__(self):
+        self._draining = threading.Event()
+        self.started_at: Optional[float] = None
+        self._lock = threading.Lock()
+        # Sessions handed off as they were before a turn that was still running
+        self._rolled_back: Set[str] = set()
+        # Sessions whose turn has finished and is applying its effects
+        self._committing: Set[str] = set()
+
+    @property
+    def draining(self) -> bool:
+        return self._draining.is_set()
+
+    def start(self) -> bool:
+        """
+        Enter drain mode.
+
+        Returns:
+            False if the process was already draining
+        """
+        if self._draining.is_set():
+            return False
+        self.started_at = time.time()
+        self._draining.set()
+        return True
+
+    def mark_rolled_back(self, session_id: str) -> bool:
+        """
+        Record that a session is handed off without the turn it is running.
+
+        Returns:
+            False if the turn has already committed; the session is then handed off with it
+        """
+        with self._lock:
+            if session_id in self._committing:
+                return False
+            self._rolled_back.add(session_id)
+            return True
+
+    def commit_turn(self, session_id: str) -> bool:
+        """
+        Let a finished turn apply its effects, unless its session was handed off without it.
+        Call turn_done once the turn has been answered.
+
+        Returns:
+            False if the turn was rolled back; its effects must not run
+        """
+        with self._lock:
+            if session_id in self._rolled_back:
+                return False
+            self._committing.add(session_id)
+            return True
+
+    def turn_done(self, session_id: str):
+        """Forget a committed turn once its response is settled."""
+        with self._lock:
+            self._committing.discard(session_id)
+
+    def rolled_back(self, session_id: str) -> bool:
+        """Whether a session's running turn was left out of the handoff (and must not be answered)."""
+        return session_id in self._rolled_back
+
+    def stats(self) -> Dict:
+        return {"draining": self.draining, "started_at": self.started_at,
+                "rolled_back_sessions": len(self._rolled_back)}
+
+
+def _pending_path(path: str) -> str:
+    return f"{path}.pending"
+
+
+def announce_handoff(path: str, timeout: float):
+    """
+    Announce that a handoff file will be written within timeout seconds.
+    The marker is removed by write_handoff, or ignored once it has expired.
+    """
+    temp_path = f"{_pending_path(path)}.{os.getpid()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump({"pid": os.getpid(), "expires_at": time.time() + timeout}, f)
+    os.replace(temp_path, _pending_path(path))
+
+
+def handoff_pending(path: str) -> bool:
+    """Whether another process is draining and is about to write the handoff file."""
+    try:
+        with open(_pending_path(path), encoding="utf-8") as f:
+            marker = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return isinstance(marker, dict) and marker.get("expires_at", 0) > time.time()
+
+
+def write_handoff(path: str, sessions: List[Dict], idempotency: List[Dict]):
+    """
+    Write the handoff file, replacing it atomically, and remove the announcement.
+
+    Args:
+        path: Handoff file
+        sessions: Serialized sessions
+        idempotency: Cached responses of those sessions (IdempotencyCache.export())
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "version": HANDOFF_FORMAT_VERSION,
+            "created_at": time.time(),
+            "pid": os.getpid(),
+            "sessions": sessions,
+            "idempotency": idempotency
+        }, f, default=str)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    try:
+        os.remove(_pending_path(path))
+    except FileNotFoundError:
+        pass
+
+
+def claim_handoff(path: str) -> Optional[Dict]:
+    """
+    Take the state left in a handoff file by the previous process.
+
+    The file is renamed to <path>.loaded, so a restarted or second process does
+    not load the same sessions again.
+
+    Returns:
+        {"sessions": [...], "idempotency": [...]}, or None if there is no usable handoff file
+    """
+    claimed_path = f"{path}.{os.getpid()}.claimed"
+    try:
+        os.rename(path, claimed_path)
+    except FileNotFoundError:
+        return None
+
+    try:
+        with open(claimed_path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.error("Unreadable handoff file %s: %s", claimed_path, e)
+        return None
+
+    os.replace(claimed_path, f"{path}.loaded")
+    if not isinstance(data, dict) or data.get("version") != HANDOFF_FORMAT_VERSION:
+        logger.error("Unsupported handoff file format", extra={"path": path})
+        return None
+    return {"sessions": data.get("sessions") or [], "idempotency": data.get("idempotency") or []}
@@ -0,0 +1,269 @@
+"""
+Durable background job queue backed by SQLite.
+
+Jobs are rows in a local SQLite database, so queued and finished jobs survive
+restarts and can be shared by several worker processes on one host. A worker
+claims a job with a lease; a job whose worker died is picked up again once the
+lease expires. Failed jobs are retried a few times, with growing delays,
+before they are marked failed.
+
+Waiting clients are woken as soon as a job finishes in this process; jobs
+finished by another process are seen on the next poll.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUSES = ("queued", "running", "done", "failed")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, available_at);
+CREATE INDEX IF NOT EXISTS jobs_subject ON jobs (kind, subject);
+"""
+
+
+class JobQueue:
+    """A pool of worker threads running jobs stored in SQLite."""
+
+    def __init__(self, db_path: str, handlers: Dict[str, Callable[[Dict], Dict]],
+                 workers: int = 2, max_attempts: int = 3, retry_delay: float = 5.0,
+                 lease_seconds: float = 300.0, poll_interval: float = 1.0,
+                 on_finished: Optional[Callable[[Dict], None]] = None):
+        """
+        Args:
+            db_path: SQLite database file
+            handlers: Job kind -> function turning a payload into a JSON-serializable result
+            workers: Number of worker threads
+            max_attempts: Runs of a job before it is marked failed
+            retry_delay: Seconds before the first retry, doubled for each further one
+            lease_seconds: Time after which a running job is assumed lost and run again
+            poll_interval: Seconds between checks for jobs queued by other processes
+            on_finished: Called with the job record after a job is done or failed
+        """
+        self.db_path = db_path
+        self.handlers = handlers
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.on_finished = on_finished
+
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._db_lock = threading.Lock()
+        with self._db_lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+        self._condition = threading.Condition()
+        self._closed = False
+        self._workers = [
+            threading.Thread(target=self._run, name=f"job-worker-{n}", daemon=True)
+            for n in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def _execute(self, sql: str, params=()) -> sqlite3.Cursor:
+        with self._db_lock:
+            return self._conn.execute(sql, params)
+
+    @staticmethod
+    def _record(row: sqlite3.Row) -> Dict:
+        return {
+            "job_id": row["job_id"],
+            "kind": row["kind"],
+            "subject": row["subject"],
+            "status": row["status"],
+            "attempts": row["attempts"],
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"]
+        }
+
+    # ------------------------------------------------------------------
+    # Write path
+    # ------------------------------------------------------------------
+
+    def enqueue(self, kind: str, subject: str, payload: Dict) -> str:
+        """
+        Store a job and wake a worker.
+
+        Args:
+            kind: Job kind (a key of handlers)
+            subject: What the job is about, e.g. a session ID; used for lookups
+            payload: JSON-serializable input of the handler
+
+        Returns:
+            Job ID
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        job_id = str(uuid.uuid4())
+        now = time.time()
+        self._execute(
+            "INSERT INTO jobs (job_id, kind, subject, status, payload, available_at, created_at, updated_at) "
+            "VALUES (?, ?, ?, 'queued', ?, ?, ?, ?)",
+            (job_id, kind, subject, json.dumps(payload), now, now, now)
+        )
+        with self._condition:
+            self._condition.notify_all()
+        return job_id
+
+    def _claim(self) -> Optional[sqlite3.Row]:
+        """Take the oldest due job: queued and past its retry delay, or running with an expired lease."""
+        now = time.time()
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE status IN ('queued', 'running') AND available_at <= ? "
+                "ORDER BY available_at LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is None:
+                return None
+            # Conditional update, so a job is claimed by one process only
+            claimed = self._conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, available_at = ?, "
+                "updated_at = ? WHERE job_id = ? AND status = ? AND updated_at = ?",
+                (now + self.lease_seconds, now, row["job_id"], row["status"], row["updated_at"])
+            ).rowcount
+        return row if claimed else None
+
+    def _finish(self, row: sqlite3.Row, result: Optional[Dict], error: Optional[str]):
+        attempts = row["attempts"] + 1
+        now = time.time()
+        available_at = now
+        if error is None:
+            status = "done"
+        elif attempts < self.max_attempts:
+            status = "queued"
+            available_at = now + self.retry_delay * 2 ** (attempts - 1)
+        else:
+            status = "failed"
+
+        self._execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, available_at = ?, updated_at = ? "
+            "WHERE job_id = ?",
+            (status, json.dumps(result) if result is not None else None, error, available_at, now, row["job_id"])
+        )
+        with self._condition:
+            self._condition.notify_all()
+
+        if status != "queued" and self.on_finished is not None:
+            try:
+                self.on_finished(self.get(row["job_id"]))
+            except Exception as e:
+                logger.warning("Job notification failed: %s", e)
+
+    # ------------------------------------------------------------------
+    # Background workers
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        while not self._closed:
+            try:
+                row = self._claim()
+            except sqlite3.Error as e:
+                logger.error("Error claiming job: %s", e)
+                row = None
+
+            if row is None:
+                with self._condition:
+                    if not self._closed:
+                        self._condition.wait(self.poll_interval)
+                continue
+
+            started = time.perf_counter()
+            try:
+                result = self.handlers[row["kind"]](json.loads(row["payload"]))
+                error = None
+            except Exception as e:
+                logger.exception("Job failed: %s", e, extra={"job_id": row["job_id"], "kind": row["kind"]})
+                result, error = None, str(e)
+
+            logger.info("Job finished", extra={
+                "job_id": row["job_id"],
+                "kind": row["kind"],
+                "ok": error is None,
+                "latency_ms": round((time.perf_counter() - started) * 1000, 1)
+            })
+            try:
+                self._finish(row, result, error)
+            except sqlite3.Error as e:
+                logger.error("Error storing job result: %s", e)
+
+    def close(self, timeout: float = 5.0):
+        """Stop the workers once their current job is done and close the database."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        for worker in self._workers:
+            worker.join(timeout)
+        with self._db_lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------
+    # Read path
+    # ------------------------------------------------------------------
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Get a job record by ID."""
+        row = self._execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._record(row) if row else None
+
+    def latest(self, kind: str, subject: str) -> Optional[Dict]:
+        """Get the most recent job of a kind for a subject."""
+        row = self._execute(
+            "SELECT * FROM jobs WHERE kind = ? AND subject = ? ORDER BY created_at DESC LIMIT 1",
+            (kind, subject)
+        ).fetchone()
+        return self._record(row) if row else None
+
+    def wait(self, kind: str, subject: str, timeout: float) -> Optional[Dict]:
+        """
+        Wait until the latest job of a kind for a subject has finished.
+
+        Returns:
+            The job record (possibly still queued or running when the timeout ran out)
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.latest(kind, subject)
+            remaining = deadline - time.monotonic()
+            if job is None or job["status"] in ("done", "failed") or remaining <= 0:
+                return job
+            with self._condition:
+                self._condition.wait(min(remaining, self.poll_interval))
+
+    def stats(self) -> Dict:
+        """Get job counts per status."""
+        counts = dict.fromkeys(JOB_STATUSES, 0)
+        for row in self._execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall():
+            counts[row["status"]] = row["n"]
+        return {"workers": len(self._workers), "jobs": counts}
@@ -0,0 +1,416 @@
+"""
+LLM providers behind GroqService.chat_completion.
+
+A provider turns chat messages into a completion. Two implementations exist:
+the Groq SDK, and any server speaking the OpenAI chat completions API (for
+example a locally hosted CPU model served by llama.cpp, vLLM or Ollama).
+
+A ProviderPool tracks the health and latency of each provider and sends each
+call to the fastest healthy one, falling back to the others when a call
+fails. A provider that fails repeatedly (transport errors, timeouts, 429 and
+5xx answers; not requests it rejects) is skipped for a cooldown period, and
+a small share of calls goes to the slower providers so their latency stays
+known and traffic moves back once they get faster.
+"""
+
+import json
+import logging
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from groq import Groq, APIConnectionError, APIStatusError, APITimeoutError
+
+from deadlines import Deadline, DeadlineExceeded
+from turn_events import emit
+
+logger = logging.getLogger(__name__)
+
+# Consecutive failures after which a provider is skipped for the cooldown period
+FAILURE_THRESHOLD = 3
+
+# Weight of the newest call in a provider's average latency
+LATENCY_SMOOTHING = 0.2
+
+
+class ProviderError(Exception):
+    """
+    Raised when a provider call fails.
+
+    retryable is False once part of the completion was streamed to listeners,
+    since another provider would send a different text after it. provider_fault
+    is False for errors caused by the request (4xx, unusable responses), which do
+    not count against the provider's health.
+    """
+
+    def __init__(self, message: str, retryable: bool = True, provider_fault: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+        self.provider_fault = provider_fault
+
+
+def _status_is_provider_fault(status_code: int) -> bool:
+    """Whether an HTTP error status means the provider is unhealthy (overloaded or failing)."""
+    return status_code == 429 or status_code >= 500
+
+
+class ProviderTimeout(ProviderError):
+    """Raised when a provider does not answer within the call timeout."""
+
+
+class LLMProvider:
+    """Base class of the chat completion backends."""
+
+    name = "provider"
+
+    def __init__(self, timeout: float = 30.0):
+        """
+        Args:
+            timeout: Longest a single call may take, even when the request has more budget left
+        """
+        self.timeout = timeout
+
+    def _call_timeout(self, deadline: Optional[Deadline]) -> float:
+        return deadline.call_timeout(self.timeout) if deadline is not None else self.timeout
+
+    def complete(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        deadline: Optional[Deadline] = None
+    ) -> Tuple[str, Dict[str, int]]:
+        """
+        Get a completion; with a deadline it is streamed and tokens are emitted as turn events.
+
+        Returns:
+            (content, token usage counts)
+
+        Raises:
+            ProviderError: If the call failed
+            DeadlineExceeded: If the request ran out of time or lost its client
+        """
+        raise NotImplementedError
+
+
+def usage_counts(usage) -> Dict[str, int]:
+    """Extract token counts from a provider usage object (or dict)."""
+    if usage is None:
+        return {}
+    if not isinstance(usage, dict):
+        usage = {key: getattr(usage, key, None) for key in ("prompt_tokens", "completion_tokens", "total_tokens")}
+    return {key: value for key, value in usage.items() if isinstance(value, int)}
+
+
+class GroqProvider(LLMProvider):
+    """Groq's hosted models through the groq SDK."""
+
+    name = "groq"
+
+    def __init__(self, api_key: str, timeout: float = 30.0, max_retries: int = 2):
+        """
+        Args:
+            api_key: Groq API key (the SDK reads GROQ_BASE_URL for a different endpoint)
+            timeout: Longest a single call may take
+            max_retries: Retries of failed calls within the SDK
+        """
+        super().__init__(timeout)
+        self.client = Groq(api_key=api_key, max_retries=max_retries)
+
+    def complete(self, messages, model, temperature, max_tokens, deadline=None):
+        parts: List[str] = []
+        try:
+            if deadline is None:
+                response = self.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    top_p=1,
+                    stream=False,
+                    timeout=self.timeout
+                )
+                return response.choices[0].message.content, usage_counts(response.usage)
+
+            return self._stream(messages, model, temperature, max_tokens, deadline, parts)
+
+        except DeadlineExceeded:
+            raise
+
+        except APITimeoutError as e:
+            raise ProviderTimeout("Groq did not answer in time", retryable=not parts) from e
+
+        except APIConnectionError as e:
+            raise ProviderError(f"Groq call failed: {e}", retryable=not parts) from e
+
+        except APIStatusError as e:
+            raise ProviderError(f"Groq call failed: {e}", retryable=not parts,
+                                provider_fault=_status_is_provider_fault(e.status_code)) from e
+
+        except Exception as e:
+            raise ProviderError(f"Groq call failed: {e}", retryable=not parts, provider_fault=False) from e
+
+    def _stream(self, messages, model, temperature, max_tokens, deadline: Deadline,
+                parts: List[str]) -> Tuple[str, Dict[str, int]]:
+        """
+        Stream a completion within the request's remaining budget.
+
+        Streaming lets the deadline be re-checked as tokens arrive; closing the
+        stream on cancellation stops the provider from generating the rest.
+        """
+        stream = self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            top_p=1,
+            stream=True,
+            timeout=self._call_timeout(deadline)
+        )
+
+        usage: Dict[str, int] = {}
+        try:
+            for chunk in stream:
+                deadline.check()
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+                    emit("token", text=chunk.choices[0].delta.content)
+                # Groq reports usage on the final chunk
+                x_groq = getattr(chunk, "x_groq", None)
+                if x_groq is not None:
+                    x_usage = x_groq.get("usage") if isinstance(x_groq, dict) else getattr(x_groq, "usage", None)
+                    usage = usage_counts(x_usage)
+        finally:
+            stream.response.close()
+
+        return "".join(parts), usage
+
+
+class OpenAICompatibleProvider(LLMProvider):
+    """Any server implementing the OpenAI chat completions API, e.g. a local model server."""
+
+    def __init__(self, base_url: str, api_key: Optional[str] = None, model: Optional[str] = None,
+                 name: str = "openai-compatible", timeout: float = 30.0):
+        """
+        Args:
+            base_url: API root, e.g. http://127.0.0.1:8080/v1
+            api_key: Bearer token, if the server needs one
+            model: Model served there; replaces the per-round Groq model names
+            name: Name used in metrics and logs
+            timeout: Longest a single call may take
+        """
+        super().__init__(timeout)
+        self.url = base_url.rstrip("/") + "/chat/completions"
+        self.model = model
+        self.name = name
+        self._session = requests.Session()
+        if api_key:
+            self._session.headers["Authorization"] = f"Bearer {api_key}"
+
+    def complete(self, messages, model, temperature, max_tokens, deadline=None):
+        payload = {
+            "model": self.model or model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": deadline is not None
+        }
+        if deadline is not None:
+            payload["stream_options"] = {"include_usage": True}
+
+        parts: List[str] = []
+        try:
+            response = self._session.post(
+                self.url, json=payload, timeout=self._call_timeout(deadline), stream=deadline is not None
+            )
+            with response:
+                if response.status_code >= 400:
+                    raise ProviderError(f"{self.name} answered {response.status_code}: {response.text[:200]}",
+                                        provider_fault=_status_is_provider_fault(response.status_code))
+                if deadline is None:
+                    data = response.json()
+                    return data["choices"][0]["message"]["content"], usage_counts(data.get("usage"))
+                return self._read_stream(response, deadline, parts)
+
+        except (DeadlineExceeded, ProviderError):
+            raise
+
+        except requests.Timeout as e:
+            raise ProviderTimeout(f"{self.name} did not answer in time", retryable=not parts) from e
+
+        except requests.RequestException as e:
+            raise ProviderError(f"{self.name} call failed: {e}", retryable=not parts) from e
+
+        except (ValueError, KeyError, IndexError) as e:
+            raise ProviderError(f"{self.name} sent an unusable response: {e}", retryable=not parts,
+                                provider_fault=False) from e
+
+    @staticmethod
+    def _read_stream(response: requests.Response, deadline: Deadline,
+                     parts: List[str]) -> Tuple[str, Dict[str, int]]:
+        """Read a server-sent event stream of completion chunks."""
+        usage: Dict[str, int] = {}
+        for line in response.iter_lines():
+            deadline.check()
+            if not line.startswith(b"data:"):
+                continue
+            data = line[5:].strip()
+            if data == b"[DONE]":
+                break
+            chunk = json.loads(data)
+            for choice in chunk.get("choices") or []:
+                text = (choice.get("delta") or {}).get("content")
+                if text:
+                    parts.append(text)
+                    emit("token", text=text)
+            if chunk.get("usage"):
+                usage = usage_counts(chunk["usage"])
+        return "".join(parts), usage
+
+
+class ProviderHealth:
+    """Call outcomes and average latency of one provider."""
+
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.rejections = 0
+        self.consecutive_failures = 0
+        self.latency_ms: Optional[float] = None
+        self.unavailable_until = 0.0
+        self.last_error: Optional[str] = None
+
+    def available(self, now: float) -> bool:
+        return now >= self.unavailable_until
+
+    def record_success(self, latency_ms: float):
+        self.calls += 1
+        self.consecutive_failures = 0
+        self.latency_ms = latency_ms if self.latency_ms is None else (
+            LATENCY_SMOOTHING * latency_ms + (1 - LATENCY_SMOOTHING) * self.latency_ms
+        )
+
+    def record_rejection(self, error: str):
+        """A call that failed because of the request; the provider itself is fine."""
+        self.calls += 1
+        self.rejections += 1
+        self.last_error = error
+
+    def record_failure(self, error: str, cooldown: float):
+        self.calls += 1
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.last_error = error
+        if self.consecutive_failures >= FAILURE_THRESHOLD:
+            # Also re-arms after a single failed trial once the cooldown is over
+            self.unavailable_until = time.monotonic() + cooldown
+
+    def snapshot(self, now: float) -> Dict:
+        return {
+            "healthy": self.available(now),
+            "calls": self.calls,
+            "failures": self.failures,
+            "rejections": self.rejections,
+            "consecutive_failures": self.consecutive_failures,
+            "avg_latency_ms": round(self.latency_ms, 1) if self.latency_ms is not None else None,
+            "last_error": self.last_error
+        }
+
+
+class ProviderPool:
+    """Sends each call to the fastest healthy provider, falling back to the others."""
+
+    def __init__(self, providers: List[LLMProvider], cooldown_seconds: float = 30.0,
+                 probe_share: float = 0.05):
+        """
+        Args:
+            providers: Providers in order of preference while their latency is unknown
+            cooldown_seconds: How long a failing provider is skipped
+            probe_share: Fraction of calls sent to a slower healthy provider to measure it
+        """
+        if not providers:
+            raise ValueError("At least one LLM provider is required")
+        self.providers = providers
+        self.cooldown_seconds = cooldown_seconds
+        self.probe_share = probe_share
+        self._health = {provider.name: ProviderHealth() for provider in providers}
+        self._lock = threading.Lock()
+        self._random = random.Random()
+
+    def order(self) -> List[LLMProvider]:
+        """Providers in the order the next call tries them."""
+        now = time.monotonic()
+        with self._lock:
+            healthy = [p for p in self.providers if self._health[p.name].available(now)]
+            # Measured providers by latency; unmeasured ones keep their configured order after them
+            rank = {p.name: i for i, p in enumerate(self.providers)}
+            healthy.sort(key=lambda p: (
+                self._health[p.name].latency_ms is None,
+                self._health[p.name].latency_ms or 0.0,
+                rank[p.name]
+            ))
+            if len(healthy) > 1 and self._random.random() < self.probe_share:
+                probe = healthy.pop(self._random.randrange(1, len(healthy)))
+                healthy.insert(0, probe)
+            # Providers cooling down are the last resort, soonest available first
+            cooling = sorted(
+                (p for p in self.providers if p not in healthy),
+                key=lambda p: self._health[p.name].unavailable_until
+            )
+        return healthy + cooling
+
+    def complete(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        deadline: Optional[Deadline] = None
+    ) -> Tuple[str, Dict[str, int], str]:
+        """
+        Get a completion from the first provider that succeeds.
+
+        Returns:
+            (content, token usage counts, name of the provider that answered)
+
+        A provider that times out while the request still has budget left counts as
+        failing, and the next provider is tried.
+
+        Raises:
+            ProviderError: The last provider's error if none succeeded
+            DeadlineExceeded: If the request ran out of time or lost its client
+        """
+        error: Optional[ProviderError] = None
+        for provider in self.order():
+            started = time.perf_counter()
+            try:
+                content, usage = provider.complete(messages, model, temperature, max_tokens, deadline)
+            except ProviderError as e:
+                if isinstance(e, ProviderTimeout) and deadline is not None and deadline.exhausted():
+                    # Cut short by the request's budget, not by a slow provider
+                    raise DeadlineExceeded("Request deadline exceeded while waiting for the AI provider") from e
+                error = e
+                with self._lock:
+                    if e.provider_fault:
+                        self._health[provider.name].record_failure(str(e), self.cooldown_seconds)
+                    else:
+                        self._health[provider.name].record_rejection(str(e))
+                logger.warning("LLM provider failed: %s", e, extra={"provider": provider.name})
+                if not e.retryable:
+                    break
+                continue
+
+            with self._lock:
+                self._health[provider.name].record_success((time.perf_counter() - started) * 1000)
+            return content, usage, provider.name
+
+        raise error
+
+    def stats(self) -> Dict[str, Dict]:
+        """Get health and average latency per provider."""
+        now = time.monotonic()
+        with self._lock:
+            return {name: health.snapshot(now) for name, health in self._health.items()}
@@ -0,0 +1,177 @@
+"""
+Local stand-in for an OpenAI-compatible model server.
+
+Answers chat completions (plain or streamed) with canned interviewer text
+after a configurable delay, and can fail a share of calls. Point the backend
+at it to exercise provider fallback and load shifting without any real model:
+
+    python llm_stub_server.py --port 8081 --latency-ms 200
+    python llm_stub_server.py --port 8082 --latency-ms 50 --fail-rate 0.3
+
+    # Groq stand-in (the groq SDK reads GROQ_BASE_URL) and local fallback
+    GROQ_API_KEY=stub GROQ_BASE_URL=http://127.0.0.1:8081 \\
+    LLM_FALLBACK_URL=http://127.0.0.1:8082/v1 python app.py
+
+Latency and failure rate can be changed while it runs:
+
+    curl -X POST localhost:8081/stub/config -d '{"latency_ms": 2000, "fail_rate": 1}'
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+DEFAULT_REPLY = (
+    "Thank you, that is a good and clear answer. "
+    "Could you walk me through a project where you had to make a difficult technical decision?"
+)
+
+
+class StubConfig:
+    """Behaviour of the stand-in server, adjustable at runtime."""
+
+    def __init__(self, latency_ms: float, token_delay_ms: float, fail_rate: float, reply: str):
+        self.latency_ms = latency_ms
+        self.token_delay_ms = token_delay_ms
+        self.fail_rate = fail_rate
+        self.reply = reply
+        self.calls = 0
+        self.failures = 0
+        self.lock = threading.Lock()
+
+    def update(self, data: Dict):
+        with self.lock:
+            for key in ("latency_ms", "token_delay_ms", "fail_rate"):
+                if isinstance(data.get(key), (int, float)):
+                    setattr(self, key, float(data[key]))
+            if isinstance(data.get("reply"), str):
+                self.reply = data["reply"]
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            return {
+                "latency_ms": self.latency_ms,
+                "token_delay_ms": self.token_delay_ms,
+                "fail_rate": self.fail_rate,
+                "calls": self.calls,
+                "failures": self.failures
+            }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serves /…/chat/completions, /…/models and /stub/config."""
+
+    config: StubConfig
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _json(self, status: int, body: Dict):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _body(self) -> Dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return {}
+
+    def do_GET(self):
+        if self.path.endswith("/models"):
+            self._json(200, {"object": "list", "data": [{"id": "stub", "object": "model"}]})
+        elif self.path == "/stub/config":
+            self._json(200, self.config.snapshot())
+        else:
+            self._json(404, {"error": {"message": "Not found"}})
+
+    def do_POST(self):
+        request = self._body()
+        if self.path == "/stub/config":
+            self.config.update(request)
+            self._json(200, self.config.snapshot())
+            return
+        if not self.path.endswith("/chat/completions"):
+            self._json(404, {"error": {"message": "Not found"}})
+            return
+
+        config = self.config
+        with config.lock:
+            config.calls += 1
+            failed = random.random() < config.fail_rate
+            if failed:
+                config.failures += 1
+            latency, token_delay, reply = config.latency_ms, config.token_delay_ms, config.reply
+
+        time.sleep(latency / 1000)
+        if failed:
+            self._json(503, {"error": {"message": "Stand-in failure", "type": "server_error"}})
+            return
+
+        prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in request.get("messages", []))
+        words = reply.split(" ")
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(words),
+                 "total_tokens": prompt_tokens + len(words)}
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        model = request.get("model", "stub")
+
+        if not request.get("stream"):
+            self._json(200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": reply},
+                             "finish_reason": "stop"}],
+                "usage": usage
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        chunks = [{"content": word if i == 0 else " " + word} for i, word in enumerate(words)]
+        for delta in chunks:
+            time.sleep(token_delay / 1000)
+            self._event({"id": completion_id, "object": "chat.completion.chunk", "model": model,
+                         "choices": [{"index": 0, "delta": delta, "finish_reason": None}]})
+        # Usage arrives on the final chunk, in both the OpenAI and the Groq form
+        self._event({"id": completion_id, "object": "chat.completion.chunk", "model": model,
+                     "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                     "usage": usage, "x_groq": {"id": completion_id, "usage": usage}})
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.close_connection = True
+
+    def _event(self, data: Dict):
+        self.wfile.write(b"data: " + json.dumps(data).encode("utf-8") + b"\n\n")
+        self.wfile.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stand-in model server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-ms", type=float, default=100, help="Delay before answering")
+    parser.add_argument("--token-delay-ms", type=float, default=5, help="Delay between streamed tokens")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Share of calls answered with 503")
+    parser.add_argument("--reply", default=DEFAULT_REPLY)
+    args = parser.parse_args()
+
+    StubHandler.config = StubConfig(args.latency_ms, args.token_delay_ms, args.fail_rate, args.reply)
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    print(f"Stand-in model server on http://{args.host}:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
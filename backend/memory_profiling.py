@@ -0,0 +1,221 @@
+"""
+Memory accounting of sessions and on-demand allocation tracing.
+
+- Footprints: an estimate of the bytes held by each session, broken down into
+  conversation history, rounds, final evaluation and the rest of the session.
+  Sizes are computed by walking the objects with sys.getsizeof, counting every
+  object once per session, so strings shared with the prompt builder are only
+  attributed to the history.
+- Allocation tracing: tracemalloc is started on demand; each further snapshot
+  is diffed against the previous one and the call sites that grew the most are
+  listed. Tracing slows allocations down, so stop it when done.
+"""
+
+import linecache
+import sys
+import threading
+import tracemalloc
+from typing import Dict, Iterable, Optional, Set
+
+from pydantic import BaseModel
+
+from models import InterviewSession
+
+# Parts of a session reported separately; everything else is counted under "other"
+FOOTPRINT_PARTS = ("conversation_history", "rounds", "final_evaluation")
+
+TRACE_GROUPINGS = ("lineno", "filename", "traceback")
+
+
+def deep_sizeof(obj, seen: Set[int]) -> int:
+    """
+    Estimate the bytes held by an object and everything it references.
+
+    Args:
+        obj: Object to measure
+        seen: IDs of objects already counted; shared objects are counted once
+    """
+    stack = [obj]
+    total = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen or item is None or isinstance(item, (bool, type)):
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+
+        if isinstance(item, BaseModel):
+            stack.append(item.__dict__)
+            stack.append(item.__pydantic_fields_set__)
+            if item.__pydantic_extra__:
+                stack.append(item.__pydantic_extra__)
+        elif isinstance(item, dict):
+            for key, value in list(item.items()):
+                stack.append(key)
+                stack.append(value)
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(list(item))
+        elif hasattr(item, "__dict__") and not isinstance(item, (str, bytes, int, float)):
+            stack.append(vars(item))
+    return total
+
+
+def session_footprint(session: InterviewSession, extra: Optional[Dict[str, object]] = None,
+                      shared: Iterable[object] = ()) -> Dict:
+    """
+    Estimate the bytes held by a session.
+
+    Args:
+        session: Session to measure
+        extra: Further per-session objects (e.g. its prompt builder), reported by name;
+            only what they do not share with the session is counted
+        shared: Objects referenced by every session, which are not counted
+
+    Returns:
+        Bytes per part, the total, and the message count and text size of the history
+    """
+    seen: Set[int] = {id(obj) for obj in shared}
+    parts = {name: deep_sizeof(getattr(session, name), seen) for name in FOOTPRINT_PARTS}
+    parts["other"] = deep_sizeof(session, seen)
+    for name, obj in (extra or {}).items():
+        parts[name] = deep_sizeof(obj, seen)
+
+    history = list(session.conversation_history)
+    return {
+        "session_id": session.session_id,
+        "status": session.status,
+        "messages": len(history),
+        "history_text_bytes": sum(len(message.content.encode("utf-8")) for message in history),
+        "bytes": parts,
+        "total_bytes": sum(parts.values())
+    }
+
+
+def aggregate_footprints(footprints: Iterable[Dict], top: int = 10) -> Dict:
+    """
+    Sum session footprints and pick the largest sessions.
+
+    Returns:
+        Session count, total and average bytes per part, and the top sessions by total
+    """
+    footprints = list(footprints)
+    totals: Dict[str, int] = {}
+    for footprint in footprints:
+        for name, size in footprint["bytes"].items():
+            totals[name] = totals.get(name, 0) + size
+    total_bytes = sum(totals.values())
+    count = len(footprints)
+    return {
+        "sessions": count,
+        "total_bytes": total_bytes,
+        "avg_bytes_per_session": round(total_bytes / count) if count else 0,
+        "bytes": totals,
+        "messages": sum(footprint["messages"] for footprint in footprints),
+        "history_text_bytes": sum(footprint["history_text_bytes"] for footprint in footprints),
+        "largest": sorted(footprints, key=lambda footprint: footprint["total_bytes"], reverse=True)[:top]
+    }
+
+
+def process_memory() -> Dict:
+    """Get the resident set size of this process (Linux), and its peak."""
+    info: Dict[str, Optional[int]] = {"rss_bytes": None, "peak_rss_bytes": None}
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith(("VmRSS:", "VmHWM:")):
+                    key = "rss_bytes" if line.startswith("VmRSS:") else "peak_rss_bytes"
+                    info[key] = int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return info
+
+
+class AllocationTracer:
+    """Takes tracemalloc snapshots and diffs each one against the previous."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._previous: Optional[tracemalloc.Snapshot] = None
+        self.snapshots = 0
+
+    @staticmethod
+    def _filtered(snapshot: tracemalloc.Snapshot) -> tracemalloc.Snapshot:
+        # Leave out the allocations made by the tracing itself
+        return snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, linecache.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>")
+        ))
+
+    def snapshot(self, frames: int = 10, limit: int = 20, group_by: str = "lineno") -> Dict:
+        """
+        Start tracing, or take a snapshot and diff it against the previous one.
+
+        Args:
+            frames: Frames stored per allocation when tracing starts
+            limit: Number of call sites listed
+            group_by: "lineno", "filename" or "traceback"
+
+        Returns:
+            Tracing status, and the call sites that grew the most since the previous snapshot
+        """
+        if group_by not in TRACE_GROUPINGS:
+            raise ValueError(f"group_by must be one of: {', '.join(TRACE_GROUPINGS)}")
+
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+                self._previous = None
+
+            current = self._filtered(tracemalloc.take_snapshot())
+            previous, self._previous = self._previous, current
+            self.snapshots += 1
+
+            result = self.status()
+            if previous is None:
+                result["top"] = []
+                return result
+
+            stats = current.compare_to(previous, group_by)[:limit]
+            result["top"] = [
+                {
+                    "location": (
+                        [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback]
+                        if group_by == "traceback" else self._location(stat.traceback[0], group_by)
+                    ),
+                    "size_diff_bytes": stat.size_diff,
+                    "size_bytes": stat.size,
+                    "count_diff": stat.count_diff,
+                    "count": stat.count
+                }
+                for stat in stats
+            ]
+            return result
+
+    @staticmethod
+    def _location(frame: tracemalloc.Frame, group_by: str) -> str:
+        if group_by == "filename":
+            return frame.filename
+        line = linecache.getline(frame.filename, frame.lineno).strip()
+        return f"{frame.filename}:{frame.lineno} {line}".strip()
+
+    def stop(self) -> Dict:
+        """Stop tracing and forget the previous snapshot."""
+        with self._lock:
+            tracemalloc.stop()
+            self._previous = None
+            return self.status()
+
+    def status(self) -> Dict:
+        """Get whether tracing runs and how much memory it has seen."""
+        tracing = tracemalloc.is_tracing()
+        current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+        return {
+            "tracing": tracing,
+            "frames": tracemalloc.get_traceback_limit() if tracing else None,
+            "snapshots": self.snapshots,
+            "traced_bytes": current,
+            "traced_peak_bytes": peak,
+            "tracemalloc_overhead_bytes": tracemalloc.get_tracemalloc_memory() if tracing else 0
+        }
@@ -19,6 +19,13 @@ class QuestionAnswer(BaseModel):
     answer: str
     ai_feedback: str
     score: float = 0.0
+    near_duplicate: bool = False
+    prefiltered: Optional[str] = None  # Reason, when scored locally without AI feedback
+    duplicate_matches: List[Dict] = []
+    # Positions of the question, answer and feedback texts in conversation_history
+    question_message_index: Optional[int] = None
+    answer_message_index: Optional[int] = None
+    feedback_message_index: Optional[int] = None
 
 class RoundData(BaseModel):
     """Represents data for a single interview round."""
@@ -35,8 +42,11 @@ class InterviewSession(BaseModel):
     session_id: str
     job_role: str
     candidate_name: Optional[str] = None
+    pipeline: Optional[str] = None  # Round pipeline from the round config
+    config_version: Optional[str] = None  # Round config version the session is pinned to
     current_round: int = 1
     current_question: int = 0
+    elaboration_requests: int = 0  # Templated requests to elaborate on the current question
     status: str = "active"  # active, completed, terminated
     rounds: Dict[int, RoundData] = {}
     conversation_history: List[Message] = []
@@ -49,6 +59,10 @@ class StartInterviewRequest(BaseModel):
     job_role: str
     candidate_name: Optional[str] = None
 
+class BulkStartInterviewRequest(BaseModel):
+    """Request to start interviews for many candidates at once."""
+    candidates: List[StartInterviewRequest]
+
 class ChatRequest(BaseModel):
     """Request to send a message in the interview."""
     session_id: str
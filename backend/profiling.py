@@ -0,0 +1,201 @@
+"""
+On-demand profiling of hot routes in a live process.
+
+Two opt-in modes are supported:
+
+- Sampling: armed for N seconds or the next N matching requests (via the
+  admin endpoint or SIGUSR2). A background thread samples the stacks of
+  threads serving the watched routes and writes collapsed stacks
+  ("frame;frame;frame count"), ready for flamegraph.pl or speedscope.
+- Per-request cProfile: an admin request with `X-Profile: cprofile` is run
+  under cProfile and its stats are dumped to a .prof file.
+
+When nothing is armed, each request only pays an attribute check.
+"""
+
+import cProfile
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+DEFAULT_PROFILE_ROUTES = ("/api/chat", "/api/session/<session_id>")
+
+
+def _timestamp() -> str:
+    return datetime.now().strftime("%Y%m%dT%H%M%S%f")
+
+
+class SamplingProfiler:
+    """Statistical profiler that samples request threads of selected routes."""
+
+    def __init__(self, output_dir: str, routes: Iterable[str] = DEFAULT_PROFILE_ROUTES,
+                 interval: float = 0.005):
+        """
+        Args:
+            output_dir: Directory collapsed-stack files are written to
+            routes: URL rules whose request threads are sampled
+            interval: Seconds between samples
+        """
+        self.output_dir = output_dir
+        self.routes = set(routes)
+        self.interval = interval
+        self.active = False
+        self.last_output: Optional[str] = None
+
+        self._lock = threading.Lock()
+        self._threads: Dict[int, str] = {}
+        self._stacks: Counter = Counter()
+        self._samples = 0
+        self._ends_at: Optional[float] = None
+        self._remaining_requests: Optional[int] = None
+        self._started_at = 0.0
+
+    def arm(self, seconds: Optional[float] = None, requests: Optional[int] = None,
+            interval: Optional[float] = None) -> Dict:
+        """
+        Start sampling for a number of seconds or matching requests.
+
+        Args:
+            seconds: Stop after this many seconds
+            requests: Stop after this many watched requests have finished
+            interval: Override the sampling interval
+
+        Returns:
+            Profiler status
+
+        Raises:
+            ValueError: If neither limit is given or a value is not a positive number
+        """
+        if seconds is None and requests is None:
+            raise ValueError("Either seconds or requests must be given")
+        for name, value in (("seconds", seconds), ("requests", requests), ("interval", interval)):
+            if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0):
+                raise ValueError(f"'{name}' must be a positive number")
+
+        with self._lock:
+            if self.active:
+                raise RuntimeError("A profiling session is already running")
+
+            if interval:
+                self.interval = interval
+            self._stacks = Counter()
+            self._samples = 0
+            self._started_at = time.monotonic()
+            self._ends_at = self._started_at + seconds if seconds is not None else None
+            self._remaining_requests = requests
+            self.active = True
+
+        threading.Thread(target=self._run, name="sampling-profiler", daemon=True).start()
+        return self.status()
+
+    def request_started(self, route: Optional[str]) -> bool:
+        """
+        Register the current thread if it serves a watched route.
+
+        Returns:
+            True if the thread is being sampled
+        """
+        if not self.active or route not in self.routes:
+            return False
+
+        with self._lock:
+            if not self.active:
+                return False
+            self._threads[threading.get_ident()] = route
+            return True
+
+    def request_finished(self):
+        """Unregister the current thread and count the request toward the budget."""
+        with self._lock:
+            if self._threads.pop(threading.get_ident(), None) is None:
+                return
+            if self._remaining_requests is not None:
+                self._remaining_requests -= 1
+                if self._remaining_requests <= 0:
+                    self._finish()
+
+    @staticmethod
+    def _collapse(frame) -> str:
+        names: List[str] = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def _run(self):
+        while self.active:
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+
+            with self._lock:
+                if not self.active:
+                    return
+                for thread_id, route in self._threads.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        self._stacks[f"{route};{self._collapse(frame)}"] += 1
+                        self._samples += 1
+
+                if self._ends_at is not None and time.monotonic() >= self._ends_at:
+                    self._finish()
+
+    def _finish(self):
+        """Stop sampling and write the collapsed stacks (caller holds the lock)."""
+        self.active = False
+        self._threads.clear()
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"profile-{_timestamp()}.collapsed")
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self._stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        self.last_output = path
+
+    def status(self) -> Dict:
+        """Get the current profiling state."""
+        with self._lock:
+            return {
+                "active": self.active,
+                "samples": self._samples,
+                "interval_ms": round(self.interval * 1000, 3),
+                "routes": sorted(self.routes),
+                "seconds_left": (
+                    round(max(0.0, self._ends_at - time.monotonic()), 1)
+                    if self.active and self._ends_at else None
+                ),
+                "requests_left": self._remaining_requests if self.active else None,
+                "last_output": self.last_output
+            }
+
+
+class RequestProfiler:
+    """Runs a single request under cProfile."""
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        self._profile = cProfile.Profile()
+
+    def start(self):
+        self._profile.enable()
+
+    def stop(self, label: str) -> str:
+        """
+        Stop profiling and dump the stats.
+
+        Args:
+            label: Short name used in the file name (e.g. the route)
+
+        Returns:
+            Path of the written .prof file
+        """
+        self._profile.disable()
+        os.makedirs(self.output_dir, exist_ok=True)
+        safe_label = "".join(c if c.isalnum() else "_" for c in label).strip("_")
+        path = os.path.join(self.output_dir, f"cprofile-{safe_label}-{_timestamp()}.prof")
+        self._profile.dump_stats(path)
+        return path
@@ -0,0 +1,106 @@
+"""
+Field projection and de-duplication of session payloads.
+
+Clients can ask for a subset of a session with dotted field paths
+(e.g. "status,rounds.round_score,final_evaluation"), and can drop the
+question/answer/feedback texts of rounds that are already present in
+`conversation_history`, keeping only their message indices.
+"""
+
+import typing
+from typing import Dict, Iterable, Optional, Type
+
+from pydantic import BaseModel
+
+from models import InterviewSession
+
+# QuestionAnswer text field -> field holding its position in conversation_history
+QA_TEXT_REFERENCES = {
+    "question": "question_message_index",
+    "answer": "answer_message_index",
+    "ai_feedback": "feedback_message_index",
+}
+
+
+def _unwrap(annotation):
+    """
+    Find the model nested in a field annotation.
+
+    Returns:
+        (model class or None, whether it is inside a list/dict)
+    """
+    origin = typing.get_origin(annotation)
+    if origin is typing.Union:
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        return _unwrap(args[0]) if len(args) == 1 else (None, False)
+    if origin in (list, dict):
+        args = typing.get_args(annotation)
+        return (_unwrap(args[-1])[0] if args else None), True
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, False
+    return None, False
+
+
+def build_include(model: Type[BaseModel], fields: Iterable[str]) -> Dict:
+    """
+    Translate dotted field paths into a pydantic `include` specification.
+
+    Raises:
+        ValueError: If a path names an unknown field or descends into a non-model field
+    """
+    include: Dict = {}
+    for path in fields:
+        node, current = include, model
+        parts = path.split(".")
+        for depth, part in enumerate(parts):
+            if current is None or part not in current.model_fields:
+                raise ValueError(f"Unknown field: {path}")
+
+            if depth == len(parts) - 1:
+                node[part] = True
+                break
+            if node.get(part) is True:
+                break
+
+            current, is_collection = _unwrap(current.model_fields[part].annotation)
+            node = node.setdefault(part, {})
+            if is_collection:
+                node = node.setdefault("__all__", {})
+    return include
+
+
+def parse_fields(value: Optional[str]) -> Optional[Dict]:
+    """
+    Parse a `fields=` query parameter for InterviewSession.
+
+    Returns:
+        pydantic include specification, or None for the full session
+    """
+    if not value:
+        return None
+    fields = [field.strip() for field in value.split(",") if field.strip()]
+    return build_include(InterviewSession, fields) if fields else None
+
+
+def drop_duplicated_text(payload: Dict) -> Dict:
+    """Remove round Q&A texts that can be looked up in conversation_history by index."""
+    for round_data in payload.get("rounds", {}).values():
+        for qa in round_data.get("questions", []):
+            for text_field, index_field in QA_TEXT_REFERENCES.items():
+                if qa.get(index_field) is not None:
+                    qa.pop(text_field, None)
+    return payload
+
+
+def session_payload(session: InterviewSession, include: Optional[Dict] = None,
+                    dedupe: bool = False) -> Dict:
+    """
+    Serialize a session for API responses.
+
+    Args:
+        session: Session to serialize
+        include: Projection from parse_fields(), or None for all fields
+        dedupe: Replace Q&A texts duplicated in the history with message indices
+    """
+    payload = session.dict(include=include) if include else session.dict()
+    return drop_duplicated_text(payload) if dedupe else payload
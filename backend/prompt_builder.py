@@ -0,0 +1,148 @@
+"""
+Incrementally built, prefix-stable chat prompts.
+
+Every LLM call of an interview turn sends the round's system prompt, the
+conversation so far and a short trailing instruction. A SessionPromptBuilder
+keeps the converted messages of one session and only appends the messages
+added since its previous call, so the shared prefix (system prompt plus
+history) is byte-identical from one turn to the next and provider-side
+prompt caching can reuse it. Only the trailing instruction differs.
+
+The prefix is rebuilt when the system prompt changes (new round) or the
+history no longer continues the one seen before (a rolled-back turn).
+"""
+
+import threading
+from typing import Dict, List, Optional, Sequence
+
+from models import Message
+
+# Message roles forwarded to the provider
+PROMPT_ROLES = ("user", "assistant")
+
+
+class SessionPromptBuilder:
+    """Prompt messages of one session. Callers must hold the session's lock."""
+
+    def __init__(self, stats: Optional["PromptPrefixStats"] = None):
+        self.stats = stats
+        self._system_prompt: Optional[str] = None
+        self._messages: List[Dict[str, str]] = []
+        self._last_source: Optional[Message] = None
+        self._synced = 0
+        self._chars = 0
+
+    def _reset(self, system_prompt: str):
+        self._system_prompt = system_prompt
+        self._messages = [{"role": "system", "content": system_prompt}]
+        self._last_source = None
+        self._synced = 0
+        self._chars = len(system_prompt)
+
+    def _continues(self, history: Sequence[Message]) -> bool:
+        """Whether the history still starts with the messages already converted."""
+        if len(history) < self._synced:
+            return False
+        return self._synced == 0 or history[self._synced - 1] is self._last_source
+
+    def build(self, history: Sequence[Message], system_prompt: str,
+              instruction: str) -> List[Dict[str, str]]:
+        """
+        Get the messages for one LLM call.
+
+        Args:
+            history: Conversation history of the session
+            system_prompt: Formatted system prompt of the current round
+            instruction: Trailing user instruction for this call
+
+        Returns:
+            New list of message dicts; the instruction is always last
+        """
+        # prefix_chars: leading characters identical to the previous call of this session
+        if system_prompt != self._system_prompt:
+            self._reset(system_prompt)
+            prefix_chars, rebuilt = 0, True
+        elif not self._continues(history):
+            self._reset(system_prompt)
+            prefix_chars, rebuilt = self._chars, True
+        else:
+            prefix_chars, rebuilt = self._chars, False
+
+        for msg in history[self._synced:]:
+            if msg.role in PROMPT_ROLES:
+                self._messages.append({"role": msg.role, "content": msg.content})
+                self._chars += len(msg.content)
+        if len(history) > self._synced:
+            self._synced = len(history)
+            self._last_source = history[-1]
+
+        if self.stats is not None:
+            self.stats.record(prefix_chars, self._chars, self._chars + len(instruction), rebuilt)
+
+        return self._messages + [{"role": "user", "content": instruction}]
+
+    @property
+    def prefix_chars(self) -> int:
+        """Length of the stable prefix (system prompt and history contents)."""
+        return self._chars
+
+
+class PromptPrefixStats:
+    """Aggregate prefix reuse of all prompt builders."""
+
+    def __init__(self):
+        self.builds = 0
+        self.rebuilds = 0
+        self.reused_prefix_chars = 0
+        self.stable_prefix_chars = 0
+        self.prompt_chars = 0
+        self._lock = threading.Lock()
+
+    def record(self, reused_chars: int, stable_chars: int, prompt_chars: int, rebuilt: bool):
+        with self._lock:
+            self.builds += 1
+            if rebuilt:
+                self.rebuilds += 1
+            self.reused_prefix_chars += reused_chars
+            self.stable_prefix_chars += stable_chars
+            self.prompt_chars += prompt_chars
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            builds = self.builds or 1
+            return {
+                "builds": self.builds,
+                "rebuilds": self.rebuilds,
+                "avg_prompt_chars": round(self.prompt_chars / builds),
+                "avg_stable_prefix_chars": round(self.stable_prefix_chars / builds),
+                "avg_reused_prefix_chars": round(self.reused_prefix_chars / builds),
+                "reused_ratio": round(self.reused_prefix_chars / self.prompt_chars, 3) if self.prompt_chars else 0.0
+            }
+
+
+class PromptBuilderRegistry:
+    """One prompt builder per active session."""
+
+    def __init__(self):
+        self.stats = PromptPrefixStats()
+        self._builders: Dict[str, SessionPromptBuilder] = {}
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> SessionPromptBuilder:
+        builder = self._builders.get(session_id)
+        if builder is None:
+            with self._lock:
+                builder = self._builders.setdefault(session_id, SessionPromptBuilder(self.stats))
+        return builder
+
+    def peek(self, session_id: str) -> Optional[SessionPromptBuilder]:
+        """Get the builder of a session without creating one."""
+        return self._builders.get(session_id)
+
+    def discard(self, session_id: str):
+        """Drop the builder of a finished session."""
+        with self._lock:
+            self._builders.pop(session_id, None)
+
+    def snapshot(self) -> Dict:
+        return {"sessions": len(self._builders), **self.stats.snapshot()}
@@ -0,0 +1,467 @@
+"""
+Offline regression harness for prompt and model changes.
+
+Replays the candidate answers of archived sessions through the current
+GroqService flow and round config, re-scores them with InterviewEvaluator and
+compares the result with the archived scores (or with an earlier run):
+
+- score drift per question and round
+- pass/fail flips of finished rounds, and changes of batch and recommendation
+- latency and token usage per LLM call, against an earlier run
+
+Each answer is evaluated in the context of the archived conversation up to
+that answer, so one changed feedback does not shift the questions after it.
+New questions are not generated: the archived answers belong to the archived
+questions.
+
+Results are appended to <output-dir>/results.jsonl as each session finishes;
+a rerun with the same output directory skips the sessions already done.
+
+Usage:
+    python regression.py --input sessions.jsonl --output-dir regression/run1 --concurrency 16
+    python regression.py --input sessions.jsonl --output-dir regression/run2 \\
+        --baseline regression/run1/results.jsonl --base-url http://127.0.0.1:8081/v1
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from pydantic import ValidationError
+
+from deadlines import Deadline, deadline_scope
+from evaluator import InterviewEvaluator
+from models import InterviewSession
+from prompt_builder import SessionPromptBuilder
+from round_registry import RoundConfig, default_registry
+
+logger = logging.getLogger(__name__)
+
+RESULTS_FILE = "results.jsonl"
+SUMMARY_FILE = "summary.json"
+
+# Rounds whose pass/fail decision was made
+FINISHED_ROUND_STATUSES = ("completed", "failed")
+
+# Largest drifts and flips listed in the summary
+MAX_LISTED = 20
+
+
+class _UsageRecorder:
+    """Wraps a provider pool and records latency and tokens of the calls made by each thread."""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self._local = threading.local()
+
+    def start(self):
+        self._local.calls = []
+
+    def calls(self) -> List[Dict]:
+        return getattr(self._local, "calls", [])
+
+    def complete(self, messages, model, temperature, max_tokens, deadline=None):
+        started = time.perf_counter()
+        content, usage, provider = self.pool.complete(messages, model, temperature, max_tokens, deadline)
+        self.calls().append({
+            "provider": provider,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+            "prompt_tokens": usage.get("prompt_tokens", 0),
+            "completion_tokens": usage.get("completion_tokens", 0)
+        })
+        return content, usage, provider
+
+    def stats(self) -> Dict:
+        return self.pool.stats()
+
+
+def replay_session(data: Dict, groq_service, config: RoundConfig, recorder: _UsageRecorder,
+                   timeout: float = 60.0) -> Dict:
+    """
+    Re-evaluate the answers of one archived session.
+
+    Args:
+        data: Archived session dict
+        groq_service: GroqService whose provider pool is wrapped by recorder
+        config: Round config the answers are evaluated with
+        recorder: Collects the LLM calls of this thread
+        timeout: Time budget per LLM call
+
+    Returns:
+        Result record with baseline and new scores per question, round and final evaluation
+    """
+    session = InterviewSession(**data)
+    pipeline = config.pipeline(session.pipeline) if session.pipeline else config.pipeline_for(session.job_role)
+    evaluator = InterviewEvaluator()
+    builder = SessionPromptBuilder()
+    history = session.conversation_history
+    recorder.start()
+
+    questions, rounds = [], []
+    round_scores: Dict[int, float] = {}
+    skipped = 0
+    for round_number, round_data in sorted(session.rounds.items()):
+        if not round_data.questions:
+            continue
+        round_spec = pipeline.round(round_number)
+        system_prompt = config.prompt(pipeline, round_number, session.job_role)
+        total_questions = round_spec.questions_count
+
+        scores = []
+        for qa in round_data.questions:
+            if qa.answer_message_index is None or qa.answer_message_index >= len(history):
+                skipped += 1
+                continue
+            calls_before = len(recorder.calls())
+            if qa.prefiltered:
+                # Scored locally by the answer pre-filter; no AI feedback to replay
+                score = evaluator.calculate_question_score(
+                    qa.answer, qa.ai_feedback, qa.question_number, total_questions, ai_score=0
+                )
+            else:
+                with deadline_scope(Deadline(timeout)):
+                    feedback = groq_service.evaluate_answer(
+                        history[:qa.answer_message_index + 1],
+                        system_prompt,
+                        round_number,
+                        qa.question_number == total_questions,
+                        prompt_builder=builder
+                    )
+                score = evaluator.calculate_question_score(qa.answer, feedback, qa.question_number, total_questions)
+            scores.append(score)
+            calls = recorder.calls()[calls_before:]
+            questions.append({
+                "round": round_number,
+                "question_number": qa.question_number,
+                "baseline_score": round(qa.score, 2),
+                "score": round(score, 2),
+                "latency_ms": round(sum(call["latency_ms"] for call in calls), 1),
+                "prompt_tokens": sum(call["prompt_tokens"] for call in calls),
+                "completion_tokens": sum(call["completion_tokens"] for call in calls)
+            })
+
+        round_score = evaluator.calculate_round_score(scores, round_spec.question_weights)
+        round_scores[round_number] = round_score
+        finished = round_data.status in FINISHED_ROUND_STATUSES and len(scores) == len(round_data.questions)
+        passed = evaluator.determine_round_pass(round_score, round_spec.pass_threshold)[0] if finished else None
+        rounds.append({
+            "round": round_number,
+            "baseline_score": round_data.round_score,
+            "score": round_score,
+            "baseline_passed": round_data.passed if finished else None,
+            "passed": passed
+        })
+
+    final = None
+    if session.status == "completed" and session.final_evaluation:
+        evaluation = evaluator.calculate_final_evaluation(round_scores, pipeline.final_weights)
+        final = {
+            "baseline_overall_score": session.final_evaluation.get("overall_score"),
+            "overall_score": round(evaluation["overall_score"], 2),
+            "baseline_batch": session.final_evaluation.get("batch"),
+            "batch": evaluation["batch"],
+            "baseline_recommendation": session.final_evaluation.get("recommendation"),
+            "recommendation": evaluation["recommendation"]
+        }
+
+    calls = recorder.calls()
+    return {
+        "session_id": session.session_id,
+        "job_role": session.job_role,
+        "questions": questions,
+        "rounds": rounds,
+        "final": final,
+        "skipped_questions": skipped,
+        "calls": len(calls),
+        "providers": sorted({call["provider"] for call in calls}),
+        "latency_ms": round(sum(call["latency_ms"] for call in calls), 1),
+        "prompt_tokens": sum(call["prompt_tokens"] for call in calls),
+        "completion_tokens": sum(call["completion_tokens"] for call in calls)
+    }
+
+
+# ----------------------------------------------------------------------
+# Running
+# ----------------------------------------------------------------------
+
+def _read_jsonl(path: str) -> Iterator[Dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def load_results(path: str) -> Dict[str, Dict]:
+    """Load a results file; the last successful record of each session wins."""
+    results: Dict[str, Dict] = {}
+    if not os.path.exists(path):
+        return results
+    for record in _read_jsonl(path):
+        if "error" not in record:
+            results[record["session_id"]] = record
+    return results
+
+
+def run(sessions: Iterable[Dict], groq_service, output_dir: str, concurrency: int = 8,
+        timeout: float = 60.0, limit: Optional[int] = None) -> Dict:
+    """
+    Replay sessions in parallel, appending each result to the results file.
+
+    At most twice `concurrency` sessions are read ahead, so memory stays bounded for
+    any archive size. Sessions already in the results file are skipped.
+
+    Returns:
+        Counts of replayed, skipped and failed sessions
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    results_path = os.path.join(output_dir, RESULTS_FILE)
+    done = set(load_results(results_path))
+    config = default_registry().current()
+    recorder = _UsageRecorder(groq_service.providers)
+    groq_service.providers = recorder
+
+    counts = {"replayed": 0, "resumed": 0, "failed": 0}
+    write_lock = threading.Lock()
+    started = time.perf_counter()
+
+    def replay(data: Dict):
+        try:
+            record = replay_session(data, groq_service, config, recorder, timeout)
+        except (ValidationError, TypeError) as e:
+            record = {"session_id": data.get("session_id"), "error": f"Invalid session: {e}"}
+        except Exception as e:
+            logger.warning("Replay failed: %s", e, extra={"session_id": data.get("session_id")})
+            record = {"session_id": data.get("session_id"), "error": str(e)}
+        with write_lock:
+            results.write(json.dumps(record) + "\n")
+            results.flush()
+            counts["failed" if "error" in record else "replayed"] += 1
+            finished = counts["replayed"] + counts["failed"]
+            if finished % 100 == 0:
+                logger.info("Replay progress", extra={
+                    **counts, "sessions_per_second": round(finished / (time.perf_counter() - started), 2)
+                })
+
+    with open(results_path, "a", encoding="utf-8") as results, \
+            ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="replay") as executor:
+        pending = set()
+        submitted = 0
+        for data in sessions:
+            if limit is not None and submitted >= limit:
+                break
+            if data.get("session_id") in done:
+                counts["resumed"] += 1
+                continue
+            if len(pending) >= concurrency * 2:
+                _, pending = wait(pending, return_when=FIRST_COMPLETED)
+            pending.add(executor.submit(replay, data))
+            submitted += 1
+        wait(pending)
+
+    groq_service.providers = recorder.pool
+    return {**counts, "elapsed_seconds": round(time.perf_counter() - started, 1)}
+
+
+# ----------------------------------------------------------------------
+# Report
+# ----------------------------------------------------------------------
+
+def _percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(int(fraction * len(ordered)), len(ordered) - 1)], 2)
+
+
+def _distribution(values: List[float]) -> Dict:
+    return {
+        "mean": round(sum(values) / len(values), 2) if values else None,
+        "p50": _percentile(values, 0.5),
+        "p95": _percentile(values, 0.95),
+        "max": round(max(values), 2) if values else None
+    }
+
+
+def _cost(results: Iterable[Dict]) -> Dict:
+    """Latency per LLM call and tokens per session."""
+    results = list(results)
+    call_latencies = [q["latency_ms"] for r in results for q in r["questions"]]
+    return {
+        "sessions": len(results),
+        "latency_ms_per_call": _distribution(call_latencies),
+        "prompt_tokens_per_session": _distribution([r["prompt_tokens"] for r in results]),
+        "completion_tokens_per_session": _distribution([r["completion_tokens"] for r in results]),
+        "total_tokens": sum(r["prompt_tokens"] + r["completion_tokens"] for r in results)
+    }
+
+
+def _delta(current: Dict, baseline: Dict) -> Dict:
+    """Difference of each number in two nested dicts of the same shape."""
+    delta = {}
+    for key, value in current.items():
+        other = baseline.get(key)
+        if isinstance(value, dict) and isinstance(other, dict):
+            delta[key] = _delta(value, other)
+        elif isinstance(value, (int, float)) and isinstance(other, (int, float)):
+            delta[key] = round(value - other, 2)
+    return delta
+
+
+def _with_baseline(result: Dict, baseline: Dict) -> Dict:
+    """Use the scores of an earlier run as baseline instead of the archived ones."""
+    before = {(q["round"], q["question_number"]): q["score"] for q in baseline["questions"]}
+    rounds = {r["round"]: r for r in baseline["rounds"]}
+    final = baseline.get("final") or {}
+    return {
+        **result,
+        "questions": [
+            {**q, "baseline_score": before.get((q["round"], q["question_number"]), q["baseline_score"])}
+            for q in result["questions"]
+        ],
+        "rounds": [
+            {**r, "baseline_score": rounds[r["round"]]["score"], "baseline_passed": rounds[r["round"]]["passed"]}
+            if r["round"] in rounds else r
+            for r in result["rounds"]
+        ],
+        "final": {
+            **result["final"],
+            "baseline_overall_score": final.get("overall_score"),
+            "baseline_batch": final.get("batch"),
+            "baseline_recommendation": final.get("recommendation")
+        } if result.get("final") and final else result.get("final")
+    }
+
+
+def summarize(results: Dict[str, Dict], baseline: Optional[Dict[str, Dict]] = None) -> Dict:
+    """
+    Compare replayed scores with their baseline: the archived session, or an earlier run.
+
+    Returns:
+        Score drift, pass/fail flips, batch and recommendation changes, and latency and
+        token usage (with deltas when an earlier run is given)
+    """
+    if baseline is not None:
+        results = {
+            session_id: _with_baseline(result, baseline[session_id]) if session_id in baseline else result
+            for session_id, result in results.items()
+        }
+
+    drifts = []
+    for result in results.values():
+        for q in result["questions"]:
+            drifts.append({
+                "session_id": result["session_id"], "round": q["round"], "question_number": q["question_number"],
+                "baseline_score": q["baseline_score"], "score": q["score"],
+                "drift": round(q["score"] - q["baseline_score"], 2)
+            })
+    round_drifts = [
+        r["score"] - r["baseline_score"] for result in results.values() for r in result["rounds"]
+        if r["baseline_passed"] is not None
+    ]
+
+    flips = {"pass_to_fail": [], "fail_to_pass": []}
+    for result in results.values():
+        for r in result["rounds"]:
+            if r["passed"] is None or r["baseline_passed"] is None or r["passed"] == r["baseline_passed"]:
+                continue
+            flip = {"session_id": result["session_id"], "round": r["round"],
+                    "baseline_score": r["baseline_score"], "score": r["score"]}
+            flips["pass_to_fail" if r["baseline_passed"] else "fail_to_pass"].append(flip)
+
+    finals = [result["final"] for result in results.values() if result.get("final")]
+    summary = {
+        "sessions": len(results),
+        "questions": len(drifts),
+        "question_score_drift": {
+            "mean": _distribution([d["drift"] for d in drifts])["mean"],
+            "abs": _distribution([abs(d["drift"]) for d in drifts]),
+            "largest": sorted(drifts, key=lambda d: abs(d["drift"]), reverse=True)[:MAX_LISTED]
+        },
+        "round_score_drift": {
+            "mean": _distribution(round_drifts)["mean"],
+            "abs": _distribution([abs(d) for d in round_drifts])
+        },
+        "round_flips": {
+            "pass_to_fail": len(flips["pass_to_fail"]),
+            "fail_to_pass": len(flips["fail_to_pass"]),
+            "examples": (flips["pass_to_fail"] + flips["fail_to_pass"])[:MAX_LISTED]
+        },
+        "final_changes": {
+            "sessions": len(finals),
+            "batch": sum(1 for f in finals if f["batch"] != f["baseline_batch"]),
+            "recommendation": sum(1 for f in finals if f["recommendation"] != f["baseline_recommendation"])
+        },
+        "cost": _cost(results.values())
+    }
+
+    if baseline is not None:
+        both = [session_id for session_id in results if session_id in baseline]
+        baseline_cost = _cost(baseline[session_id] for session_id in both)
+        current_cost = _cost(results[session_id] for session_id in both)
+        summary["cost_vs_baseline"] = {
+            "sessions": len(both),
+            "baseline": baseline_cost,
+            "delta": _delta(current_cost, baseline_cost)
+        }
+    return summary
+
+
+# ----------------------------------------------------------------------
+# Command line
+# ----------------------------------------------------------------------
+
+def _groq_service(base_url: Optional[str], model: Optional[str]):
+    """The backend's GroqService, or one calling only the given OpenAI-compatible server."""
+    if not base_url:
+        from app import get_groq_service
+        return get_groq_service()
+
+    from groq_service import GroqService
+    from llm_providers import OpenAICompatibleProvider, ProviderPool
+    provider = OpenAICompatibleProvider(base_url, api_key=os.getenv("LLM_FALLBACK_API_KEY"), model=model)
+    return GroqService(providers=ProviderPool([provider]))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay archived interviews against the current prompts and models.")
+    parser.add_argument("--input", required=True, help="JSON-lines file with one archived session per line")
+    parser.add_argument("--output-dir", default="regression", help="Directory for results and summary")
+    parser.add_argument("--baseline", help="results.jsonl of an earlier run to compare against")
+    parser.add_argument("--concurrency", type=int, default=8, help="Sessions replayed in parallel")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Time budget per LLM call in seconds")
+    parser.add_argument("--limit", type=int, help="Replay at most this many new sessions")
+    parser.add_argument("--base-url", help="OpenAI-compatible API root to use instead of the configured providers")
+    parser.add_argument("--model", help="Model name sent to --base-url")
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    from structured_logging import setup_logging
+
+    load_dotenv()
+    setup_logging()
+    groq_service = _groq_service(args.base_url, args.model)
+    counts = run(_read_jsonl(args.input), groq_service, args.output_dir,
+                 concurrency=args.concurrency, timeout=args.timeout, limit=args.limit)
+
+    results = load_results(os.path.join(args.output_dir, RESULTS_FILE))
+    summary = summarize(results, load_results(args.baseline) if args.baseline else None)
+    summary["run"] = {**counts, "providers": groq_service.providers.stats()}
+    with open(os.path.join(args.output_dir, SUMMARY_FILE), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+
+    # Full lists of drifts and flips are in the summary file
+    summary["question_score_drift"]["largest"] = summary["question_score_drift"]["largest"][:3]
+    summary["round_flips"]["examples"] = summary["round_flips"]["examples"][:3]
+    print(json.dumps(summary, indent=2))
+    return 0 if counts["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+Detailed final reports for recruiters.
+
+When an interview finishes, a background job (see job_queue.py) asks the LLM
+for an assessment of every round: strengths, gaps and evidence quoted from
+the candidate's answers. Quotes that do not appear in the answers are dropped,
+so a report never attributes words to a candidate that they did not say.
+"""
+
+import json
+import re
+from typing import Dict, List
+
+from models import InterviewSession
+
+REPORT_JOB = "final_report"
+
+_JSON_OBJECT = re.compile(r"\{.*\}", re.DOTALL)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def report_payload(session: InterviewSession) -> Dict:
+    """Take what a report needs from a finished session (the job outlives the session)."""
+    return {
+        "session_id": session.session_id,
+        "job_role": session.job_role,
+        "candidate_name": session.candidate_name,
+        "status": session.status,
+        "final_evaluation": session.final_evaluation,
+        "rounds": [
+            {
+                "round_number": round_data.round_number,
+                "round_name": round_data.round_name,
+                "round_score": round_data.round_score,
+                "passed": round_data.passed,
+                "questions": [
+                    qa.dict(include={"question_number", "question", "answer", "ai_feedback", "score"})
+                    for qa in round_data.questions
+                ]
+            }
+            for _, round_data in sorted(session.rounds.items())
+            if round_data.questions
+        ]
+    }
+
+
+def _normalize(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).strip().lower()
+
+
+def parse_round_report(text: str, questions: List[Dict]) -> Dict:
+    """
+    Parse the LLM's round assessment, keeping only quotes found in the answers.
+
+    Falls back to the raw text as summary when the response is not valid JSON.
+    """
+    match = _JSON_OBJECT.search(text or "")
+    try:
+        data = json.loads(match.group(0)) if match else None
+    except ValueError:
+        data = None
+    if not isinstance(data, dict):
+        return {"summary": (text or "").strip(), "strengths": [], "gaps": [], "evidence": []}
+
+    answers = {qa["question_number"]: _normalize(qa["answer"]) for qa in questions}
+    evidence = []
+    for item in data.get("evidence") or []:
+        if not isinstance(item, dict) or not isinstance(item.get("quote"), str):
+            continue
+        quote = _normalize(item["quote"])
+        number = item.get("question_number")
+        if quote and (quote in answers.get(number, "") or any(quote in answer for answer in answers.values())):
+            evidence.append({
+                "question_number": number,
+                "quote": item["quote"].strip(),
+                "supports": item.get("supports")
+            })
+
+    return {
+        "summary": str(data.get("summary", "")).strip(),
+        "strengths": [str(item) for item in data.get("strengths") or []],
+        "gaps": [str(item) for item in data.get("gaps") or []],
+        "evidence": evidence
+    }
+
+
+def build_report(payload: Dict, groq_service) -> Dict:
+    """
+    Generate the detailed report of a finished interview.
+
+    Args:
+        payload: Output of report_payload()
+        groq_service: GroqService used for the round assessments
+
+    Returns:
+        Report with the final evaluation and one assessment per round
+    """
+    rounds = []
+    for round_data in payload["rounds"]:
+        text = groq_service.generate_round_report(
+            payload["job_role"], round_data["round_number"], round_data["round_name"], round_data["questions"]
+        )
+        rounds.append({
+            "round_number": round_data["round_number"],
+            "round_name": round_data["round_name"],
+            "round_score": round_data["round_score"],
+            "passed": round_data["passed"],
+            **parse_round_report(text, round_data["questions"])
+        })
+
+    return {
+        "session_id": payload["session_id"],
+        "job_role": payload["job_role"],
+        "candidate_name": payload["candidate_name"],
+        "status": payload["status"],
+        "final_evaluation": payload["final_evaluation"],
+        "rounds": rounds
+    }
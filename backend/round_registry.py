@@ -0,0 +1,415 @@
+"""
+Data-driven interview rounds loaded from a config file.
+
+The config (rounds/rounds.json by default) defines rounds - prompt, number
+of questions, pass threshold and question weights - and pipelines, which are
+ordered lists of rounds with final-score weights. Job roles can be mapped to
+their own pipeline, so some roles run shorter or longer interviews.
+
+The config is validated when it is loaded; weights are normalized and
+prompts formatted once, not per request. The config and prompt files are
+re-checked every few seconds, and a changed config replaces the active one
+without restarting workers. An invalid change is logged and ignored.
+Sessions are pinned to the config they started with, which is kept until the
+last session using it is released, so a reload only affects new interviews.
+
+With a shared cache region (shared_cache.py), the formatted prompts are read
+from the region, published once per machine, instead of being formatted by
+every worker; prompts missing from it are formatted and cached locally as before.
+
+Configuration (environment variables):
+    ROUNDS_CONFIG                 Path of the config file (default: rounds/rounds.json)
+    ROUNDS_RELOAD_INTERVAL        Seconds between change checks; 0 disables reloading (default: 2)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from shared_cache import SharedCache, default_shared_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rounds", "rounds.json")
+
+# Placeholders available in prompt templates
+PROMPT_PLACEHOLDERS = ("job_role", "questions_count", "round_number", "total_rounds")
+
+# Formatted prompts kept per config for roles not listed in the config
+MAX_CACHED_PROMPTS = 1000
+
+
+class RoundConfigError(ValueError):
+    """Raised when the round config is missing or invalid."""
+
+
+def shared_prompt_key(version: str, pipeline: str, round_number: int, job_role: str) -> str:
+    """Key of a formatted prompt in the shared cache region."""
+    return f"prompt/{version}/{pipeline}/{round_number}/{job_role}"
+
+
+def _normalize(weights: List[float], label: str) -> Tuple[float, ...]:
+    if not weights or any(not isinstance(w, (int, float)) or w <= 0 for w in weights):
+        raise RoundConfigError(f"{label} must be a list of positive numbers")
+    total = float(sum(weights))
+    return tuple(w / total for w in weights)
+
+
+class RoundSpec:
+    """One configured round."""
+
+    def __init__(self, key: str, data: Dict, base_dir: str):
+        label = f"Round '{key}'"
+        self.key = key
+        self.name = data.get("name")
+        self.description = data.get("description", "")
+        self.questions_count = data.get("questions_count")
+        self.focus_areas = list(data.get("focus_areas", []))
+        self.pass_threshold = data.get("pass_threshold")
+
+        if not isinstance(self.name, str) or not self.name:
+            raise RoundConfigError(f"{label}: 'name' is required")
+        if not isinstance(self.questions_count, int) or self.questions_count < 1:
+            raise RoundConfigError(f"{label}: 'questions_count' must be a positive integer")
+        if not isinstance(self.pass_threshold, (int, float)) or not 0 <= self.pass_threshold <= 100:
+            raise RoundConfigError(f"{label}: 'pass_threshold' must be between 0 and 100")
+
+        weights = data.get("question_weights") or [1.0] * self.questions_count
+        if len(weights) != self.questions_count:
+            raise RoundConfigError(f"{label}: 'question_weights' needs {self.questions_count} entries")
+        self.question_weights = _normalize(weights, f"{label}: 'question_weights'")
+
+        self.prompt_path: Optional[str] = None
+        if "prompt_file" in data:
+            self.prompt_path = os.path.join(base_dir, data["prompt_file"])
+            try:
+                with open(self.prompt_path, encoding="utf-8") as f:
+                    self.prompt_template = f.read().rstrip()
+            except OSError as e:
+                raise RoundConfigError(f"{label}: cannot read prompt file: {e}") from e
+        else:
+            self.prompt_template = data.get("prompt")
+        if not isinstance(self.prompt_template, str) or not self.prompt_template:
+            raise RoundConfigError(f"{label}: 'prompt' or 'prompt_file' is required")
+
+        # Information passed to the greeting prompt
+        self.info = {
+            "name": self.name,
+            "description": self.description,
+            "questions_count": self.questions_count,
+            "focus_areas": self.focus_areas
+        }
+
+    def format_prompt(self, job_role: str, round_number: int, total_rounds: int) -> str:
+        return self.prompt_template.format(
+            job_role=job_role,
+            questions_count=self.questions_count,
+            round_number=round_number,
+            total_rounds=total_rounds
+        )
+
+
+class Pipeline:
+    """Ordered rounds of one interview flow, numbered from 1."""
+
+    def __init__(self, name: str, data: Dict, rounds: Dict[str, RoundSpec]):
+        label = f"Pipeline '{name}'"
+        keys = data.get("rounds")
+        if not isinstance(keys, list) or not keys:
+            raise RoundConfigError(f"{label}: 'rounds' must be a non-empty list")
+        unknown = [key for key in keys if key not in rounds]
+        if unknown:
+            raise RoundConfigError(f"{label}: unknown rounds {unknown}")
+
+        self.name = name
+        self.rounds: Tuple[RoundSpec, ...] = tuple(rounds[key] for key in keys)
+
+        weights = data.get("final_weights") or [1.0] * len(keys)
+        if len(weights) != len(keys):
+            raise RoundConfigError(f"{label}: 'final_weights' needs {len(keys)} entries")
+        self.final_weights: Dict[int, float] = dict(
+            enumerate(_normalize(weights, f"{label}: 'final_weights'"), start=1)
+        )
+
+    @property
+    def total_rounds(self) -> int:
+        return len(self.rounds)
+
+    def round(self, round_number: int) -> RoundSpec:
+        """Get a round by number (clamped, in case a reload shortened the pipeline)."""
+        return self.rounds[min(max(round_number, 1), len(self.rounds)) - 1]
+
+    def is_last(self, round_number: int) -> bool:
+        return round_number >= len(self.rounds)
+
+
+class RoundConfig:
+    """A validated, immutable snapshot of the round config."""
+
+    def __init__(self, data: Dict, base_dir: str, shared: Optional[SharedCache] = None):
+        if not isinstance(data, dict):
+            raise RoundConfigError("Config must be a JSON object")
+
+        round_data = data.get("rounds")
+        if not isinstance(round_data, dict) or not round_data:
+            raise RoundConfigError("'rounds' must be a non-empty object")
+        self.rounds = {key: RoundSpec(key, value, base_dir) for key, value in round_data.items()}
+
+        pipeline_data = data.get("pipelines")
+        if not isinstance(pipeline_data, dict) or not pipeline_data:
+            raise RoundConfigError("'pipelines' must be a non-empty object")
+        self.pipelines = {
+            name: Pipeline(name, value, self.rounds) for name, value in pipeline_data.items()
+        }
+
+        self.default_pipeline = data.get("default_pipeline") or next(iter(self.pipelines))
+        if self.default_pipeline not in self.pipelines:
+            raise RoundConfigError(f"Unknown default_pipeline '{self.default_pipeline}'")
+
+        self.roles: Dict[str, str] = {}
+        for role, pipeline in (data.get("roles") or {}).items():
+            if pipeline not in self.pipelines:
+                raise RoundConfigError(f"Role '{role}' uses unknown pipeline '{pipeline}'")
+            self.roles[role.strip().lower()] = pipeline
+
+        # Content hash, identical in every worker that loaded the same files
+        digest = hashlib.sha1(json.dumps(data, sort_keys=True).encode("utf-8"))
+        for key in sorted(self.rounds):
+            digest.update(self.rounds[key].prompt_template.encode("utf-8"))
+        self.version = digest.hexdigest()[:12]
+        self.prompt_files = sorted({spec.prompt_path for spec in self.rounds.values() if spec.prompt_path})
+
+        # Catch templates with unknown placeholders at load time, not mid-interview
+        for pipeline in self.pipelines.values():
+            for round_number, spec in enumerate(pipeline.rounds, start=1):
+                try:
+                    spec.format_prompt("role", round_number, pipeline.total_rounds)
+                except (KeyError, IndexError, ValueError) as e:
+                    raise RoundConfigError(
+                        f"Round '{spec.key}': invalid prompt placeholder {e}; "
+                        f"allowed: {', '.join(PROMPT_PLACEHOLDERS)}"
+                    ) from e
+
+        # Prompts are formatted once per (pipeline, round, role); configured roles up front,
+        # unless the shared region holds them
+        self.shared = shared
+        self._prompts: Dict[Tuple[str, int, str], str] = {}
+        self._prompts_lock = threading.Lock()
+        self._configured_roles = list(data.get("roles") or {})
+        if shared is None:
+            for role in self._configured_roles:
+                pipeline = self.pipeline_for(role)
+                for round_number in range(1, pipeline.total_rounds + 1):
+                    self.prompt(pipeline, round_number, role)
+
+    def pipeline(self, name: Optional[str]) -> Pipeline:
+        """Get a pipeline by name, falling back to the default one."""
+        return self.pipelines.get(name) or self.pipelines[self.default_pipeline]
+
+    def pipeline_for(self, job_role: str) -> Pipeline:
+        """Get the pipeline configured for a job role."""
+        return self.pipeline(self.roles.get(job_role.strip().lower()))
+
+    def prompt(self, pipeline: Pipeline, round_number: int, job_role: str) -> str:
+        """Get the formatted system prompt of a round for a job role."""
+        key = (pipeline.name, round_number, job_role)
+        prompt = self._prompts.get(key)
+        if prompt is None and self.shared is not None:
+            # Decoded once per region generation and shared by every caller in this worker
+            prompt = self.shared.get(shared_prompt_key(self.version, *key))
+            if prompt is not None:
+                return prompt
+        if prompt is None:
+            prompt = pipeline.round(round_number).format_prompt(job_role, round_number, pipeline.total_rounds)
+            with self._prompts_lock:
+                if len(self._prompts) >= MAX_CACHED_PROMPTS:
+                    self._prompts.clear()
+                self._prompts[key] = prompt
+        return prompt
+
+    def shared_entries(self, job_roles: Iterable[str] = ()) -> Dict[str, str]:
+        """
+        Formatted prompts to publish in the shared cache region.
+
+        Args:
+            job_roles: Roles to include besides the ones configured, in the pipeline they use
+        """
+        entries = {}
+        for role in dict.fromkeys(list(self._configured_roles) + list(job_roles)):
+            pipeline = self.pipeline_for(role)
+            for round_number in range(1, pipeline.total_rounds + 1):
+                key = shared_prompt_key(self.version, pipeline.name, round_number, role)
+                entries[key] = pipeline.round(round_number).format_prompt(
+                    role, round_number, pipeline.total_rounds
+                )
+        return entries
+
+
+def load_config(path: str, shared: Optional[SharedCache] = None) -> RoundConfig:
+    """
+    Load and validate a round config file.
+
+    Args:
+        path: Config file
+        shared: Shared cache region to read formatted prompts from
+
+    Raises:
+        RoundConfigError: If the file cannot be read or is invalid
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise RoundConfigError(f"Cannot load round config {path}: {e}") from e
+
+    return RoundConfig(data, os.path.dirname(os.path.abspath(path)), shared)
+
+
+class RoundRegistry:
+    """Holds the active round config and swaps in changes to its files."""
+
+    def __init__(self, path: str, reload_interval: float = 2.0, shared: Optional[SharedCache] = None):
+        """
+        Args:
+            path: Config file path
+            reload_interval: Seconds between checks for changed files (0 disables reloading)
+            shared: Shared cache region to read formatted prompts from
+
+        Raises:
+            RoundConfigError: If the initial config is invalid
+        """
+        self.path = path
+        self.reload_interval = reload_interval
+        self.shared = shared
+        self.reloads = 0
+        self.reload_errors = 0
+        self._lock = threading.Lock()
+        self._config = load_config(path, shared)
+        self._signature = self._file_signature(self._config)
+        # Configs by version that running sessions are pinned to (plus the active one)
+        self._versions: Dict[str, RoundConfig] = {self._config.version: self._config}
+        self._pins: Dict[str, str] = {}
+        self._pin_counts: Counter = Counter()
+        self._pins_lock = threading.Lock()
+        self._next_check = time.monotonic() + reload_interval
+        self.loaded_at = time.time()
+
+    def _file_signature(self, config: RoundConfig) -> Tuple:
+        signature = []
+        for file_path in [self.path] + config.prompt_files:
+            try:
+                signature.append(os.stat(file_path).st_mtime_ns)
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def current(self) -> RoundConfig:
+        """Get the active config, picking up file changes at most every reload_interval."""
+        if self.reload_interval > 0 and time.monotonic() >= self._next_check:
+            self._check_for_changes()
+        return self._config
+
+    def _check_for_changes(self):
+        if not self._lock.acquire(blocking=False):
+            return  # Another thread is already checking
+        try:
+            self._next_check = time.monotonic() + self.reload_interval
+            if self._file_signature(self._config) != self._signature:
+                self.reload()
+        finally:
+            self._lock.release()
+
+    def reload(self) -> bool:
+        """
+        Load the config files again.
+
+        Returns:
+            True if the new config was valid and is now active
+        """
+        try:
+            config = load_config(self.path, self.shared)
+        except RoundConfigError as e:
+            self.reload_errors += 1
+            # Remember the broken files so the error is not logged on every check
+            self._signature = self._file_signature(self._config)
+            logger.error("Invalid round config, keeping the previous one: %s", e)
+            return False
+
+        with self._pins_lock:
+            previous = self._config.version
+            self._config = config
+            self._versions[config.version] = config
+            self._drop_unpinned(previous)
+        self._signature = self._file_signature(config)
+        self.reloads += 1
+        self.loaded_at = time.time()
+        logger.info("Round config reloaded", extra={"rounds_version": config.version})
+        return True
+
+    def config(self, version: Optional[str]) -> RoundConfig:
+        """Get a kept config by version, or the active one if that version is not kept."""
+        config = self._versions.get(version) if version else None
+        return config if config is not None else self.current()
+
+    def pin(self, session_id: str, config: RoundConfig):
+        """Keep a config available for a session until it is released."""
+        with self._pins_lock:
+            previous = self._pins.get(session_id)
+            if previous == config.version:
+                return
+            self._pins[session_id] = config.version
+            self._pin_counts[config.version] += 1
+            self._versions[config.version] = config
+            if previous is not None:
+                self._pin_counts[previous] -= 1
+                self._drop_unpinned(previous)
+
+    def release(self, session_id: str):
+        """Unpin a session that finished or left this process."""
+        with self._pins_lock:
+            version = self._pins.pop(session_id, None)
+            if version is not None:
+                self._pin_counts[version] -= 1
+                self._drop_unpinned(version)
+
+    def _drop_unpinned(self, version: str):
+        if self._pin_counts[version] <= 0 and version != self._config.version:
+            del self._pin_counts[version]
+            self._versions.pop(version, None)
+
+    def stats(self) -> Dict:
+        """Get the active config version, reload counters and the versions sessions are pinned to."""
+        config = self.current()
+        with self._pins_lock:
+            pinned = {version: count for version, count in self._pin_counts.items() if count > 0}
+        return {
+            "path": self.path,
+            "version": config.version,
+            "pipelines": {name: pipeline.total_rounds for name, pipeline in config.pipelines.items()},
+            "pinned_sessions": pinned,
+            "reloads": self.reloads,
+            "reload_errors": self.reload_errors
+        }
+
+
+_default_registry: Optional[RoundRegistry] = None
+_default_lock = threading.Lock()
+
+
+def default_registry() -> RoundRegistry:
+    """Get the shared registry configured by ROUNDS_CONFIG, loading it on first use."""
+    global _default_registry
+    if _default_registry is None:
+        with _default_lock:
+            if _default_registry is None:
+                _default_registry = RoundRegistry(
+                    os.getenv("ROUNDS_CONFIG", DEFAULT_CONFIG_PATH),
+                    reload_interval=float(os.getenv("ROUNDS_RELOAD_INTERVAL", 2)),
+                    shared=default_shared_cache()
+                )
+    return _default_registry
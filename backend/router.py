@@ -0,0 +1,251 @@
+"""
+Local router for sharded deployments.
+
+Forwards every request to the worker process owning its session (see
+sharding.py); requests without a session, such as starting an interview,
+are spread round-robin and the chosen worker creates a session it owns.
+WebSocket upgrades are piped through unchanged, so a socket stays connected
+to the session's owner. Reads across sessions (search, analytics, exports, ...)
+go to any worker, which gathers and merges the parts held by the others.
+
+Each client connection carries one request; the router asks workers to close
+the connection after responding, which keeps routing decisions per request.
+
+Usage:
+    python router.py --port 5000 --nodes shards.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+from sharding import ShardMembership, session_id_from_request
+from structured_logging import setup_logging
+
+logger = logging.getLogger("router")
+
+MAX_HEAD_BYTES = 64 * 1024
+MAX_BODY_BYTES = 10 * 1024 * 1024
+CONNECT_TIMEOUT_SECONDS = 5
+PIPE_CHUNK_BYTES = 64 * 1024
+
+# Hop-by-hop headers replaced by the router
+_HOP_HEADERS = {"connection", "keep-alive", "proxy-connection"}
+
+
+class RequestRejected(Exception):
+    """A request the router answers itself instead of forwarding it."""
+
+    def __init__(self, status: str, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+async def _respond(writer: asyncio.StreamWriter, status: str, body: Dict):
+    """Send a small JSON response generated by the router itself."""
+    payload = json.dumps(body).encode("utf-8")
+    writer.write((
+        f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n"
+    ).encode("latin-1") + payload)
+    try:
+        await writer.drain()
+    except ConnectionError:
+        pass
+
+
+async def _pipe(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """Copy bytes until the reader hits EOF."""
+    try:
+        while True:
+            data = await reader.read(PIPE_CHUNK_BYTES)
+            if not data:
+                break
+            writer.write(data)
+            await writer.drain()
+    except ConnectionError:
+        pass
+
+
+class ShardRouter:
+    """Routes requests to their session's owner on the shard ring."""
+
+    def __init__(self, membership: ShardMembership):
+        self.membership = membership
+        self.forwarded = 0
+        self.upstream_errors = 0
+        self._round_robin = itertools.count()
+        # asyncio only keeps weak references to streams; hold connections until they finish
+        self._connections: Set[asyncio.Task] = set()
+
+    def pick(self, session_id: Optional[str]) -> str:
+        """Get the node for a request: the session's owner, or the next node in turn."""
+        ring = self.membership.ring()
+        if session_id:
+            return ring.owner(session_id)
+        return ring.nodes[next(self._round_robin) % len(ring.nodes)]
+
+    @staticmethod
+    async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+        """Read a chunked request body (the client's chunk boundaries are not kept)."""
+        body = bytearray()
+        while True:
+            size_line = await reader.readuntil(b"\r\n")
+            try:
+                size = int(size_line.split(b";", 1)[0].strip(), 16)
+            except ValueError:
+                raise RequestRejected("400 Bad Request", "Malformed chunked body")
+            if size == 0:
+                break
+            if len(body) + size > MAX_BODY_BYTES:
+                raise RequestRejected("413 Payload Too Large", "Request body too large")
+            body += await reader.readexactly(size)
+            if await reader.readexactly(2) != b"\r\n":
+                raise RequestRejected("400 Bad Request", "Malformed chunked body")
+        # Trailer fields, if any, end with an empty line
+        while await reader.readuntil(b"\r\n") != b"\r\n":
+            pass
+        return bytes(body)
+
+    async def _read_request(self, reader: asyncio.StreamReader
+                            ) -> Optional[Tuple[str, str, List[Tuple[str, str]], bytes]]:
+        """
+        Read the request head and body.
+        A chunked body is decoded and forwarded with a Content-Length instead.
+
+        Returns:
+            (method, target, headers, body), or None if the client went away mid-request
+
+        Raises:
+            RequestRejected: If the request is malformed or too large
+        """
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return None
+        except asyncio.LimitOverrunError:
+            raise RequestRejected("431 Request Header Fields Too Large", "Request head too large")
+
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            raise RequestRejected("400 Bad Request", "Malformed request")
+        headers = [tuple(part.strip() for part in line.split(":", 1)) for line in lines[1:] if ":" in line]
+
+        transfer_encoding = next((value for name, value in headers if name.lower() == "transfer-encoding"), None)
+        length = next((value for name, value in headers if name.lower() == "content-length"), None)
+        try:
+            if transfer_encoding is not None:
+                if transfer_encoding.lower() != "chunked":
+                    raise RequestRejected("501 Not Implemented", "Only chunked transfer coding is supported")
+                if length is not None:
+                    # Ambiguous framing is how requests are smuggled past proxies
+                    raise RequestRejected("400 Bad Request", "Both Transfer-Encoding and Content-Length given")
+                body = await self._read_chunked(reader)
+                headers = [
+                    (name, value) for name, value in headers if name.lower() != "transfer-encoding"
+                ] + [("Content-Length", str(len(body)))]
+                return method, target, headers, body
+
+            if length is None:
+                return method, target, headers, b""
+            if not length.isdigit():
+                raise RequestRejected("400 Bad Request", "Malformed Content-Length")
+            if int(length) > MAX_BODY_BYTES:
+                raise RequestRejected("413 Payload Too Large", "Request body too large")
+            return method, target, headers, await reader.readexactly(int(length))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return None
+        except asyncio.LimitOverrunError:
+            raise RequestRejected("400 Bad Request", "Malformed chunked body")
+
+    async def handle(self, client_reader: asyncio.StreamReader, client_writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            try:
+                request = await self._read_request(client_reader)
+            except RequestRejected as e:
+                await _respond(client_writer, e.status, {"error": str(e)})
+                return
+            if request is None:
+                # The client went away before sending the whole request
+                return
+            method, target, headers, body = request
+
+            if target == "/router/status":
+                await _respond(client_writer, "200 OK", {
+                    "ring": self.membership.stats(),
+                    "connections": len(self._connections),
+                    "forwarded": self.forwarded,
+                    "upstream_errors": self.upstream_errors
+                })
+                return
+
+            node = self.pick(session_id_from_request(method, target, body))
+            address = urlsplit(node)
+            try:
+                upstream_reader, upstream_writer = await asyncio.wait_for(
+                    asyncio.open_connection(address.hostname, address.port or 80),
+                    CONNECT_TIMEOUT_SECONDS
+                )
+            except (OSError, asyncio.TimeoutError) as e:
+                self.upstream_errors += 1
+                logger.warning("Shard unavailable: %s", e, extra={"node": node})
+                await _respond(client_writer, "502 Bad Gateway", {"error": "Shard unavailable"})
+                return
+
+            connection = next((value for name, value in headers if name.lower() == "connection"), "")
+            upgrade = "upgrade" in connection.lower()
+            forwarded_for = (client_writer.get_extra_info("peername") or ("",))[0]
+            lines = [f"{method} {target} HTTP/1.1"]
+            lines += [f"{name}: {value}" for name, value in headers if name.lower() not in _HOP_HEADERS]
+            lines += [f"Connection: {'Upgrade' if upgrade else 'close'}", f"X-Forwarded-For: {forwarded_for}"]
+            upstream_writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+            self.forwarded += 1
+
+            try:
+                if upgrade:
+                    # WebSocket frames flow both ways until either side closes
+                    upload = asyncio.ensure_future(_pipe(client_reader, upstream_writer))
+                    download = asyncio.ensure_future(_pipe(upstream_reader, client_writer))
+                    await asyncio.wait({upload, download}, return_when=asyncio.FIRST_COMPLETED)
+                    for task in (upload, download):
+                        task.cancel()
+                    await asyncio.gather(upload, download, return_exceptions=True)
+                else:
+                    await _pipe(upstream_reader, client_writer)
+            finally:
+                upstream_writer.close()
+        finally:
+            client_writer.close()
+            self._connections.discard(task)
+
+    async def serve(self, host: str, port: int):
+        server = await asyncio.start_server(self.handle, host, port, limit=MAX_HEAD_BYTES)
+        logger.info("Router listening", extra={"port": port, "nodes": list(self.membership.ring().nodes)})
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Route interview requests to their shard")
+    parser.add_argument("--host", default=os.getenv("ROUTER_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("ROUTER_PORT", 5000)))
+    parser.add_argument("--nodes", default=os.getenv("SHARD_NODES_FILE", "shards.json"),
+                        help="JSON file listing the worker URLs")
+    args = parser.parse_args()
+
+    setup_logging()
+    membership = ShardMembership(args.nodes, reload_interval=float(os.getenv("SHARD_RELOAD_INTERVAL", 2)))
+    asyncio.run(ShardRouter(membership).serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,407 @@
+"""
+Full-text search over interview transcripts using an incrementally built inverted index.
+"""
+
+import logging
+import math
+import queue
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+[+#]*")
+_QUERY_PATTERN = re.compile(r'"([^"]*)"|(\S+)')
+
+# Number of words shown on each side of a match in snippets
+SNIPPET_CONTEXT_WORDS = 12
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase search tokens."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+class IndexedMessage:
+    """A single transcript message stored in the index."""
+
+    __slots__ = ("session_id", "message_index", "kind", "round_number", "text", "length")
+
+    def __init__(self, session_id: str, message_index: int, kind: str, round_number: int,
+                 text: str, length: int):
+        self.session_id = session_id
+        self.message_index = message_index
+        self.kind = kind
+        self.round_number = round_number
+        self.text = text
+        self.length = length
+
+
+class QueryClause:
+    """A single search term or phrase, optionally negated."""
+
+    def __init__(self, terms: List[str], negated: bool = False):
+        self.terms = terms
+        self.negated = negated
+
+    @property
+    def is_phrase(self) -> bool:
+        return len(self.terms) > 1
+
+
+def parse_query(query: str) -> List[List[QueryClause]]:
+    """
+    Parse a search query into OR-ed groups of AND-ed clauses.
+
+    Supports quoted phrases, AND/OR/NOT operators and a leading '-' for negation.
+    Adjacent clauses without an operator are AND-ed.
+
+    Returns:
+        List of groups; a session matches if it satisfies every clause in any group
+    """
+    groups: List[List[QueryClause]] = [[]]
+    negate_next = False
+
+    for phrase, word in _QUERY_PATTERN.findall(query):
+        if word in ("AND", "&&"):
+            continue
+        if word in ("OR", "||"):
+            if groups[-1]:
+                groups.append([])
+            continue
+        if word == "NOT":
+            negate_next = True
+            continue
+
+        negated = negate_next
+        negate_next = False
+        text = phrase
+        if word:
+            if word.startswith("-") and len(word) > 1:
+                negated = True
+                word = word[1:]
+            text = word
+
+        terms = tokenize(text)
+        if terms:
+            groups[-1].append(QueryClause(terms, negated))
+
+    return [group for group in groups if group]
+
+
+class TranscriptSearchIndex:
+    """
+    Inverted index over candidate answers and AI feedback.
+
+    Messages are queued by the request thread and indexed by a background
+    worker, so appending to a transcript never waits on tokenization.
+    """
+
+    def __init__(self):
+        # term -> {doc_id: [positions]}
+        self._postings: Dict[str, Dict[int, List[int]]] = defaultdict(dict)
+        self._documents: Dict[int, IndexedMessage] = {}
+        self._session_documents: Dict[str, List[int]] = defaultdict(list)
+        self._sessions: Dict[str, Dict] = {}
+        self._total_length = 0
+        self._next_doc_id = 0
+        self._lock = threading.Lock()
+
+        self._queue: "queue.Queue[Tuple]" = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="transcript-indexer", daemon=True)
+        self._worker.start()
+
+    # ------------------------------------------------------------------
+    # Write path (called from request threads)
+    # ------------------------------------------------------------------
+
+    def index_message(self, session_id: str, message_index: int, kind: str,
+                      round_number: int, text: str):
+        """
+        Queue a transcript message for indexing.
+
+        Args:
+            session_id: Session the message belongs to
+            message_index: Position of the message in conversation_history
+            kind: 'answer' for candidate messages, 'feedback' for AI feedback
+            round_number: Round the message was sent in
+            text: Message content
+        """
+        self._queue.put(("message", session_id, message_index, kind, round_number, text))
+
+    def update_session(self, session_id: str, **fields):
+        """Queue an update to a session's filterable fields (job_role, status, ...)."""
+        self._queue.put(("session", session_id, fields))
+
+    def remove_session(self, session_id: str):
+        """Queue the removal of every message of a session (e.g. when it moves to another worker)."""
+        self._queue.put(("remove", session_id))
+
+    def flush(self):
+        """Block until every queued update has been indexed."""
+        self._queue.join()
+
+    # ------------------------------------------------------------------
+    # Background worker
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item[0] == "message":
+                    self._add_message(*item[1:])
+                elif item[0] == "remove":
+                    self._remove_session(*item[1:])
+                else:
+                    self._update_session(*item[1:])
+            except Exception as e:
+                logger.exception("Error indexing transcript: %s", e)
+            finally:
+                self._queue.task_done()
+
+    def _add_message(self, session_id: str, message_index: int, kind: str,
+                     round_number: int, text: str):
+        tokens = tokenize(text)
+        if not tokens:
+            return
+
+        positions: Dict[str, List[int]] = defaultdict(list)
+        for position, token in enumerate(tokens):
+            positions[token].append(position)
+
+        with self._lock:
+            doc_id = self._next_doc_id
+            self._next_doc_id += 1
+            self._documents[doc_id] = IndexedMessage(
+                session_id, message_index, kind, round_number, text, len(tokens)
+            )
+            self._session_documents[session_id].append(doc_id)
+            self._total_length += len(tokens)
+            for token, token_positions in positions.items():
+                self._postings[token][doc_id] = token_positions
+
+    def _remove_session(self, session_id: str):
+        with self._lock:
+            for doc_id in self._session_documents.pop(session_id, []):
+                document = self._documents.pop(doc_id)
+                self._total_length -= document.length
+                for token in set(tokenize(document.text)):
+                    postings = self._postings.get(token)
+                    if postings is not None:
+                        postings.pop(doc_id, None)
+                        if not postings:
+                            del self._postings[token]
+            self._sessions.pop(session_id, None)
+
+    def _update_session(self, session_id: str, fields: Dict):
+        with self._lock:
+            self._sessions.setdefault(session_id, {}).update(fields)
+
+    # ------------------------------------------------------------------
+    # Read path
+    # ------------------------------------------------------------------
+
+    def _clause_documents(self, clause: QueryClause) -> Dict[int, int]:
+        """Find documents matching a clause, mapped to the position of their first match."""
+        postings = [self._postings.get(term) for term in clause.terms]
+        if not all(postings):
+            return {}
+
+        # Intersect starting from the rarest term
+        candidates = set(min(postings, key=len))
+        for term_postings in postings:
+            candidates.intersection_update(term_postings)
+
+        if not clause.is_phrase:
+            return {doc_id: postings[0][doc_id][0] for doc_id in candidates}
+
+        matches = {}
+        for doc_id in candidates:
+            following = [set(term_postings[doc_id]) for term_postings in postings[1:]]
+            for start in postings[0][doc_id]:
+                if all(start + offset + 1 in positions for offset, positions in enumerate(following)):
+                    matches[doc_id] = start
+                    break
+        return matches
+
+    def _statistics(self, groups: List[List[QueryClause]]) -> Dict:
+        """Document count, total length and document frequencies of the query terms. Call with the lock held."""
+        terms = {term for group in groups for clause in group for term in clause.terms}
+        return {
+            "documents": len(self._documents),
+            "total_length": self._total_length,
+            "document_frequencies": {term: len(self._postings.get(term, ())) for term in terms}
+        }
+
+    def _clause_score(self, clause: QueryClause, doc_id: int, statistics: Dict,
+                      average_length: float) -> float:
+        """BM25 score of a clause's terms within one document."""
+        document = self._documents[doc_id]
+        total_documents = statistics["documents"]
+        score = 0.0
+        for term in clause.terms:
+            frequency = len(self._postings[term].get(doc_id, ()))
+            document_frequency = statistics["document_frequencies"].get(term, 0)
+            idf = math.log(1 + (total_documents - document_frequency + 0.5) / (document_frequency + 0.5))
+            norm = frequency + 1.2 * (0.25 + 0.75 * document.length / average_length)
+            score += idf * frequency * 2.2 / norm
+        return score
+
+    @staticmethod
+    def _snippet(text: str, term_position: int, phrase_length: int) -> str:
+        """Build a snippet around the token at term_position, marking the match."""
+        spans = [match.span() for match in _TOKEN_PATTERN.finditer(text.lower())]
+        if not spans:
+            return text[:200]
+
+        term_position = min(term_position, len(spans) - 1)
+        end_position = min(term_position + phrase_length - 1, len(spans) - 1)
+        start_word = max(term_position - SNIPPET_CONTEXT_WORDS, 0)
+        end_word = min(end_position + SNIPPET_CONTEXT_WORDS, len(spans) - 1)
+
+        start_char = spans[start_word][0]
+        end_char = spans[end_word][1]
+        match_start = spans[term_position][0]
+        match_end = spans[end_position][1]
+
+        snippet = (
+            text[start_char:match_start] + "[" + text[match_start:match_end] + "]" +
+            text[match_end:end_char]
+        )
+        prefix = "..." if start_char > 0 else ""
+        suffix = "..." if end_char < len(text) else ""
+        return f"{prefix}{snippet}{suffix}"
+
+    def _session_allowed(self, session_id: str, job_role: Optional[str],
+                         status: Optional[str]) -> bool:
+        session = self._sessions.get(session_id, {})
+        if job_role is not None and session.get("job_role") != job_role:
+            return False
+        if status is not None and session.get("status") != status:
+            return False
+        return True
+
+    def search(
+        self,
+        query: str,
+        job_role: Optional[str] = None,
+        round_number: Optional[int] = None,
+        status: Optional[str] = None,
+        limit: int = 20,
+        statistics: Optional[Dict] = None
+    ) -> List[Dict]:
+        """
+        Search transcripts and return ranked session hits.
+
+        Args:
+            query: Search query (terms, "phrases", AND/OR/NOT, -term)
+            job_role: Only match sessions for this job role
+            round_number: Only match messages from this round
+            status: Only match sessions with this status
+            limit: Maximum number of sessions to return
+            statistics: Corpus statistics to score with instead of this index's own,
+                as returned by term_statistics and summed over several indexes
+
+        Returns:
+            Session hits ordered by relevance, each with matching snippets
+        """
+        groups = parse_query(query)
+        if not groups:
+            return []
+
+        with self._lock:
+            if not self._documents:
+                return []
+
+            if statistics is None:
+                statistics = self._statistics(groups)
+            average_length = statistics["total_length"] / max(statistics["documents"], 1)
+            session_scores: Dict[str, float] = defaultdict(float)
+            session_snippets: Dict[str, Dict[int, Tuple[float, int, int]]] = defaultdict(dict)
+
+            for group in groups:
+                positive = [clause for clause in group if not clause.negated]
+                negative = [clause for clause in group if clause.negated]
+                if not positive:
+                    continue
+
+                # Per clause: session -> matching docs
+                clause_matches: List[Dict[str, List[Tuple[int, int]]]] = []
+                for clause in positive:
+                    by_session: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+                    for doc_id, position in self._clause_documents(clause).items():
+                        document = self._documents[doc_id]
+                        if round_number is not None and document.round_number != round_number:
+                            continue
+                        by_session[document.session_id].append((doc_id, position))
+                    clause_matches.append(by_session)
+
+                matching_sessions: Set[str] = set(clause_matches[0])
+                for by_session in clause_matches[1:]:
+                    matching_sessions.intersection_update(by_session)
+
+                for clause in negative:
+                    for doc_id in self._clause_documents(clause):
+                        document = self._documents[doc_id]
+                        if round_number is None or document.round_number == round_number:
+                            matching_sessions.discard(document.session_id)
+
+                for session_id in matching_sessions:
+                    if not self._session_allowed(session_id, job_role, status):
+                        continue
+
+                    for clause, by_session in zip(positive, clause_matches):
+                        for doc_id, position in by_session[session_id]:
+                            score = self._clause_score(clause, doc_id, statistics, average_length)
+                            session_scores[session_id] += score
+                            best = session_snippets[session_id].get(doc_id)
+                            if best is None or score > best[0]:
+                                session_snippets[session_id][doc_id] = (score, position, len(clause.terms))
+
+            ranked = sorted(session_scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+            hits = []
+            for session_id, score in ranked:
+                session = self._sessions.get(session_id, {})
+                top_documents = sorted(
+                    session_snippets[session_id].items(), key=lambda item: item[1][0], reverse=True
+                )[:3]
+                hits.append({
+                    "session_id": session_id,
+                    "job_role": session.get("job_role"),
+                    "candidate_name": session.get("candidate_name"),
+                    "status": session.get("status"),
+                    "score": round(score, 4),
+                    "snippets": [
+                        {
+                            "message_index": self._documents[doc_id].message_index,
+                            "round": self._documents[doc_id].round_number,
+                            "kind": self._documents[doc_id].kind,
+                            "text": self._snippet(self._documents[doc_id].text, position, phrase_length)
+                        }
+                        for doc_id, (_, position, phrase_length) in top_documents
+                    ]
+                })
+            return hits
+
+    def term_statistics(self, query: str) -> Dict:
+        """
+        Corpus statistics BM25 needs for a query: document count, total
+        document length and the document frequency of each query term.
+        """
+        groups = parse_query(query)
+        with self._lock:
+            return self._statistics(groups)
+
+    def stats(self) -> Dict[str, int]:
+        """Get index size statistics."""
+        with self._lock:
+            return {
+                "documents": len(self._documents),
+                "terms": len(self._postings),
+                "sessions": len(self._session_documents),
+                "pending": self._queue.qsize()
+            }
@@ -0,0 +1,281 @@
+"""
+Session-affine sharding across worker processes.
+
+In sharded mode every worker process owns the sessions whose ID hashes to it
+on a consistent-hash ring, and a small router (router.py) forwards each
+request to the owner. Each worker keeps its sessions in memory and never
+shares them, so no cross-process locking is needed.
+
+The ring is read from a JSON file listing the worker URLs:
+
+    {"nodes": ["http://127.0.0.1:5001", "http://127.0.0.1:5002"]}
+
+The router and the workers re-read it every few seconds. When workers are
+added or removed, only the sessions whose owner changed move: the old owner
+pushes them to the new one in the background, and a worker asked for a
+session it does not have yet pulls it from the previous owner.
+
+Reads spanning many sessions (batch status, search, analytics, exports,
+metrics) are answered by whichever worker receives them: it asks the other
+workers for their part and merges the results with the functions below.
+
+Configuration (environment variables):
+    SHARD_NODES_FILE          Path of the node list (default: shards.json)
+    SHARD_NODE                URL of this worker as listed in the node file; enables sharding
+    SHARD_RELOAD_INTERVAL     Seconds between checks of the node file (default: 2)
+"""
+
+import bisect
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Points per node on the ring; more points spread sessions more evenly
+RING_REPLICAS = 128
+
+# Requests carrying a session ID in their path
+_SESSION_PATH = re.compile(r"^/(?:api/session|ws/interview)/([0-9a-fA-F-]{36})(?:[/?]|$)")
+
+# Requests carrying a session ID in their JSON body
+SESSION_BODY_PATHS = ("/api/chat",)
+
+
+class ShardConfigError(ValueError):
+    """Raised when the node file is missing or invalid."""
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.md5(value.encode("utf-8")).digest()[:8], "big")
+
+
+class HashRing:
+    """Consistent-hash ring mapping session IDs to worker nodes."""
+
+    def __init__(self, nodes: Iterable[str], replicas: int = RING_REPLICAS):
+        self.nodes: Tuple[str, ...] = tuple(sorted(set(nodes)))
+        if not self.nodes:
+            raise ShardConfigError("The ring needs at least one node")
+
+        points = sorted((_hash(f"{node}#{i}"), node) for node in self.nodes for i in range(replicas))
+        self._hashes = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    def owner(self, key: str) -> str:
+        """Get the node owning a key."""
+        index = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._owners[index]
+
+    def __contains__(self, node: str) -> bool:
+        return node in self.nodes
+
+
+def owned_session_id(ring: HashRing, node: str) -> str:
+    """Generate a new session ID that hashes to the given node."""
+    while True:
+        session_id = str(uuid.uuid4())
+        if node not in ring or ring.owner(session_id) == node:
+            return session_id
+
+
+def session_id_from_request(method: str, path: str, body: bytes = b"") -> Optional[str]:
+    """Find the session a request is about, from its path or JSON body."""
+    match = _SESSION_PATH.match(path)
+    if match:
+        return match.group(1)
+    if method == "POST" and path.split("?", 1)[0] in SESSION_BODY_PATHS and body:
+        try:
+            session_id = json.loads(body).get("session_id")
+        except (ValueError, AttributeError):
+            return None
+        return session_id if isinstance(session_id, str) else None
+    return None
+
+
+def load_nodes(path: str) -> List[str]:
+    """
+    Load the worker URLs from a node file.
+
+    Raises:
+        ShardConfigError: If the file cannot be read or lists no nodes
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ShardConfigError(f"Cannot load shard nodes {path}: {e}") from e
+
+    nodes = data.get("nodes") if isinstance(data, dict) else None
+    if not isinstance(nodes, list) or not nodes or not all(isinstance(node, str) and node for node in nodes):
+        raise ShardConfigError(f"{path}: 'nodes' must be a non-empty list of URLs")
+    return [node.rstrip("/") for node in nodes]
+
+
+class ShardMembership:
+    """The current ring, reloaded when the node file changes."""
+
+    def __init__(self, path: str, reload_interval: float = 2.0):
+        """
+        Raises:
+            ShardConfigError: If the initial node file is invalid
+        """
+        self.path = path
+        self.reload_interval = reload_interval
+        self.version = 1
+        self.reloads = 0
+        self.reload_errors = 0
+        self._lock = threading.Lock()
+        self._ring = HashRing(load_nodes(path))
+        self.previous: Optional[HashRing] = None
+        self._mtime = self._file_mtime()
+        self._next_check = time.monotonic() + reload_interval
+
+    def _file_mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def ring(self) -> HashRing:
+        """Get the current ring, picking up file changes at most every reload_interval."""
+        if self.reload_interval > 0 and time.monotonic() >= self._next_check:
+            self._check_for_changes()
+        return self._ring
+
+    def _check_for_changes(self):
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._next_check = time.monotonic() + self.reload_interval
+            mtime = self._file_mtime()
+            if mtime == self._mtime:
+                return
+            self._mtime = mtime
+            try:
+                ring = HashRing(load_nodes(self.path))
+            except ShardConfigError as e:
+                self.reload_errors += 1
+                logger.error("Invalid shard nodes, keeping the previous ring: %s", e)
+                return
+            if ring.nodes != self._ring.nodes:
+                self.previous, self._ring = self._ring, ring
+                self.version += 1
+                self.reloads += 1
+                logger.info("Shard ring changed", extra={"nodes": list(ring.nodes), "ring_version": self.version})
+        finally:
+            self._lock.release()
+
+    def stats(self) -> Dict:
+        """Get the current nodes, ring version and reload counters."""
+        ring = self.ring()
+        return {
+            "nodes": list(ring.nodes),
+            "version": self.version,
+            "reloads": self.reloads,
+            "reload_errors": self.reload_errors
+        }
+
+
+# ----------------------------------------------------------------------
+# Merging the parts of cross-shard reads
+# ----------------------------------------------------------------------
+
+def _weighted_average(parts: List[Dict], value: str, weight: str) -> float:
+    total = sum(part[weight] for part in parts)
+    return round(sum(part[value] * part[weight] for part in parts) / total, 2) if total else 0.0
+
+
+def _sum_lists(lists: Iterable[List[int]]) -> List[int]:
+    return [sum(values) for values in zip(*lists)]
+
+
+def merge_role_counts(parts: Iterable[List[Dict]]) -> List[Dict]:
+    """Merge CohortAnalytics.job_roles() results of several workers."""
+    totals: Dict[str, Dict] = {}
+    for roles in parts:
+        for role in roles:
+            total = totals.setdefault(role["job_role"], {
+                "job_role": role["job_role"], "started": 0, "completed": 0, "terminated": 0
+            })
+            for key in ("started", "completed", "terminated"):
+                total[key] += role[key]
+    return [totals[job_role] for job_role in sorted(totals)]
+
+
+def merge_role_stats(parts: Iterable[Optional[Dict]]) -> Optional[Dict]:
+    """Merge CohortAnalytics.role_stats() results of several workers (None if none had the role)."""
+    parts = [part for part in parts if part]
+    if not parts:
+        return None
+
+    rounds: Dict[str, List[Dict]] = {}
+    for part in parts:
+        for round_number, round_stats in part["rounds"].items():
+            rounds.setdefault(str(round_number), []).append(round_stats)
+
+    merged_rounds = {}
+    for round_number, round_parts in sorted(rounds.items(), key=lambda item: int(item[0])):
+        attempted = sum(part["attempted"] for part in round_parts)
+        passed = sum(part["passed"] for part in round_parts)
+        merged_rounds[round_number] = {
+            "attempted": attempted,
+            "passed": passed,
+            "pass_rate": round(passed / attempted * 100, 2) if attempted else 0.0,
+            "average_score": _weighted_average(round_parts, "average_score", "attempted"),
+            "score_histogram": _sum_lists(part["score_histogram"] for part in round_parts)
+        }
+
+    batches, recommendations = Counter(), Counter()
+    for part in parts:
+        batches.update(part["batch_distribution"])
+        recommendations.update(part["recommendation_distribution"])
+
+    return {
+        "job_role": parts[0]["job_role"],
+        "started": sum(part["started"] for part in parts),
+        "completed": sum(part["completed"] for part in parts),
+        "terminated": sum(part["terminated"] for part in parts),
+        "average_overall_score": _weighted_average(parts, "average_overall_score", "completed"),
+        "rounds": merged_rounds,
+        "batch_distribution": dict(batches),
+        "recommendation_distribution": dict(recommendations),
+        "histogram_buckets": parts[0]["histogram_buckets"],
+        "overall_score_histogram": _sum_lists(part["overall_score_histogram"] for part in parts)
+    }
+
+
+def merge_leaderboards(parts: Iterable[List[Dict]], k: int) -> List[Dict]:
+    """Merge the top-k leaderboards of several workers into one top-k, ranked again."""
+    entries = sorted(
+        (entry for board in parts for entry in board),
+        key=lambda entry: entry["overall_score"], reverse=True
+    )[:k]
+    return [{**entry, "rank": rank} for rank, entry in enumerate(entries, 1)]
+
+
+def merge_term_statistics(parts: Iterable[Dict]) -> Dict:
+    """
+    Sum the search statistics of several workers' transcript indexes.
+    Scoring on every worker with the sum makes their BM25 scores comparable.
+    """
+    merged: Dict = {"documents": 0, "total_length": 0, "document_frequencies": {}}
+    for part in parts:
+        merged["documents"] += part["documents"]
+        merged["total_length"] += part["total_length"]
+        for term, frequency in part["document_frequencies"].items():
+            merged["document_frequencies"][term] = merged["document_frequencies"].get(term, 0) + frequency
+    return merged
+
+
+def merge_ranked(parts: Iterable[List[Dict]], key: str, limit: int) -> List[Dict]:
+    """Merge lists each sorted by a descending key (search scores, creation times, similarity)."""
+    return sorted((item for items in parts for item in items),
+                  key=lambda item: item[key], reverse=True)[:limit]
@@ -0,0 +1,322 @@
+"""
+Read-mostly cache region shared by the worker processes of one machine.
+
+With several prefork workers (gunicorn), every worker would otherwise build
+data that is the same everywhere, such as the formatted round prompts.
+Instead, one process (the gunicorn master) writes the entries to a file,
+ideally on tmpfs (/dev/shm). Workers map the file read-only, so its pages are
+shared by all of them, and view() slices an entry's bytes out of the mapping
+without copying them.
+
+A refresh writes a complete new file and renames it over the old one, so
+readers always see one consistent generation. Workers notice the new file
+within a check interval and switch to it; lookups that already hold the old
+mapping finish on it, and it is unmapped once nothing references it.
+
+Callers that need text (the prompts end up in JSON request bodies) use get(),
+which decodes an entry into a str owned by the worker. That string is kept
+for the rest of the generation, so all callers share one copy instead of
+decoding one per lookup; it is not shared with other workers.
+
+File layout: header (magic, generation, index length), a JSON index of
+key -> (offset, length) plus metadata, then the UTF-8 encoded values.
+
+Configuration (environment variables):
+    SHARED_CACHE_PATH             File of the region; unset disables it
+    SHARED_CACHE_CHECK_INTERVAL   Seconds between checks for a new generation (default: 1)
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"IVCACHE1"
+
+# magic, generation, index length
+HEADER = struct.Struct("<8sQI")
+
+
+class SharedCacheError(ValueError):
+    """Raised when a region file is missing or malformed."""
+
+
+def read_generation(path: str) -> int:
+    """Get the generation of a region file (0 if there is none)."""
+    try:
+        with open(path, "rb") as f:
+            magic, generation, _ = HEADER.unpack(f.read(HEADER.size))
+    except (OSError, struct.error):
+        return 0
+    return generation if magic == MAGIC else 0
+
+
+def write_region(path: str, entries: Dict[str, str], meta: Optional[Dict] = None) -> int:
+    """
+    Write a new generation of the region, replacing the file atomically.
+
+    Args:
+        path: Region file
+        entries: Values by key
+        meta: Small JSON-serializable description of the contents (e.g. source versions)
+
+    Returns:
+        Generation number written
+    """
+    generation = read_generation(path) + 1
+    index: Dict[str, Tuple[int, int]] = {}
+    values = []
+    offset = 0
+    for key, value in entries.items():
+        data = value.encode("utf-8")
+        index[key] = (offset, len(data))
+        values.append(data)
+        offset += len(data)
+
+    index_data = json.dumps({
+        "meta": meta or {},
+        "created_at": time.time(),
+        "entries": index
+    }).encode("utf-8")
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, generation, len(index_data)))
+            f.write(index_data)
+            for data in values:
+                f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return generation
+
+
+class _Region:
+    """One mapped generation of the region file."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            if stat.st_size < HEADER.size:
+                raise SharedCacheError(f"Shared cache {path} is truncated")
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.identity = (stat.st_dev, stat.st_ino)
+
+        magic, self.generation, index_length = HEADER.unpack_from(self.buffer)
+        if magic != MAGIC:
+            raise SharedCacheError(f"{path} is not a shared cache file")
+        try:
+            index = json.loads(self.buffer[HEADER.size:HEADER.size + index_length])
+        except ValueError as e:
+            raise SharedCacheError(f"Shared cache {path} has a broken index: {e}") from e
+        self.meta: Dict = index["meta"]
+        self.created_at: float = index["created_at"]
+        self.entries: Dict[str, list] = index["entries"]
+        self.data_start = HEADER.size + index_length
+
+    def view(self, key: str) -> Optional[memoryview]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        start = self.data_start + entry[0]
+        return memoryview(self.buffer)[start:start + entry[1]]
+
+
+class SharedCache:
+    """Read side of the region, mapped by every worker."""
+
+    def __init__(self, path: str, check_interval: float = 1.0):
+        """
+        Args:
+            path: Region file; it may not exist yet
+            check_interval: Seconds between checks for a new generation
+        """
+        self.path = path
+        self.check_interval = check_interval
+        self.hits = 0
+        self.misses = 0
+        self.swaps = 0
+        self._region: Optional[_Region] = None
+        # (region, strings decoded from it); replaced under _lock when a new generation is mapped
+        self._decoded: Tuple[Optional[_Region], Dict[str, str]] = (None, {})
+        self._lock = threading.Lock()
+        self._next_check = 0.0
+
+    def _current(self) -> Optional[_Region]:
+        if time.monotonic() >= self._next_check:
+            self._check_for_changes()
+        return self._region
+
+    def _check_for_changes(self):
+        if not self._lock.acquire(blocking=False):
+            return  # Another thread is already checking
+        try:
+            self._next_check = time.monotonic() + self.check_interval
+            try:
+                stat = os.stat(self.path)
+            except OSError:
+                return  # Not published yet; keep the last generation seen
+            if self._region is not None and self._region.identity == (stat.st_dev, stat.st_ino):
+                return
+            try:
+                region = _Region(self.path)
+            except (OSError, ValueError, KeyError) as e:
+                logger.error("Cannot map shared cache, keeping the previous generation: %s", e)
+                return
+            # Readers holding the previous region finish on it; it is unmapped once unreferenced
+            self._region = region
+            self.swaps += 1
+            logger.info("Shared cache mapped", extra={"generation": region.generation})
+        finally:
+            self._lock.release()
+
+    def view(self, key: str) -> Optional[memoryview]:
+        """Get the raw UTF-8 bytes of an entry without copying them."""
+        region = self._current()
+        data = region.view(key) if region is not None else None
+        if data is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return data
+
+    def _decoded_strings(self, region: _Region) -> Optional[Dict[str, str]]:
+        """
+        Strings decoded from a region, or None if the region is no longer the current
+        one (a lookup that started before a swap); its entries are then not cached.
+        """
+        decoded_region, decoded = self._decoded
+        if decoded_region is region:
+            return decoded
+        with self._lock:
+            decoded_region, decoded = self._decoded
+            if decoded_region is not region:
+                if region is not self._region:
+                    return None
+                decoded = {}
+                self._decoded = (region, decoded)
+            return decoded
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Get an entry as text, or None if the current generation does not have it.
+        The string is decoded on first use and kept by this worker until the next generation.
+        """
+        region = self._current()
+        data = region.view(key) if region is not None else None
+        if data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        decoded = self._decoded_strings(region)
+        if decoded is None:
+            return str(data, "utf-8")
+        value = decoded.get(key)
+        if value is None:
+            value = decoded.setdefault(key, str(data, "utf-8"))
+        return value
+
+    def stats(self) -> Dict:
+        region = self._current()
+        return {
+            "path": self.path,
+            "generation": region.generation if region is not None else None,
+            "meta": region.meta if region is not None else None,
+            "entries": len(region.entries) if region is not None else 0,
+            "decoded_entries": len(self._decoded[1]),
+            "mapped_bytes": len(region.buffer) if region is not None else 0,
+            "published_at": region.created_at if region is not None else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "swaps": self.swaps
+        }
+
+
+class SharedCachePublisher:
+    """Write side: rebuilds the region whenever its sources change."""
+
+    def __init__(self, path: str, build: Callable[[], Tuple[Dict, Dict[str, str]]],
+                 interval: float = 2.0):
+        """
+        Args:
+            path: Region file
+            build: Returns (meta, entries); meta identifies the source versions,
+                and the region is only rewritten when it changes
+            interval: Seconds between rebuild checks in the background thread
+        """
+        self.path = path
+        self.build = build
+        self.interval = interval
+        self.generation = read_generation(path)
+        self.publishes = 0
+        self._meta: Optional[Dict] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def publish_if_changed(self) -> bool:
+        """
+        Build the entries and write a new generation if the sources changed.
+
+        Returns:
+            True if a new generation was written
+        """
+        meta, entries = self.build()
+        if meta == self._meta:
+            return False
+        self.generation = write_region(self.path, entries, meta)
+        self._meta = meta
+        self.publishes += 1
+        logger.info("Shared cache published", extra={
+            "generation": self.generation, "entries": len(entries), **meta
+        })
+        return True
+
+    def start(self):
+        """Publish now and keep the region current from a daemon thread."""
+        self.publish_if_changed()
+        if self._thread is None and self.interval > 0:
+            self._thread = threading.Thread(target=self._run, name="shared-cache-publisher", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.publish_if_changed()
+            except Exception as e:
+                logger.error("Shared cache publish failed: %s", e)
+
+    def stats(self) -> Dict:
+        return {"path": self.path, "generation": self.generation, "publishes": self.publishes,
+                "meta": self._meta}
+
+
+_default_cache: Optional[SharedCache] = None
+_default_lock = threading.Lock()
+
+
+def default_shared_cache() -> Optional[SharedCache]:
+    """Get the region configured by SHARED_CACHE_PATH (None when it is not set)."""
+    global _default_cache
+    path = os.getenv("SHARED_CACHE_PATH")
+    if not path:
+        return None
+    if _default_cache is None:
+        with _default_lock:
+            if _default_cache is None:
+                _default_cache = SharedCache(
+                    path, check_interval=float(os.getenv("SHARED_CACHE_CHECK_INTERVAL", 1))
+                )
+    return _default_cache
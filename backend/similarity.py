@@ -0,0 +1,264 @@
+"""
+Near-duplicate answer detection using MinHash signatures and an LSH index.
+"""
+
+import random
+import re
+import threading
+import zlib
+from array import array
+from itertools import islice
+from typing import Dict, List, Optional, Set
+
+# Mersenne prime used for the universal hash family (a * x + b) mod p
+_MERSENNE_PRIME = (1 << 61) - 1
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+class MinHashLSHIndex:
+    """
+    Incrementally updated MinHash/LSH index over submitted answers.
+
+    Each answer is reduced to a fixed-size MinHash signature and split into
+    bands. Answers sharing any band land in the same bucket, so a lookup only
+    compares against the few candidates in matching buckets instead of every
+    stored answer.
+
+    Signatures use one-permutation hashing: each shingle is hashed once and
+    kept as the minimum of one of num_perm bins, and empty bins borrow the
+    next filled bin's value (rotation densification). Computing a signature
+    is O(shingles + num_perm) rather than O(shingles * num_perm).
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 64,
+        bands: int = 16,
+        threshold: float = 0.8,
+        shingle_size: int = 3,
+        min_shingles: int = 8,
+        max_bucket_candidates: int = 32,
+        seed: int = 1
+    ):
+        """
+        Initialize an empty index.
+
+        Args:
+            num_perm: Number of hash permutations in each signature
+            bands: Number of LSH bands (must divide num_perm)
+            threshold: Estimated Jaccard similarity at which answers are flagged
+            shingle_size: Number of consecutive words per shingle
+            min_shingles: Answers with fewer shingles are too short to compare
+            max_bucket_candidates: Most recent answers compared per matching bucket
+            seed: Seed for the hash coefficients
+        """
+        if num_perm % bands != 0:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.min_shingles = min_shingles
+        self.max_bucket_candidates = max_bucket_candidates
+
+        rng = random.Random(seed)
+        self._hash = (rng.randint(1, _MERSENNE_PRIME - 1), rng.randint(0, _MERSENNE_PRIME - 1))
+        # Bin values keep the low bits; a borrowed value adds its distance above them
+        self._value_bits = 32 - (num_perm - 1).bit_length()
+
+        # One bucket table per band: band hash -> answer keys, oldest first
+        self._buckets: List[Dict[int, Dict[str, None]]] = [{} for _ in range(bands)]
+        self._signatures: Dict[str, array] = {}
+        self._owners: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def _shingles(self, text: str) -> Set[int]:
+        """Split normalized text into hashed word shingles."""
+        words = _WORD_PATTERN.findall(text.lower())
+        if len(words) < self.shingle_size:
+            return set()
+
+        return {
+            zlib.crc32(" ".join(words[i:i + self.shingle_size]).encode("utf-8"))
+            for i in range(len(words) - self.shingle_size + 1)
+        }
+
+    def signature(self, text: str) -> Optional[array]:
+        """
+        Compute the MinHash signature of a text.
+
+        Returns:
+            Signature array, or None if the text is too short to compare
+        """
+        shingles = self._shingles(text)
+        if len(shingles) < self.min_shingles:
+            return None
+
+        a, b = self._hash
+        num_perm = self.num_perm
+        value_mask = (1 << self._value_bits) - 1
+        bins: List[Optional[int]] = [None] * num_perm
+        for x in shingles:
+            hashed = (a * x + b) % _MERSENNE_PRIME
+            index = hashed % num_perm
+            value = (hashed // num_perm) & value_mask
+            current = bins[index]
+            if current is None or value < current:
+                bins[index] = value
+
+        return array("I", self._densify(bins))
+
+    def _densify(self, bins: List[Optional[int]]) -> List[int]:
+        """Fill each empty bin from the next filled bin to its right, wrapping around."""
+        num_perm = self.num_perm
+        filled = list(bins)
+        next_filled = 0
+        for position in range(2 * num_perm - 1, -1, -1):
+            index = position % num_perm
+            if bins[index] is not None:
+                next_filled = position
+            elif position < num_perm:
+                distance = next_filled - position
+                filled[index] = bins[next_filled % num_perm] + (distance << self._value_bits)
+        return filled
+
+    def _band_keys(self, signature: array) -> List[int]:
+        """Hash each band of a signature into a bucket key."""
+        return [
+            hash(tuple(signature[band * self.rows:(band + 1) * self.rows]))
+            for band in range(self.bands)
+        ]
+
+    @staticmethod
+    def _estimate_similarity(left: array, right: array) -> float:
+        """Estimate Jaccard similarity from two signatures."""
+        matches = sum(1 for a, b in zip(left, right) if a == b)
+        return matches / len(left)
+
+    def _query(self, signature: array, band_keys: List[int], exclude_owner: Optional[str],
+               limit: int) -> List[Dict]:
+        # Identical answers pasted by many candidates share one hot bucket; only
+        # its most recent entries are compared, which is enough to flag the copy
+        candidates: Set[str] = set()
+        for band, key in enumerate(band_keys):
+            bucket = self._buckets[band].get(key)
+            if bucket:
+                candidates.update(islice(reversed(bucket), self.max_bucket_candidates))
+
+        matches = []
+        for candidate in candidates:
+            owner = self._owners.get(candidate)
+            if exclude_owner is not None and owner == exclude_owner:
+                continue
+            similarity = self._estimate_similarity(signature, self._signatures[candidate])
+            if similarity >= self.threshold:
+                matches.append({
+                    "answer_id": candidate,
+                    "session_id": owner,
+                    "similarity": round(similarity, 3)
+                })
+
+        matches.sort(key=lambda match: match["similarity"], reverse=True)
+        return matches[:limit]
+
+    def _insert(self, key: str, signature: array, band_keys: List[int], owner: Optional[str]):
+        if key in self._signatures:
+            self._remove(key)
+
+        self._signatures[key] = signature
+        self._owners[key] = owner
+        for band, band_key in enumerate(band_keys):
+            self._buckets[band].setdefault(band_key, {})[key] = None
+
+    def _remove(self, key: str):
+        signature = self._signatures.pop(key)
+        self._owners.pop(key, None)
+        for band, band_key in enumerate(self._band_keys(signature)):
+            bucket = self._buckets[band].get(band_key)
+            if bucket is None:
+                continue
+            bucket.pop(key, None)
+            if not bucket:
+                del self._buckets[band][band_key]
+
+    def add(self, key: str, text: str, owner: Optional[str] = None) -> bool:
+        """
+        Add an answer to the index.
+
+        Args:
+            key: Unique identifier for the answer
+            text: Answer text
+            owner: Optional owner (e.g. session ID) used to exclude self-matches
+
+        Returns:
+            True if the answer was indexed, False if it was too short
+        """
+        signature = self.signature(text)
+        if signature is None:
+            return False
+
+        band_keys = self._band_keys(signature)
+        with self._lock:
+            self._insert(key, signature, band_keys, owner)
+        return True
+
+    def remove(self, key: str):
+        """Remove an answer from the index if present."""
+        with self._lock:
+            if key in self._signatures:
+                self._remove(key)
+
+    def query(self, text: str, exclude_owner: Optional[str] = None, limit: int = 5) -> List[Dict]:
+        """
+        Find stored answers that are near-duplicates of the given text.
+
+        Args:
+            text: Answer text to look up
+            exclude_owner: Skip answers belonging to this owner
+            limit: Maximum number of matches to return
+
+        Returns:
+            Matches sorted by estimated similarity (highest first)
+        """
+        signature = self.signature(text)
+        if signature is None:
+            return []
+
+        band_keys = self._band_keys(signature)
+        with self._lock:
+            return self._query(signature, band_keys, exclude_owner, limit)
+
+    def check_and_add(self, key: str, text: str, owner: Optional[str] = None,
+                      limit: int = 5) -> List[Dict]:
+        """
+        Query for near-duplicates from other owners, then index the answer.
+
+        The signature is computed once and shared by both steps.
+
+        Returns:
+            Matches found before the answer was added
+        """
+        signature = self.signature(text)
+        if signature is None:
+            return []
+
+        band_keys = self._band_keys(signature)
+        with self._lock:
+            matches = self._query(signature, band_keys, owner, limit)
+            self._insert(key, signature, band_keys, owner)
+        return matches
+
+    def stats(self) -> Dict[str, float]:
+        """Get index size statistics."""
+        with self._lock:
+            return {
+                "indexed_answers": len(self._signatures),
+                "buckets": sum(len(table) for table in self._buckets),
+                "threshold": self.threshold
+            }
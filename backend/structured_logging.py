@@ -0,0 +1,198 @@
+"""
+Structured JSON logging with a non-blocking, queue-backed handler.
+
+Request threads only capture the record and its context and put it on a
+queue; a background listener formats JSON and writes it to stdout. Context
+fields (request_id, session_id, round, question, ...) are bound per request
+with bind_context() and attached to every record logged while handling it.
+Repeated warnings and errors are rate limited.
+
+Configuration (environment variables):
+    LOG_LEVEL                   Minimum level (default: INFO)
+    LOG_RATE_LIMIT_COUNT        Identical warnings/errors allowed per window (default: 5)
+    LOG_RATE_LIMIT_SECONDS      Rate limit window in seconds (default: 60)
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+_log_context: ContextVar[Dict] = ContextVar("log_context", default={})
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message", "asctime", "context", "suppressed"
+}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_setup_lock = threading.Lock()
+
+
+def bind_context(**fields):
+    """Add fields to the logging context of the current request."""
+    _log_context.set({**_log_context.get(), **fields})
+
+
+def reset_context(**fields):
+    """Start a fresh logging context (called at the start of each request)."""
+    _log_context.set(dict(fields))
+
+
+def get_context() -> Dict:
+    """Get the logging context of the current request."""
+    return _log_context.get()
+
+
+class ContextFilter(logging.Filter):
+    """Snapshot the request context onto each record in the logging thread."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.context = _log_context.get()
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Drop repeats of the same warning/error beyond `limit` per `window` seconds.
+
+    Records are the same if their formatted message and exception type match,
+    so one noisy error does not hide a different error logged with the same
+    template.
+
+    The first record let through after suppression carries a `suppressed`
+    count so the dropped volume stays visible.
+    """
+
+    def __init__(self, limit: int = 5, window: float = 60.0):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self._counters: Dict[Tuple[str, int, str, Optional[type]], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING:
+            return True
+
+        exc_type = record.exc_info[0] if record.exc_info else None
+        key = (record.name, record.levelno, record.getMessage(), exc_type)
+        now = time.monotonic()
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None or now - counter[0] >= self.window:
+                suppressed = counter[2] if counter else 0
+                self._counters[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                if len(self._counters) > 10000:
+                    self._counters.clear()
+                return True
+
+            if counter[1] < self.limit:
+                counter[1] += 1
+                return True
+
+            counter[2] += 1
+            return False
+
+
+class JsonFormatter(logging.Formatter):
+    """Render records as single-line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "context", {}))
+        entry.update({
+            key: value for key, value in vars(record).items()
+            if key not in _RECORD_ATTRIBUTES
+        })
+        if getattr(record, "suppressed", None):
+            entry["suppressed_repeats"] = record.suppressed
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        elif record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._formatter = JsonFormatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Keep structured fields; only resolve what cannot cross threads
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self._formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def setup_logging(level: Optional[str] = None, stream=None) -> logging.Logger:
+    """
+    Route all logging through the queue-backed JSON pipeline.
+
+    Safe to call more than once; only the first call installs handlers.
+
+    Returns:
+        The root logger
+    """
+    global _listener
+
+    root = logging.getLogger()
+    with _setup_lock:
+        if _listener is not None:
+            return root
+
+        log_queue: queue.Queue = queue.Queue(maxsize=10000)
+        queue_handler = NonBlockingQueueHandler(log_queue)
+        queue_handler.addFilter(ContextFilter())
+        queue_handler.addFilter(RateLimitFilter(
+            limit=int(os.getenv("LOG_RATE_LIMIT_COUNT", 5)),
+            window=float(os.getenv("LOG_RATE_LIMIT_SECONDS", 60))
+        ))
+
+        output_handler = logging.StreamHandler(stream or sys.stdout)
+        output_handler.setFormatter(JsonFormatter())
+
+        root.handlers = [queue_handler]
+        root.setLevel((level or os.getenv("LOG_LEVEL", "INFO")).upper())
+
+        _listener = logging.handlers.QueueListener(log_queue, output_handler)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+    return root
+
+
+def dropped_records() -> int:
+    """Number of records dropped because the log queue was full."""
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, NonBlockingQueueHandler):
+            return handler.dropped
+    return 0
@@ -0,0 +1,121 @@
+"""
+Compact per-session status records for dashboards.
+
+A summary is rebuilt whenever a session changes (interview start, committed
+turn), so batch status lookups never serialize full sessions.
+"""
+
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from models import InterviewSession
+
+
+def build_summary(session: InterviewSession, total_questions: int) -> Dict:
+    """Build the compact status record of a session."""
+    finished_rounds = [
+        round_data for round_number, round_data in sorted(session.rounds.items())
+        if round_data.status in ("completed", "failed")
+    ]
+    latest = finished_rounds[-1] if finished_rounds else None
+
+    return {
+        "session_id": session.session_id,
+        "job_role": session.job_role,
+        "candidate_name": session.candidate_name,
+        "status": session.status,
+        "ready": bool(session.conversation_history),
+        "current_round": session.current_round,
+        "current_question": session.current_question,
+        "total_questions": total_questions,
+        "latest_round": latest.round_number if latest else None,
+        "latest_round_score": latest.round_score if latest else None,
+        "batch": session.final_evaluation.get("batch") if session.final_evaluation else None,
+        "created_at": session.created_at,
+        "completed_at": session.completed_at
+    }
+
+
+class SessionSummaryStore:
+    """Summaries of all sessions, indexed by job role and status."""
+
+    def __init__(self):
+        self._summaries: Dict[str, Dict] = {}
+        self._by_role: Dict[str, Set[str]] = defaultdict(set)
+        self._by_status: Dict[str, Set[str]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def update(self, session: InterviewSession, total_questions: int):
+        """Rebuild the summary of a session after it changed."""
+        self.update_many([(session, total_questions)])
+
+    def update_many(self, sessions: Iterable[Tuple[InterviewSession, int]]):
+        """Rebuild the summaries of several sessions under one lock."""
+        summaries = [build_summary(session, total_questions) for session, total_questions in sessions]
+
+        with self._lock:
+            for summary in summaries:
+                session_id = summary["session_id"]
+                previous = self._summaries.get(session_id)
+                if previous is not None:
+                    self._by_role[previous["job_role"]].discard(session_id)
+                    self._by_status[previous["status"]].discard(session_id)
+
+                self._summaries[session_id] = summary
+                self._by_role[summary["job_role"]].add(session_id)
+                self._by_status[summary["status"]].add(session_id)
+
+    def remove(self, session_id: str):
+        """Forget a session."""
+        with self._lock:
+            summary = self._summaries.pop(session_id, None)
+            if summary is not None:
+                self._by_role[summary["job_role"]].discard(session_id)
+                self._by_status[summary["status"]].discard(session_id)
+
+    def get_many(self, session_ids: Iterable[str]) -> Tuple[List[Dict], List[str]]:
+        """
+        Look up summaries by session ID.
+
+        Returns:
+            (summaries in request order, IDs that were not found)
+        """
+        found, missing = [], []
+        with self._lock:
+            for session_id in session_ids:
+                summary = self._summaries.get(session_id)
+                if summary is None:
+                    missing.append(session_id)
+                else:
+                    found.append(summary)
+        return found, missing
+
+    def filter(self, job_role: Optional[str] = None, status: Optional[str] = None,
+               limit: int = 200) -> List[Dict]:
+        """
+        Get summaries matching a job role and/or status, newest first.
+
+        Args:
+            job_role: Only sessions for this job role
+            status: Only sessions in this status (active, completed, terminated)
+            limit: Maximum summaries returned
+        """
+        with self._lock:
+            if job_role is None and status is None:
+                session_ids = set(self._summaries)
+            else:
+                candidates = []
+                if job_role is not None:
+                    candidates.append(self._by_role.get(job_role, set()))
+                if status is not None:
+                    candidates.append(self._by_status.get(status, set()))
+                session_ids = set.intersection(*candidates)
+
+            summaries = [self._summaries[session_id] for session_id in session_ids]
+
+        summaries.sort(key=lambda summary: summary["created_at"], reverse=True)
+        return summaries[:limit]
+
+    def __len__(self) -> int:
+        return len(self._summaries)
@@ -0,0 +1,118 @@
+"""Admission control and 429 backpressure."""
+
+import threading
+import time
+
+import pytest
+
+import app as app_module
+from admission import AdmissionController, AdmissionRejected, Priority
+from conftest import GOOD_ANSWER
+
+
+def _wait_for(condition, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+class Waiter(threading.Thread):
+    """Asks for a slot in the background and records whether it got one."""
+
+    def __init__(self, controller: AdmissionController, priority: Priority, admitted: list):
+        super().__init__(daemon=True)
+        self.controller = controller
+        self.priority = priority
+        self.admitted = admitted
+        self.rejected = False
+
+    def run(self):
+        try:
+            with self.controller.admit(self.priority):
+                self.admitted.append(self.priority)
+        except AdmissionRejected:
+            self.rejected = True
+
+
+def test_requests_within_capacity_are_admitted_at_once():
+    controller = AdmissionController(max_in_flight=2)
+
+    with controller.admit(Priority.TURN), controller.admit(Priority.NEW_INTERVIEW):
+        assert controller.stats()["in_flight"] == 2
+    assert controller.stats()["in_flight"] == 0
+
+
+def test_new_interviews_only_get_their_share_of_slots():
+    controller = AdmissionController(max_in_flight=4, max_wait=0.05, new_interview_share=0.5)
+
+    with controller.admit(Priority.NEW_INTERVIEW), controller.admit(Priority.NEW_INTERVIEW):
+        with pytest.raises(AdmissionRejected) as rejected:
+            with controller.admit(Priority.NEW_INTERVIEW):
+                pass
+        # Turns still get the remaining slots
+        with controller.admit(Priority.TURN):
+            pass
+
+    assert rejected.value.retry_after >= 1
+    assert controller.stats()["classes"]["new_interview"]["rejected"] == 1
+
+
+def test_full_queue_rejects_immediately():
+    controller = AdmissionController(max_in_flight=1, max_queue=0, max_wait=5)
+
+    with controller.admit(Priority.TURN):
+        started = time.monotonic()
+        with pytest.raises(AdmissionRejected):
+            with controller.admit(Priority.TURN):
+                pass
+        assert time.monotonic() - started < 1
+
+
+def test_waiting_turns_go_before_new_interviews():
+    controller = AdmissionController(max_in_flight=1, max_wait=2)
+    admitted = []
+
+    with controller.admit(Priority.TURN):
+        new_interview = Waiter(controller, Priority.NEW_INTERVIEW, admitted)
+        new_interview.start()
+        _wait_for(lambda: controller.stats()["queue_depth"] == 1)
+        turn = Waiter(controller, Priority.TURN, admitted)
+        turn.start()
+        _wait_for(lambda: controller.stats()["queue_depth"] == 2)
+
+    new_interview.join()
+    turn.join()
+    assert admitted == [Priority.TURN, Priority.NEW_INTERVIEW]
+
+
+def test_turn_evicts_a_queued_new_interview_from_a_full_queue():
+    controller = AdmissionController(max_in_flight=1, max_queue=1, max_wait=2)
+    admitted = []
+
+    with controller.admit(Priority.TURN):
+        new_interview = Waiter(controller, Priority.NEW_INTERVIEW, admitted)
+        new_interview.start()
+        _wait_for(lambda: controller.stats()["queue_depth"] == 1)
+        turn = Waiter(controller, Priority.TURN, admitted)
+        turn.start()
+        new_interview.join()
+        assert new_interview.rejected
+
+    turn.join()
+    assert admitted == [Priority.TURN]
+
+
+def test_busy_server_answers_429_and_leaves_the_session_alone(client, interview_id, monkeypatch):
+    controller = AdmissionController(max_in_flight=1, max_wait=0.05)
+    monkeypatch.setattr(app_module, "get_admission", lambda: controller)
+    session = app_module.get_session_store()[interview_id]
+    before = session.dict()
+
+    with controller.admit(Priority.TURN):
+        response = client.post("/api/chat", json={"session_id": interview_id, "message": GOOD_ANSWER})
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert response.get_json()["retry_after"] == int(response.headers["Retry-After"])
+    assert session.dict() == before
@@ -0,0 +1,92 @@
+"""Local pre-filter classifications and the turns they answer without the LLM."""
+
+import pytest
+
+import app as app_module
+from answer_prefilter import ELABORATION_MESSAGES, SCORED_FEEDBACK, AnswerPrefilter
+from conftest import GOOD_ANSWER
+
+QUESTION = "How would you design a rate limiter for a public API?"
+
+
+@pytest.fixture
+def prefilter() -> AnswerPrefilter:
+    return AnswerPrefilter()
+
+
+@pytest.mark.parametrize("answer, reason", [
+    ("", "empty"),
+    ("   \n\t", "empty"),
+    ("?!", "empty"),
+    ("Yes", "too_short"),
+    ("How would you design a rate limiter for a public API", "copied_question"),
+    ("asdf qwerty zxcvb", "gibberish"),
+    ("aaaaaaa bbbbbbbb", "gibberish"),
+    ("12345 678 91011", "gibberish"),
+    ("good good good good good good good good good good", "gibberish"),
+])
+def test_junk_answers_are_classified(prefilter, answer, reason):
+    assert prefilter.classify(answer, QUESTION) == reason
+
+
+@pytest.mark.parametrize("answer", [
+    GOOD_ANSWER,
+    "Token bucket per API key, stored in Redis.",
+    "I'd use NGINX and AWS WAF with a token bucket per key.",
+    "Ich würde einen Token-Bucket pro Schlüssel verwenden.",
+    "A limiter for the API: token bucket per key, with a public quota page.",
+])
+def test_real_answers_go_to_the_llm(prefilter, answer):
+    assert prefilter.classify(answer, QUESTION) is None
+
+
+def test_junk_is_elaborated_once_then_scored(prefilter):
+    first = prefilter.check("Yes", QUESTION, elaborations=0)
+    second = prefilter.check("Yes", QUESTION, elaborations=1)
+
+    assert (first.action, first.message) == ("elaborate", ELABORATION_MESSAGES["too_short"])
+    assert (second.action, second.message) == ("score", SCORED_FEEDBACK)
+    assert prefilter.check(GOOD_ANSWER, QUESTION) is None
+
+    stats = prefilter.stats()
+    assert (stats["checked"], stats["caught"]) == (3, 2)
+    assert stats["reasons"]["too_short"] == 2
+    # The elaboration saved evaluate_answer and ask_next_question; the scored answer only evaluate_answer
+    assert stats["llm_calls_saved"] == 3
+
+
+def test_score_mode_never_elaborates():
+    verdict = AnswerPrefilter(mode="score").check("", QUESTION)
+
+    assert verdict.action == "score"
+
+
+def test_off_mode_lets_everything_through():
+    prefilter = AnswerPrefilter(mode="off")
+
+    assert prefilter.check("", QUESTION) is None
+    assert prefilter.stats()["checked"] == 0
+    with pytest.raises(ValueError):
+        AnswerPrefilter(mode="strict")
+
+
+def test_junk_answer_is_answered_without_the_llm(client, llm, interview_id, monkeypatch):
+    monkeypatch.setattr(app_module, "get_answer_prefilter", lambda: AnswerPrefilter())
+    session = app_module.get_session_store()[interview_id]
+
+    elaborated = client.post("/api/chat", json={"session_id": interview_id, "message": "Yes"})
+
+    assert elaborated.status_code == 200
+    assert elaborated.get_json()["ai_message"] == ELABORATION_MESSAGES["too_short"]
+    assert session.current_question == 0
+    assert llm.calls["evaluate_answer"] == 0
+
+    scored = client.post("/api/chat", json={"session_id": interview_id, "message": "Yes"})
+
+    assert scored.status_code == 200
+    assert session.current_question == 1
+    qa = session.rounds[1].questions[0]
+    assert (qa.prefiltered, qa.ai_feedback) == ("too_short", SCORED_FEEDBACK)
+    assert llm.calls["evaluate_answer"] == 0
+    # The next question still comes from the LLM
+    assert llm.calls["ask_next_question"] == 1
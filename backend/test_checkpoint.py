@@ -0,0 +1,74 @@
+"""Rollback of chat turns that fail part-way."""
+
+import app as app_module
+from concurrency import TurnCheckpoint
+from conftest import GOOD_ANSWER
+from llm_providers import ProviderError
+from models import InterviewSession, Message, RoundData
+
+
+def _session() -> InterviewSession:
+    return InterviewSession(
+        session_id="checkpointed",
+        job_role="Software Engineer",
+        rounds={1: RoundData(round_number=1, round_name="Screening Round", status="in_progress")},
+        conversation_history=[Message(role="assistant", content="Welcome. First question?")]
+    )
+
+
+def _apply_turn(session: InterviewSession):
+    """Mutate a session the way a round-completing turn does."""
+    session.conversation_history.append(Message(role="user", content="answer"))
+    session.conversation_history.append(Message(role="assistant", content="feedback"))
+    session.current_question = 1
+    session.rounds[1].status = "completed"
+    session.rounds[1].round_score = 80.0
+    session.current_round = 2
+    session.rounds[2] = RoundData(round_number=2, round_name="Technical Round", status="in_progress")
+
+
+def test_restore_undoes_a_partial_turn():
+    session = _session()
+    before = session.dict()
+    checkpoint = TurnCheckpoint(session)
+
+    _apply_turn(session)
+    checkpoint.restore(session)
+
+    assert session.dict() == before
+
+
+def test_session_data_is_the_state_before_the_turn():
+    session = _session()
+    before = session.dict()
+    checkpoint = TurnCheckpoint(session)
+
+    _apply_turn(session)
+
+    assert checkpoint.session_data(session) == before
+    assert InterviewSession(**checkpoint.session_data(session)).current_round == 1
+    # The live session is left alone
+    assert session.current_round == 2
+
+
+def test_failed_turn_is_rolled_back_and_can_be_retried(client, llm, interview_id):
+    session = app_module.get_session_store()[interview_id]
+    before = session.dict()
+    request = {"session_id": interview_id, "message": GOOD_ANSWER}
+    headers = {"Idempotency-Key": "answer-1"}
+
+    llm.fail_with = ProviderError("provider down")
+    failed = client.post("/api/chat", json=request, headers=headers)
+
+    assert failed.status_code == 500
+    assert session.dict() == before
+    matches = app_module.get_answer_index().query(GOOD_ANSWER, limit=100)
+    assert interview_id not in {match["session_id"] for match in matches}
+
+    llm.fail_with = None
+    retried = client.post("/api/chat", json=request, headers=headers)
+
+    assert retried.status_code == 200
+    assert "Idempotent-Replayed" not in retried.headers
+    assert session.current_question == 1
+    assert [message.role for message in session.conversation_history].count("user") == 1
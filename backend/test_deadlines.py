@@ -0,0 +1,80 @@
+"""Request deadlines and the 504 answer of turns that run out of time."""
+
+import time
+
+import pytest
+
+import app as app_module
+from conftest import GOOD_ANSWER
+from deadlines import ClientDisconnected, Deadline, DeadlineExceeded, current_deadline, deadline_scope
+
+
+def test_call_timeout_is_capped_by_the_remaining_budget():
+    deadline = Deadline(10)
+
+    assert deadline.call_timeout(max_timeout=2) == 2
+    assert 9 < deadline.call_timeout() <= 10
+
+
+def test_call_is_not_started_without_enough_budget():
+    deadline = Deadline(0.1)
+
+    with pytest.raises(DeadlineExceeded):
+        deadline.call_timeout()
+
+
+def test_cancelled_or_disconnected_requests_stop():
+    deadline = Deadline(10)
+    deadline.cancel()
+    with pytest.raises(ClientDisconnected):
+        deadline.check()
+
+    gone = Deadline(10, is_disconnected=lambda: True)
+    with pytest.raises(ClientDisconnected):
+        gone.check()
+    assert gone.cancelled
+
+
+def test_deadline_is_visible_within_its_scope_only():
+    deadline = Deadline(10)
+
+    with deadline_scope(deadline):
+        assert current_deadline() is deadline
+    assert current_deadline() is None
+
+
+def test_turn_past_its_deadline_answers_504_and_is_rolled_back(client, llm, interview_id, monkeypatch):
+    seen = {}
+
+    def slow_evaluation(*args, **kwargs):
+        seen["budget"] = current_deadline().remaining()
+        time.sleep(0.2)
+        current_deadline().check()
+
+    monkeypatch.setattr(llm, "evaluate_answer", slow_evaluation)
+    session = app_module.get_session_store()[interview_id]
+    before = session.dict()
+
+    response = client.post("/api/chat", json={"session_id": interview_id, "message": GOOD_ANSWER},
+                           headers={"X-Request-Timeout-Ms": "100"})
+
+    assert response.status_code == 504
+    assert seen["budget"] <= 0.1
+    assert session.dict() == before
+
+
+def test_client_timeout_cannot_extend_the_server_budget(client, llm, interview_id, monkeypatch):
+    seen = {}
+
+    def evaluation(*args, **kwargs):
+        seen["budget"] = current_deadline().remaining()
+        return "Good answer."
+
+    monkeypatch.setattr(llm, "evaluate_answer", evaluation)
+    client.application.config["REQUEST_DEADLINE_SECONDS"] = 5
+
+    response = client.post("/api/chat", json={"session_id": interview_id, "message": GOOD_ANSWER},
+                           headers={"X-Request-Timeout-Ms": "600000"})
+
+    assert response.status_code == 200
+    assert seen["budget"] <= 5
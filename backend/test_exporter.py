@@ -0,0 +1,93 @@
+"""Exports of finished sessions and their completion watermark."""
+
+import csv
+import io
+
+import pytest
+
+import app as app_module
+from exporter import SessionExporter, flatten_session
+from models import InterviewSession, QuestionAnswer, RoundData
+
+
+def _finished(session_id: str, completed_at: str, status: str = "completed") -> InterviewSession:
+    return InterviewSession(
+        session_id=session_id,
+        job_role="Software Engineer",
+        status=status,
+        completed_at=completed_at,
+        rounds={1: RoundData(round_number=1, round_name="Screening Round", status="completed", questions=[
+            QuestionAnswer(question_number=1, question="Why us?", answer="Because.", ai_feedback="Fine.", score=50.0)
+        ])},
+        final_evaluation={"overall_score": 50.0, "batch": "C"}
+    )
+
+
+def _csv_rows(body: bytes):
+    return list(csv.DictReader(io.StringIO(body.decode("utf-8"))))
+
+
+@pytest.fixture
+def finished_sessions(client):
+    store = app_module.get_session_store()
+    for session in (
+        _finished("s1", "2024-01-01T10:00:00"),
+        _finished("s2", "2024-01-02T10:00:00", status="terminated"),
+        _finished("s3", "2024-01-03T10:00:00")
+    ):
+        store[session.session_id] = session
+    store["active"] = InterviewSession(session_id="active", job_role="Software Engineer")
+    return store
+
+
+def test_session_is_flattened_into_one_row_per_table_record():
+    rows = flatten_session(_finished("s1", "2024-01-01T10:00:00").dict())
+
+    assert rows["sessions"][0]["batch"] == "C"
+    assert [(row["round_number"], row["question_count"]) for row in rows["rounds"]] == [(1, 1)]
+    assert rows["question_answers"][0]["answer"] == "Because."
+
+
+def test_offline_export_skips_unfinished_and_already_exported_sessions(tmp_path):
+    sessions = [
+        _finished("s1", "2024-01-01T10:00:00").dict(),
+        _finished("s2", "2024-01-02T10:00:00").dict(),
+        InterviewSession(session_id="active", job_role="Software Engineer").dict()
+    ]
+
+    summary = SessionExporter(str(tmp_path), export_format="csv").export(sessions, since="2024-01-01T10:00:00")
+
+    assert summary["watermark"] == "2024-01-02T10:00:00"
+    assert summary["rows"] == {"sessions": 1, "rounds": 1, "question_answers": 1}
+
+
+def test_export_reports_the_latest_exported_completion_as_watermark(client, finished_sessions):
+    response = client.get("/api/export/sessions?format=csv")
+
+    assert response.headers["X-Export-Watermark"] == "2024-01-03T10:00:00"
+    assert response.headers["X-Export-Sessions"] == "3"
+    assert [row["session_id"] for row in _csv_rows(response.data)] == ["s1", "s2", "s3"]
+
+
+def test_until_bounds_the_other_tables_to_the_same_sessions(client, finished_sessions):
+    first = client.get("/api/export/sessions?format=csv&since=2024-01-01T10:00:00")
+    watermark = first.headers["X-Export-Watermark"]
+    # A session finishing between the two downloads is left for the next export
+    finished_sessions["s4"] = _finished("s4", "2024-01-04T10:00:00")
+
+    rounds = client.get(f"/api/export/rounds?format=csv&since=2024-01-01T10:00:00&until={watermark}")
+
+    assert [row["session_id"] for row in _csv_rows(rounds.data)] == ["s2", "s3"]
+    assert rounds.headers["X-Export-Watermark"] == watermark
+
+
+def test_empty_export_keeps_the_previous_watermark(client, finished_sessions):
+    response = client.get("/api/export/sessions?format=csv&since=2024-01-03T10:00:00")
+
+    assert response.headers["X-Export-Sessions"] == "0"
+    assert response.headers["X-Export-Watermark"] == "2024-01-03T10:00:00"
+
+
+def test_unknown_tables_and_formats_are_rejected(client):
+    assert client.get("/api/export/candidates").status_code == 404
+    assert client.get("/api/export/sessions?format=xlsx").status_code == 400
@@ -0,0 +1,217 @@
+"""Writing and claiming handoff files, and draining with turns in flight."""
+
+import json
+import threading
+import time
+
+import app as app_module
+from concurrency import TurnCheckpoint
+from conftest import GOOD_ANSWER
+from handoff import DrainState, HANDOFF_FORMAT_VERSION, announce_handoff, claim_handoff, handoff_pending, write_handoff
+from models import InterviewSession, Message, QuestionAnswer, RoundData
+
+FINAL_EVALUATION = {"overall_score": 82.0, "confidence_score": 75.0, "batch": "A", "recommendation": "Hire"}
+
+
+def _finished_session(session_id: str = "finished") -> InterviewSession:
+    return InterviewSession(
+        session_id=session_id, job_role="Software Engineer", status="completed", final_evaluation=FINAL_EVALUATION,
+        rounds={1: RoundData(round_number=1, round_name="Screening Round", status="completed", round_score=80.0,
+                             passed=True, questions=[QuestionAnswer(question_number=1, question="Why us?",
+                                                                    answer="Your platform.", ai_feedback="Good.",
+                                                                    score=80.0)])},
+        conversation_history=[Message(role="assistant", content="Welcome. First question?")]
+    )
+
+
+def test_claim_returns_what_was_written(tmp_path):
+    path = str(tmp_path / "handoff.json")
+    sessions = [{"session_id": "s1", "job_role": "Software Engineer"}]
+    idempotency = [{"session_id": "s1", "key": "k1", "ttl": 60, "fingerprint": "f", "body": {}, "status_code": 200}]
+
+    write_handoff(path, sessions, idempotency)
+
+    assert claim_handoff(path) == {"sessions": sessions, "idempotency": idempotency}
+    assert (tmp_path / "handoff.json.loaded").exists()
+    assert not (tmp_path / "handoff.json").exists()
+
+
+def test_handoff_is_claimed_only_once(tmp_path):
+    path = str(tmp_path / "handoff.json")
+    write_handoff(path, [], [])
+
+    assert claim_handoff(path) is not None
+    assert claim_handoff(path) is None
+
+
+def test_unusable_handoff_files_are_ignored(tmp_path):
+    path = tmp_path / "handoff.json"
+    path.write_text(json.dumps({"version": HANDOFF_FORMAT_VERSION + 1, "sessions": [{}]}))
+    assert claim_handoff(str(path)) is None
+
+    path.write_text("{not json")
+    assert claim_handoff(str(path)) is None
+
+
+def test_drain_state_records_rolled_back_sessions():
+    state = DrainState()
+    assert state.start()
+    assert not state.start()
+
+    assert state.mark_rolled_back("s1")
+
+    assert state.rolled_back("s1")
+    assert not state.rolled_back("s2")
+    assert state.stats()["rolled_back_sessions"] == 1
+
+
+def test_turn_is_either_committed_or_rolled_back():
+    state = DrainState()
+    assert state.mark_rolled_back("s1")
+    assert not state.commit_turn("s1")
+
+    assert state.commit_turn("s2")
+    # Too late to hand it off without the turn
+    assert not state.mark_rolled_back("s2")
+    state.turn_done("s2")
+    assert state.mark_rolled_back("s2")
+
+
+def test_pending_handoff_expires(tmp_path):
+    path = str(tmp_path / "handoff.json")
+    assert not handoff_pending(path)
+
+    announce_handoff(path, 0)
+    assert not handoff_pending(path)
+
+    announce_handoff(path, 60)
+    assert handoff_pending(path)
+    write_handoff(path, [], [])
+    assert not handoff_pending(path)
+
+
+def test_drained_sessions_load_in_the_next_process(client, interview_id, drain_state, monkeypatch, tmp_path):
+    client.post("/api/chat", json={"session_id": interview_id, "message": GOOD_ANSWER},
+                headers={"Idempotency-Key": "answer-1"})
+    expected = app_module.get_session_store()[interview_id].dict()
+
+    result = app_module.drain_and_handoff(timeout=0)
+    assert drain_state.draining
+    assert result["failed"] == 0
+
+    # The next process starts with an empty store and claims the file
+    del app_module.get_session_store()[interview_id]
+    monkeypatch.setattr(app_module, "get_drain_state", DrainState)
+    app_module._load_handoff()
+
+    assert app_module.get_session_store()[interview_id].dict() == expected
+    assert app_module.get_idempotency_cache().get(interview_id, "answer-1", GOOD_ANSWER) is not None
+
+
+def test_turn_outliving_the_drain_is_handed_off_rolled_back(client, interview_id, drain_state, tmp_path):
+    session = app_module.get_session_store()[interview_id]
+    before = session.dict()
+
+    # A turn that holds the lock and has started changing the session
+    with app_module.get_session_locks().hold(interview_id):
+        app_module._turn_checkpoints[interview_id] = TurnCheckpoint(session)
+        session.conversation_history.append(Message(role="user", content=GOOD_ANSWER))
+        session.current_question += 1
+        try:
+            result = app_module.drain_and_handoff(timeout=0)
+        finally:
+            app_module._turn_checkpoints.pop(interview_id, None)
+
+    assert result["rolled_back"] >= 1
+    assert drain_state.rolled_back(interview_id)
+    handed_off = {data["session_id"]: data for data in claim_handoff(str(tmp_path / "handoff.json"))["sessions"]}
+    assert json.loads(json.dumps(handed_off[interview_id])) == json.loads(json.dumps(before, default=str))
+
+
+def test_turn_handed_off_rolled_back_is_answered_with_503(client, llm, interview_id, drain_state, monkeypatch):
+    session = app_module.get_session_store()[interview_id]
+    before = session.dict()
+
+    # The drain decides to hand the session off without this turn while the LLM call runs
+    def evaluate_during_drain(*args, **kwargs):
+        drain_state.start()
+        drain_state.mark_rolled_back(interview_id)
+        return "Good answer."
+
+    monkeypatch.setattr(llm, "evaluate_answer", evaluate_during_drain)
+    response = client.post("/api/chat", json={"session_id": interview_id, "message": GOOD_ANSWER},
+                           headers={"Idempotency-Key": "answer-1"})
+
+    assert response.status_code == 503
+    assert app_module.get_idempotency_cache().get(interview_id, "answer-1", GOOD_ANSWER) is None
+    # The turn's effects belong to the resent answer in the next process
+    assert session.dict() == before
+    app_module.get_transcript_index().flush()
+    assert app_module.get_transcript_index().search("idempotent") == []
+    assert app_module.get_answer_index().query(GOOD_ANSWER) == []
+
+
+def test_cohort_analytics_are_rebuilt_from_handed_off_sessions(client, tmp_path):
+    write_handoff(str(tmp_path / "handoff.json"), [_finished_session().dict()], [])
+
+    assert app_module._load_handoff() == 1
+
+    stats = app_module.get_cohort_analytics().role_stats("Software Engineer")
+    assert (stats["started"], stats["completed"]) == (1, 1)
+    assert stats["rounds"][1]["attempted"] == 1
+    assert [entry["session_id"] for entry in app_module.get_cohort_analytics().leaderboard("Software Engineer")] == [
+        "finished"
+    ]
+
+
+def test_session_moving_to_another_worker_takes_its_analytics_along(client):
+    app_module._register_session(_finished_session())
+    # A newer copy replaces the old one without counting it twice
+    app_module._register_session(_finished_session())
+    assert app_module.get_cohort_analytics().role_stats("Software Engineer")["completed"] == 1
+
+    app_module._release_session("finished")
+
+    stats = app_module.get_cohort_analytics().role_stats("Software Engineer")
+    assert (stats["started"], stats["completed"], stats["rounds"][1]["attempted"]) == (0, 0, 0)
+    assert app_module.get_cohort_analytics().leaderboard("Software Engineer") == []
+
+
+def test_sessions_awaiting_their_greeting_are_greeted_by_the_next_process(client, llm, drain_state, monkeypatch):
+    waiting = InterviewSession(session_id="bulk-1", job_role="Software Engineer", pipeline="engineering")
+    app_module.get_session_store()[waiting.session_id] = waiting
+
+    result = app_module.drain_and_handoff(timeout=0)
+    assert result["awaiting_greeting"] == 1
+
+    del app_module.get_session_store()[waiting.session_id]
+    monkeypatch.setattr(app_module, "get_drain_state", DrainState)
+    app_module._load_handoff()
+
+    loaded = app_module.get_session_store()[waiting.session_id]
+    deadline = time.monotonic() + 5
+    while not loaded.conversation_history:
+        assert time.monotonic() < deadline, "greeting was not generated"
+        time.sleep(0.01)
+    assert loaded.conversation_history[0].content.startswith("Welcome")
+
+
+def test_draining_process_does_not_load_its_own_handoff(client, interview_id, drain_state, tmp_path):
+    app_module.drain_and_handoff(timeout=0)
+
+    assert app_module._load_handoff() == 0
+    assert (tmp_path / "handoff.json").exists()
+
+
+def test_requests_wait_for_an_announced_handoff(client, tmp_path):
+    path = str(tmp_path / "handoff.json")
+    announce_handoff(path, 5)
+    # The old process finishes draining a little later
+    writer = threading.Timer(0.2, write_handoff, args=(path, [_finished_session().dict()], []))
+    writer.start()
+
+    response = client.get("/api/session/finished")
+    writer.join()
+
+    assert response.status_code == 200
+    assert response.get_json()["session_id"] == "finished"
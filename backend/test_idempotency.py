@@ -0,0 +1,88 @@
+"""Replays of chat turns by Idempotency-Key."""
+
+import pytest
+
+import app as app_module
+from concurrency import IdempotencyCache, IdempotencyConflictError
+from conftest import GOOD_ANSWER
+from models import InterviewSession, Message, RoundData
+
+
+def test_cache_replays_the_stored_response():
+    cache = IdempotencyCache()
+    cache.put("s1", "k1", "answer", {"ai_message": "feedback"}, 200)
+
+    assert cache.get("s1", "k1", "answer") == ({"ai_message": "feedback"}, 200)
+    assert cache.get("s1", "k2", "answer") is None
+    assert cache.get("s2", "k1", "answer") is None
+    assert cache.stats()["replays"] == 1
+
+
+def test_cache_rejects_a_key_reused_for_another_message():
+    cache = IdempotencyCache()
+    cache.put("s1", "k1", "answer", {}, 200)
+
+    with pytest.raises(IdempotencyConflictError):
+        cache.get("s1", "k1", "a different answer")
+
+
+def test_cache_expires_and_evicts_entries():
+    cache = IdempotencyCache(max_entries=2, ttl_seconds=0)
+    cache.put("s1", "k1", "answer", {}, 200)
+    assert cache.get("s1", "k1", "answer") is None
+
+    cache = IdempotencyCache(max_entries=2)
+    for key in ("k1", "k2", "k3"):
+        cache.put("s1", key, "answer", {}, 200)
+    assert cache.get("s1", "k1", "answer") is None
+    assert cache.get("s1", "k3", "answer") is not None
+
+
+def test_export_and_load_keep_entries_replayable():
+    cache = IdempotencyCache()
+    cache.put("s1", "k1", "answer", {"ai_message": "feedback"}, 200)
+
+    restored = IdempotencyCache()
+    restored.load(cache.export())
+
+    assert restored.get("s1", "k1", "answer") == ({"ai_message": "feedback"}, 200)
+
+
+def test_retried_answer_is_processed_once(client, llm, interview_id):
+    headers = {"Idempotency-Key": "answer-1"}
+    first = client.post("/api/chat", json={"session_id": interview_id, "message": GOOD_ANSWER}, headers=headers)
+    retry = client.post("/api/chat", json={"session_id": interview_id, "message": GOOD_ANSWER}, headers=headers)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.headers.get("Idempotent-Replayed") == "true"
+    assert retry.get_json() == first.get_json()
+    assert llm.calls["evaluate_answer"] == 1
+    session = app_module.get_session_store()[interview_id]
+    assert [message.role for message in session.conversation_history].count("user") == 1
+
+
+def test_reused_key_with_another_answer_is_rejected(client, interview_id):
+    headers = {"Idempotency-Key": "answer-1"}
+    client.post("/api/chat", json={"session_id": interview_id, "message": GOOD_ANSWER}, headers=headers)
+    response = client.post("/api/chat", json={"session_id": interview_id, "message": GOOD_ANSWER + " Also logs."},
+                           headers=headers)
+
+    assert response.status_code == 422
+
+
+def test_greeting_not_ready_is_not_replayed(client):
+    session = InterviewSession(
+        session_id="waiting-for-greeting", job_role="Software Engineer",
+        rounds={1: RoundData(round_number=1, round_name="Screening Round", status="in_progress")}
+    )
+    app_module.get_session_store()[session.session_id] = session
+    headers = {"Idempotency-Key": "early-answer"}
+    request = {"session_id": session.session_id, "message": GOOD_ANSWER}
+
+    assert client.post("/api/chat", json=request, headers=headers).status_code == 409
+
+    session.conversation_history.append(Message(role="assistant", content="Welcome. First question?"))
+    response = client.post("/api/chat", json=request, headers=headers)
+
+    assert response.status_code == 200
+    assert "Idempotent-Replayed" not in response.headers
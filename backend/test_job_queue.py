@@ -0,0 +1,115 @@
+"""Durable report jobs: retries, lease recovery and resuming after a restart."""
+
+import time
+
+import pytest
+
+import app as app_module
+from job_queue import JobQueue
+from models import InterviewSession, QuestionAnswer, RoundData
+from reports import REPORT_JOB, report_payload
+
+
+def _wait_for_status(jobs: JobQueue, job_id: str, status: str, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while jobs.get(job_id)["status"] != status:
+        assert time.monotonic() < deadline, f"job did not reach {status}: {jobs.get(job_id)}"
+        time.sleep(0.02)
+    return jobs.get(job_id)
+
+
+@pytest.fixture
+def queues():
+    """Creates queues on a test database and closes them afterwards."""
+    created = []
+
+    def create(db_path, handlers, **options):
+        options.setdefault("poll_interval", 0.05)
+        jobs = JobQueue(str(db_path), handlers, **options)
+        created.append(jobs)
+        return jobs
+
+    yield create
+    for jobs in created:
+        jobs.close()
+
+
+def test_job_result_is_stored(queues, tmp_path):
+    jobs = queues(tmp_path / "jobs.db", {"double": lambda payload: {"value": payload["value"] * 2}})
+
+    job_id = jobs.enqueue("double", "s1", {"value": 21})
+
+    assert jobs.wait("double", "s1", timeout=5)["result"] == {"value": 42}
+    assert jobs.get(job_id)["attempts"] == 1
+    with pytest.raises(ValueError):
+        jobs.enqueue("unknown", "s1", {})
+
+
+def test_failing_job_is_retried_then_marked_failed(queues, tmp_path):
+    calls = []
+
+    def flaky(payload):
+        calls.append(payload)
+        raise RuntimeError("provider down")
+
+    finished = []
+    jobs = queues(tmp_path / "jobs.db", {"report": flaky}, max_attempts=3, retry_delay=0.01,
+                  on_finished=finished.append)
+
+    job = _wait_for_status(jobs, jobs.enqueue("report", "s1", {}), "failed")
+
+    assert len(calls) == 3
+    assert job["error"] == "provider down"
+    assert [record["status"] for record in finished] == ["failed"]
+
+
+def test_job_of_a_crashed_worker_runs_again_after_its_lease(queues, tmp_path):
+    db_path = tmp_path / "jobs.db"
+    crashed = queues(db_path, {"report": lambda payload: {}}, workers=0, lease_seconds=0.2)
+    job_id = crashed.enqueue("report", "s1", {})
+    # Claimed, then the process died without finishing it
+    assert crashed._claim()["job_id"] == job_id
+
+    restarted = queues(db_path, {"report": lambda payload: {"ok": True}}, workers=1)
+
+    job = _wait_for_status(restarted, job_id, "done")
+    assert job["result"] == {"ok": True}
+    assert job["attempts"] == 2
+
+
+def test_leased_job_is_not_taken_by_another_worker(queues, tmp_path):
+    db_path = tmp_path / "jobs.db"
+    first = queues(db_path, {"report": lambda payload: {}}, workers=0, lease_seconds=60)
+    second = queues(db_path, {"report": lambda payload: {}}, workers=0)
+    first.enqueue("report", "s1", {})
+
+    assert first._claim() is not None
+    assert second._claim() is None
+
+
+def test_create_app_resumes_jobs_left_by_the_previous_process(llm, drain_state, monkeypatch, tmp_path):
+    db_path = tmp_path / "reports.db"
+    session = InterviewSession(
+        session_id="finished", job_role="Software Engineer", status="completed",
+        rounds={1: RoundData(round_number=1, round_name="Screening Round", status="completed", questions=[
+            QuestionAnswer(question_number=1, question="Why us?", answer="Your platform.", ai_feedback="Good.")
+        ])}
+    )
+    previous = JobQueue(str(db_path), {REPORT_JOB: lambda payload: {}}, workers=0)
+    job_id = previous.enqueue(REPORT_JOB, session.session_id, report_payload(session))
+    previous.close()
+
+    monkeypatch.setenv("REPORT_DB_PATH", str(db_path))
+    monkeypatch.setenv("HANDOFF_PATH", str(tmp_path / "handoff.json"))
+    monkeypatch.setattr(app_module, "get_report_jobs",
+                        app_module._lazy_service(app_module.get_report_jobs.__wrapped__))
+    app_module.create_app()
+    jobs = app_module.get_report_jobs()
+    try:
+        # No request has touched the queue
+        job = _wait_for_status(jobs, job_id, "done")
+    finally:
+        jobs.close()
+
+    assert job["result"]["rounds"][0]["summary"] == "Solid round."
+    assert llm.calls["generate_round_report"] == 1
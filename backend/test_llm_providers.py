@@ -0,0 +1,152 @@
+"""Failover and health tracking in the LLM provider pool."""
+
+import time
+
+import pytest
+
+from deadlines import Deadline, DeadlineExceeded, deadline_scope
+from groq_service import GroqService
+from llm_providers import FAILURE_THRESHOLD, LLMProvider, ProviderError, ProviderPool, ProviderTimeout
+
+MESSAGES = [{"role": "user", "content": "Hello"}]
+
+
+class FakeProvider(LLMProvider):
+    """Answers with its name, or raises the queued errors first."""
+
+    def __init__(self, name: str, errors=()):
+        super().__init__()
+        self.name = name
+        self.errors = list(errors)
+        self.calls = 0
+
+    def complete(self, messages, model, temperature, max_tokens, deadline=None):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return f"answer from {self.name}", {"total_tokens": 3}
+
+
+def _complete(pool: ProviderPool):
+    return pool.complete(MESSAGES, "model", 0.5, 64)
+
+
+def test_call_fails_over_to_the_next_provider():
+    primary = FakeProvider("primary", [ProviderError("503 from primary")])
+    fallback = FakeProvider("fallback")
+    pool = ProviderPool([primary, fallback], probe_share=0)
+
+    content, usage, provider = _complete(pool)
+
+    assert (content, provider) == ("answer from fallback", "fallback")
+    assert usage == {"total_tokens": 3}
+    assert pool.stats()["primary"]["failures"] == 1
+    assert pool.stats()["fallback"]["calls"] == 1
+
+
+def test_failing_provider_is_skipped_during_its_cooldown():
+    primary = FakeProvider("primary", [ProviderTimeout("timed out")] * FAILURE_THRESHOLD)
+    fallback = FakeProvider("fallback")
+    pool = ProviderPool([primary, fallback], cooldown_seconds=60, probe_share=0)
+
+    for _ in range(FAILURE_THRESHOLD):
+        # The fallback is measured after its first answer, so put the primary first again
+        pool._health["fallback"].latency_ms = None
+        _complete(pool)
+    calls = primary.calls
+    _complete(pool)
+
+    assert not pool.stats()["primary"]["healthy"]
+    assert [provider.name for provider in pool.order()] == ["fallback", "primary"]
+    assert primary.calls == calls
+
+
+def test_rejected_requests_do_not_count_against_health():
+    rejections = [ProviderError("400 bad request", provider_fault=False)] * (FAILURE_THRESHOLD + 1)
+    primary = FakeProvider("primary", rejections)
+    fallback = FakeProvider("fallback")
+    pool = ProviderPool([primary, fallback], probe_share=0)
+
+    for _ in range(FAILURE_THRESHOLD + 1):
+        # The fallback is measured after its first answer, so put the primary first again
+        pool._health["fallback"].latency_ms = None
+        assert _complete(pool)[2] == "fallback"
+
+    stats = pool.stats()["primary"]
+    assert stats["healthy"]
+    assert stats["failures"] == 0
+    assert stats["rejections"] == FAILURE_THRESHOLD + 1
+
+
+def test_partially_streamed_call_is_not_moved_to_another_provider():
+    primary = FakeProvider("primary", [ProviderError("stream broke", retryable=False)])
+    fallback = FakeProvider("fallback")
+    pool = ProviderPool([primary, fallback], probe_share=0)
+
+    with pytest.raises(ProviderError, match="stream broke"):
+        _complete(pool)
+    assert fallback.calls == 0
+
+
+def test_last_error_is_raised_when_every_provider_fails():
+    pool = ProviderPool([
+        FakeProvider("primary", [ProviderError("primary down")]),
+        FakeProvider("fallback", [ProviderError("fallback down")])
+    ], probe_share=0)
+
+    with pytest.raises(ProviderError, match="fallback down"):
+        _complete(pool)
+
+
+class BudgetEatingProvider(FakeProvider):
+    """Times out because the request's deadline ran out while it waited."""
+
+    def complete(self, messages, model, temperature, max_tokens, deadline=None):
+        self.calls += 1
+        deadline.expires_at = time.monotonic()
+        raise ProviderTimeout(f"{self.name} did not answer in time")
+
+
+def test_provider_timeout_with_budget_left_fails_over():
+    slow = FakeProvider("slow", [ProviderTimeout("slow did not answer in time")])
+    fallback = FakeProvider("fallback")
+    pool = ProviderPool([slow, fallback], probe_share=0)
+
+    content, _, provider = pool.complete(MESSAGES, "model", 0.5, 64, Deadline(30))
+
+    assert provider == "fallback"
+    assert pool.stats()["slow"]["failures"] == 1
+
+
+def test_timeout_of_an_exhausted_deadline_is_not_the_providers_fault():
+    primary, fallback = BudgetEatingProvider("primary"), FakeProvider("fallback")
+    pool = ProviderPool([primary, fallback], probe_share=0)
+
+    with pytest.raises(DeadlineExceeded):
+        pool.complete(MESSAGES, "model", 0.5, 64, Deadline(30))
+
+    assert fallback.calls == 0
+    assert pool.stats()["primary"]["failures"] == 0
+
+
+def test_service_reports_provider_timeouts_as_failures_not_deadlines():
+    pool = ProviderPool([FakeProvider("slow", [ProviderTimeout("slow did not answer in time")])], probe_share=0)
+    service = GroqService(providers=pool)
+
+    with deadline_scope(Deadline(30)):
+        with pytest.raises(Exception, match="Failed to get AI response") as failed:
+            service.chat_completion(MESSAGES)
+    assert not isinstance(failed.value, DeadlineExceeded)
+
+    with deadline_scope(Deadline(30)):
+        with pytest.raises(DeadlineExceeded):
+            GroqService(providers=ProviderPool([BudgetEatingProvider("primary")])).chat_completion(MESSAGES)
+
+
+def test_fastest_healthy_provider_goes_first():
+    slow, fast = FakeProvider("slow"), FakeProvider("fast")
+    pool = ProviderPool([slow, fast], probe_share=0)
+    pool._health["slow"].record_success(900.0)
+    pool._health["fast"].record_success(50.0)
+
+    assert [provider.name for provider in pool.order()] == ["fast", "slow"]
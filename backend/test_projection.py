@@ -0,0 +1,72 @@
+"""Compression and field projection of session responses."""
+
+import gzip
+import json
+
+import pytest
+
+import app as app_module
+from conftest import GOOD_ANSWER
+from projection import drop_duplicated_text, parse_fields, session_payload
+
+
+@pytest.fixture
+def answered_session(client, interview_id):
+    client.post("/api/chat", json={"session_id": interview_id, "message": GOOD_ANSWER})
+    return app_module.get_session_store()[interview_id]
+
+
+def test_fields_select_nested_values(answered_session):
+    include = parse_fields("status, rounds.round_score, rounds.questions.score")
+
+    payload = session_payload(answered_session, include)
+
+    assert set(payload) == {"status", "rounds"}
+    assert payload["rounds"][1] == {"round_score": 0.0, "questions": [{"score": answered_session.rounds[1].questions[0].score}]}
+
+
+@pytest.mark.parametrize("fields", ["unknown", "rounds.unknown", "status.length"])
+def test_unknown_fields_are_rejected(fields):
+    with pytest.raises(ValueError):
+        parse_fields(fields)
+
+
+def test_dedupe_keeps_indices_of_texts_found_in_the_history(answered_session):
+    payload = drop_duplicated_text(answered_session.dict())
+    qa = payload["rounds"][1]["questions"][0]
+
+    assert "answer" not in qa and "ai_feedback" not in qa
+    history = payload["conversation_history"]
+    assert history[qa["answer_message_index"]]["content"] == GOOD_ANSWER
+    assert history[qa["feedback_message_index"]]["role"] == "assistant"
+
+
+def test_session_endpoint_projects_and_dedupes(client, answered_session):
+    response = client.get(f"/api/session/{answered_session.session_id}?fields=status,rounds.questions&dedupe=true")
+
+    assert response.status_code == 200
+    qa = response.get_json()["rounds"]["1"]["questions"][0]
+    assert "answer" not in qa
+    assert set(response.get_json()) == {"status", "rounds"}
+    assert client.get(f"/api/session/{answered_session.session_id}?fields=nope").status_code == 400
+
+
+def test_large_responses_are_gzipped_when_accepted(client, answered_session):
+    url = f"/api/session/{answered_session.session_id}"
+    client.application.config["COMPRESSION_MIN_BYTES"] = 100
+
+    compressed = client.get(url, headers={"Accept-Encoding": "gzip"})
+    plain = client.get(url)
+
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in compressed.headers["Vary"]
+    assert json.loads(gzip.decompress(compressed.data)) == plain.get_json()
+    assert "Content-Encoding" not in plain.headers
+
+
+def test_small_responses_are_sent_as_is(client, answered_session):
+    client.application.config["COMPRESSION_MIN_BYTES"] = 1 << 20
+
+    response = client.get(f"/api/session/{answered_session.session_id}", headers={"Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in response.headers
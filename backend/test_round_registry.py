@@ -0,0 +1,99 @@
+"""Round config loading, hot reloads and sessions pinned to their config version."""
+
+import json
+import os
+import shutil
+
+import pytest
+
+import app as app_module
+import round_registry
+from conftest import GOOD_ANSWER
+from models import InterviewSession, Message, RoundData
+from round_registry import RoundConfigError, RoundRegistry
+
+ROUNDS_DIR = os.path.join(os.path.dirname(__file__), "rounds")
+
+
+@pytest.fixture
+def config_path(tmp_path) -> str:
+    shutil.copytree(ROUNDS_DIR, tmp_path / "rounds")
+    return str(tmp_path / "rounds" / "rounds.json")
+
+
+def _edit(path: str, change):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    change(data)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def _screening_questions(count: int):
+    def change(data):
+        data["rounds"]["screening"]["questions_count"] = count
+    return change
+
+
+def test_invalid_configs_are_rejected(config_path):
+    _edit(config_path, lambda data: data["roles"].update({"Designer": "missing"}))
+
+    with pytest.raises(RoundConfigError, match="unknown pipeline"):
+        RoundRegistry(config_path, reload_interval=0)
+
+
+def test_invalid_reload_keeps_the_active_config(config_path):
+    registry = RoundRegistry(config_path, reload_interval=0)
+    version = registry.current().version
+
+    _edit(config_path, lambda data: data.update({"pipelines": {}}))
+
+    assert not registry.reload()
+    assert registry.current().version == version
+    assert registry.stats()["reload_errors"] == 1
+
+
+def test_pinned_version_outlives_a_reload_until_released(config_path):
+    registry = RoundRegistry(config_path, reload_interval=0)
+    original = registry.current()
+    registry.pin("s1", original)
+
+    _edit(config_path, _screening_questions(2))
+    assert registry.reload()
+
+    assert registry.current().version != original.version
+    assert registry.config(original.version) is original
+    assert registry.stats()["pinned_sessions"] == {original.version: 1}
+
+    registry.release("s1")
+    assert registry.config(original.version) is registry.current()
+    assert registry.stats()["pinned_sessions"] == {}
+
+
+def test_running_session_keeps_its_round_config(client, llm, config_path, monkeypatch):
+    registry = RoundRegistry(config_path, reload_interval=0)
+    monkeypatch.setattr(round_registry, "_default_registry", registry)
+    started = client.post("/api/start-interview", json={"job_role": "Software Engineer"}).get_json()
+    assert started["total_questions"] == 4
+
+    _edit(config_path, _screening_questions(2))
+    registry.reload()
+
+    session_id = started["session_id"]
+    assert client.post("/api/chat", json={"session_id": session_id, "message": GOOD_ANSWER}).get_json()["total_questions"] == 4
+    assert client.post("/api/start-interview", json={"job_role": "Software Engineer"}).get_json()["total_questions"] == 2
+
+
+def test_answer_without_an_open_question_leaves_the_history_alone(client):
+    total_questions = round_registry.default_registry().current().pipeline(None).round(1).questions_count
+    session = InterviewSession(
+        session_id="all-answered", job_role="Software Engineer", current_question=total_questions,
+        rounds={1: RoundData(round_number=1, round_name="Screening Round", status="in_progress")},
+        conversation_history=[Message(role="assistant", content="Welcome. First question?")]
+    )
+    app_module.get_session_store()[session.session_id] = session
+
+    response = client.post("/api/chat", json={"session_id": session.session_id, "message": GOOD_ANSWER})
+
+    assert response.status_code == 400
+    assert [message.role for message in session.conversation_history] == ["assistant"]
@@ -0,0 +1,88 @@
+"""Full-text search over interview transcripts."""
+
+import pytest
+
+from search_index import TranscriptSearchIndex, parse_query
+
+
+@pytest.fixture
+def index() -> TranscriptSearchIndex:
+    index = TranscriptSearchIndex()
+    sessions = {
+        "s1": ("Software Engineer", "completed", [
+            (1, "I deployed our services on Kubernetes and ran the on call rotation."),
+            (2, "Kubernetes autoscaling kept Kubernetes costs down during peaks.")
+        ]),
+        "s2": ("Software Engineer", "active", [
+            (1, "I wrote Java services and was on call for the payments team.")
+        ]),
+        "s3": ("Data Analyst", "completed", [
+            (1, "I built Kubernetes dashboards for the analytics cluster.")
+        ])
+    }
+    for session_id, (job_role, status, answers) in sessions.items():
+        index.update_session(session_id, job_role=job_role, status=status, candidate_name=None)
+        for message_index, (round_number, text) in enumerate(answers):
+            index.index_message(session_id, message_index, "answer", round_number, text)
+    index.flush()
+    return index
+
+
+def _ids(hits):
+    return [hit["session_id"] for hit in hits]
+
+
+def test_more_frequent_terms_rank_higher(index):
+    hits = index.search("kubernetes")
+
+    assert _ids(hits) == ["s1", "s3"]
+    assert hits[0]["score"] > hits[1]["score"]
+
+
+def test_rare_terms_weigh_more_than_common_ones(index):
+    # Both occur once in s2's answer; 'payments' is in no other message, 'services' in two
+    rare = index.search("payments")[0]
+    common = index.search("services", status="active")[0]
+
+    assert rare["session_id"] == common["session_id"] == "s2"
+    assert rare["score"] > common["score"]
+
+
+def test_phrases_match_consecutive_words_only(index):
+    assert _ids(index.search('"on call"')) == ["s1", "s2"]
+    assert index.search('"call on"') == []
+
+
+def test_negated_terms_exclude_sessions(index):
+    assert _ids(index.search("kubernetes -dashboards")) == ["s1"]
+    assert _ids(index.search('"on call" NOT java')) == ["s1"]
+
+
+def test_filters_restrict_hits(index):
+    assert _ids(index.search("kubernetes", job_role="Data Analyst")) == ["s3"]
+    assert _ids(index.search("kubernetes", status="completed")) == ["s1", "s3"]
+    assert _ids(index.search("autoscaling", round_number=1)) == []
+
+
+def test_snippets_mark_the_match(index):
+    snippet = index.search('"on call"', job_role="Software Engineer", status="active")[0]["snippets"][0]
+
+    assert "[on call]" in snippet["text"]
+    assert (snippet["round"], snippet["kind"], snippet["message_index"]) == (1, "answer", 0)
+
+
+def test_removed_sessions_are_no_longer_found(index):
+    index.remove_session("s1")
+    index.flush()
+
+    assert _ids(index.search("kubernetes")) == ["s3"]
+    assert index.stats()["sessions"] == 2
+
+
+def test_query_parsing():
+    groups = parse_query('"on call" java OR -python')
+
+    assert [[(clause.terms, clause.negated) for clause in group] for group in groups] == [
+        [(["on", "call"], False), (["java"], False)],
+        [(["python"], True)]
+    ]
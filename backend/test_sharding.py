@@ -0,0 +1,158 @@
+"""Shard ring routing, the router's request parsing and merged cross-shard reads."""
+
+import asyncio
+import json
+
+import pytest
+
+import app as app_module
+from router import RequestRejected, ShardRouter
+from search_index import TranscriptSearchIndex
+from sharding import (
+    HashRing, ShardConfigError, ShardMembership, merge_term_statistics, owned_session_id, session_id_from_request
+)
+
+NODES = ["http://127.0.0.1:5001", "http://127.0.0.1:5002", "http://127.0.0.1:5003"]
+
+
+@pytest.fixture
+def router(tmp_path) -> ShardRouter:
+    path = tmp_path / "shards.json"
+    path.write_text(json.dumps({"nodes": NODES}))
+    return ShardRouter(ShardMembership(str(path), reload_interval=0))
+
+
+def _read(router: ShardRouter, raw: bytes, eof: bool = True):
+    async def read():
+        reader = asyncio.StreamReader()
+        reader.feed_data(raw)
+        if eof:
+            reader.feed_eof()
+        return await router._read_request(reader)
+    return asyncio.run(read())
+
+
+def test_new_sessions_are_owned_by_the_worker_creating_them():
+    ring = HashRing(NODES)
+
+    for node in NODES:
+        assert ring.owner(owned_session_id(ring, node)) == node
+    with pytest.raises(ShardConfigError):
+        HashRing([])
+
+
+def test_adding_a_node_only_moves_sessions_to_it():
+    before = HashRing(NODES)
+    after = HashRing(NODES + ["http://127.0.0.1:5004"])
+    session_ids = [owned_session_id(before, node) for node in NODES for _ in range(50)]
+
+    moved = [session_id for session_id in session_ids if before.owner(session_id) != after.owner(session_id)]
+
+    assert 0 < len(moved) < len(session_ids) / 2
+    assert {after.owner(session_id) for session_id in moved} == {"http://127.0.0.1:5004"}
+
+
+def test_session_is_found_in_the_path_or_chat_body():
+    session_id = "0b8c6f43-5c1e-4f5e-9f43-6c9b1f1f2a10"
+
+    assert session_id_from_request("GET", f"/api/session/{session_id}/summary") == session_id
+    assert session_id_from_request("GET", f"/ws/interview/{session_id}?since=1") == session_id
+    assert session_id_from_request("POST", "/api/chat", json.dumps({"session_id": session_id}).encode()) == session_id
+    assert session_id_from_request("POST", "/api/chat", b"not json") is None
+    assert session_id_from_request("POST", "/api/start-interview", b'{"session_id": "x"}') is None
+
+
+def test_chunked_body_is_forwarded_with_a_length(router):
+    raw = (b"POST /api/chat HTTP/1.1\r\nHost: x\r\nTransfer-Encoding: chunked\r\n\r\n"
+           b"5\r\n{\"a\":\r\n3;ext=1\r\n 1}\r\n0\r\nTrailer: v\r\n\r\n")
+
+    method, target, headers, body = _read(router, raw)
+
+    assert (method, target, body) == ("POST", "/api/chat", b'{"a": 1}')
+    assert ("Content-Length", "8") in headers
+    assert not any(name.lower() == "transfer-encoding" for name, _ in headers)
+
+
+@pytest.mark.parametrize("raw, status", [
+    (b"POST /api/chat HTTP/1.1\r\nTransfer-Encoding: chunked\r\nContent-Length: 3\r\n\r\n0\r\n\r\n", "400"),
+    (b"POST /api/chat HTTP/1.1\r\nTransfer-Encoding: gzip\r\n\r\n", "501"),
+    (b"POST /api/chat HTTP/1.1\r\nContent-Length: 1e3\r\n\r\n", "400"),
+    (b"POST /api/chat HTTP/1.1\r\nContent-Length: 99999999999\r\n\r\n", "413"),
+    (b"POST /api/chat HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\nzz\r\n", "400"),
+    (b"garbage\r\n\r\n", "400"),
+])
+def test_malformed_requests_are_rejected(router, raw, status):
+    with pytest.raises(RequestRejected) as rejected:
+        _read(router, raw)
+
+    assert rejected.value.status.startswith(status)
+
+
+@pytest.mark.parametrize("raw", [
+    b"POST /api/chat HTTP/1.1\r\nContent-Length: 100\r\n\r\n{\"session",
+    b"POST /api/chat HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n10\r\nabc",
+    b"GET /api/health HTTP/1.1\r\nHost:",
+])
+def test_client_leaving_mid_request_is_not_an_error(router, raw):
+    assert _read(router, raw) is None
+
+
+def test_sharded_worker_needs_the_admin_token(monkeypatch):
+    monkeypatch.setenv("SHARD_NODE", NODES[0])
+    monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+    monkeypatch.setattr("dotenv.load_dotenv", lambda *args, **kwargs: False)
+
+    with pytest.raises(ShardConfigError, match="ADMIN_TOKEN"):
+        app_module.create_app()
+
+
+def _fill(index: TranscriptSearchIndex, session_id: str, texts):
+    index.update_session(session_id, job_role="Software Engineer", status="completed", candidate_name=None)
+    for message_index, text in enumerate(texts):
+        index.index_message(session_id, message_index, "answer", 1, text)
+
+
+def test_workers_score_with_the_merged_statistics():
+    busy, quiet = TranscriptSearchIndex(), TranscriptSearchIndex()
+    answer = "I tuned Kafka consumers for the billing pipeline."
+    _fill(busy, "a", [answer])
+    _fill(busy, "b", ["Kafka lag alerts paged me weekly."] + [f"I led project {i} on time." for i in range(20)])
+    _fill(quiet, "c", [answer])
+    busy.flush()
+    quiet.flush()
+
+    # Scored alone, the same answer is weighed differently on each worker
+    assert busy.search("kafka")[0]["score"] != quiet.search("kafka")[0]["score"]
+
+    statistics = merge_term_statistics([busy.term_statistics("kafka"), quiet.term_statistics("kafka")])
+    scores = {hit["session_id"]: hit["score"] for index in (busy, quiet)
+              for hit in index.search("kafka", statistics=statistics)}
+
+    assert statistics["documents"] == 23 and statistics["document_frequencies"] == {"kafka": 3}
+    assert scores["a"] == scores["c"]
+
+
+def test_search_fans_out_with_cluster_statistics(client, monkeypatch):
+    peer = TranscriptSearchIndex()
+    _fill(peer, "remote", ["Terraform modules for every environment."])
+    peer.flush()
+    local = app_module.get_transcript_index()
+    _fill(local, "local", ["Terraform state was stored remotely."] + [f"Filler answer {i}." for i in range(10)])
+    local.flush()
+
+    def shard_call(node, path, payload=None, method="POST"):
+        if path == "/api/internal/search/statistics":
+            return peer.term_statistics(payload["query"])
+        return {"results": peer.search(payload["query"], limit=payload["limit"], statistics=payload["statistics"])}
+
+    monkeypatch.setattr(app_module, "_peer_nodes", lambda: [NODES[1]])
+    monkeypatch.setattr(app_module, "_shard_call", shard_call)
+
+    body = client.get("/api/search?q=terraform").get_json()
+
+    assert {hit["session_id"] for hit in body["results"]} == {"local", "remote"}
+    assert body["unreachable_nodes"] == []
+    statistics = merge_term_statistics([local.term_statistics("terraform"), peer.term_statistics("terraform")])
+    remote = next(hit for hit in body["results"] if hit["session_id"] == "remote")
+    assert remote["score"] == peer.search("terraform", statistics=statistics)[0]["score"]
+    assert remote["score"] != peer.search("terraform")[0]["score"]
@@ -0,0 +1,101 @@
+"""The memory-mapped cache region and switching between its generations."""
+
+import threading
+
+import pytest
+
+from shared_cache import SharedCache, SharedCachePublisher, read_generation, write_region
+
+
+@pytest.fixture
+def path(tmp_path) -> str:
+    return str(tmp_path / "cache")
+
+
+def test_missing_region_is_a_miss(path):
+    cache = SharedCache(path, check_interval=0)
+
+    assert cache.get("prompt") is None
+    assert cache.stats()["generation"] is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_entries_are_sliced_from_the_mapping(path):
+    write_region(path, {"a": "Ünïcode prompt", "b": "second"}, {"version": "v1"})
+    cache = SharedCache(path, check_interval=0)
+
+    assert bytes(cache.view("a")) == "Ünïcode prompt".encode("utf-8")
+    assert cache.get("b") == "second"
+    assert cache.get("missing") is None
+    assert cache.stats()["meta"] == {"version": "v1"}
+
+
+def test_new_generation_replaces_the_decoded_strings(path):
+    write_region(path, {"a": "first"})
+    cache = SharedCache(path, check_interval=0)
+    assert cache.get("a") == "first"
+    assert cache.get("a") is cache.get("a")
+    old_view = cache.view("a")
+
+    assert write_region(path, {"a": "second"}) == 2
+
+    assert cache.get("a") == "second"
+    assert cache.stats()["generation"] == 2
+    assert cache.stats()["decoded_entries"] == 1
+    # Lookups that started on the old mapping still read it
+    assert bytes(old_view) == b"first"
+
+
+def test_lookup_on_a_replaced_generation_does_not_cache(path):
+    write_region(path, {"a": "first"})
+    cache = SharedCache(path, check_interval=0)
+    old_region = cache._current()
+    write_region(path, {"a": "second"})
+    assert cache.get("a") == "second"
+
+    assert cache._decoded_strings(old_region) is None
+    assert cache.get("a") == "second"
+
+
+def test_broken_generation_keeps_the_previous_one(path):
+    write_region(path, {"a": "first"})
+    cache = SharedCache(path, check_interval=0)
+    assert cache.get("a") == "first"
+
+    with open(path, "wb") as f:
+        f.write(b"garbage")
+
+    assert cache.get("a") == "first"
+    assert read_generation(path) == 0
+
+
+def test_concurrent_readers_see_one_string_per_generation(path):
+    write_region(path, {"a": "prompt"})
+    cache = SharedCache(path, check_interval=0)
+    cache.stats()  # maps the region
+    seen = []
+
+    def read():
+        for _ in range(200):
+            seen.append(cache.get("a"))
+
+    threads = [threading.Thread(target=read) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(value) for value in seen}) == 1
+
+
+def test_publisher_only_writes_when_sources_change(path):
+    meta = {"version": "v1"}
+    publisher = SharedCachePublisher(path, lambda: (dict(meta), {"a": meta["version"]}), interval=0)
+
+    assert publisher.publish_if_changed()
+    assert not publisher.publish_if_changed()
+    meta["version"] = "v2"
+    assert publisher.publish_if_changed()
+
+    assert SharedCache(path, check_interval=0).get("a") == "v2"
+    assert publisher.stats()["publishes"] == 2
@@ -0,0 +1,121 @@
+"""Near-duplicate answer detection with the MinHash LSH index."""
+
+import app as app_module
+from conftest import GOOD_ANSWER
+from similarity import MinHashLSHIndex
+
+ANSWER = (
+    "The service retries failed requests with exponential backoff and logs each attempt so "
+    "that the on call engineer can see what happened and we alert when the error budget burns"
+)
+EDITED = ANSWER.replace("burns", "burns too fast today")
+UNRELATED = (
+    "I led the migration of our billing reports from nightly batch jobs to a streaming pipeline "
+    "and worked with finance to reconcile every invoice during the cutover weekend"
+)
+
+
+def test_near_duplicate_from_another_session_is_flagged():
+    index = MinHashLSHIndex()
+    index.add("a1", ANSWER, owner="s1")
+
+    matches = index.query(EDITED)
+
+    assert [match["answer_id"] for match in matches] == ["a1"]
+    assert matches[0]["session_id"] == "s1"
+    assert matches[0]["similarity"] >= index.threshold
+    assert index.query(UNRELATED) == []
+
+
+def test_answers_of_the_same_owner_are_not_matched():
+    index = MinHashLSHIndex()
+
+    assert index.check_and_add("a1", ANSWER, owner="s1") == []
+    assert index.check_and_add("a2", EDITED, owner="s1") == []
+    assert [match["answer_id"] for match in index.check_and_add("a3", EDITED, owner="s2")] == ["a2", "a1"]
+
+
+def test_short_answers_are_not_indexed():
+    index = MinHashLSHIndex()
+
+    assert not index.add("a1", "Yes, I can.")
+    assert index.signature("Yes, I can.") is None
+    assert len(index) == 0
+
+
+def test_removed_answers_leave_no_buckets_behind():
+    index = MinHashLSHIndex()
+    index.add("a1", ANSWER, owner="s1")
+    index.add("a2", UNRELATED, owner="s2")
+
+    index.remove("a1")
+    index.remove("a1")
+
+    assert index.query(EDITED) == []
+    assert index.stats()["indexed_answers"] == 1
+    index.remove("a2")
+    assert index.stats()["buckets"] == 0
+
+
+def test_readding_an_answer_replaces_its_signature():
+    index = MinHashLSHIndex()
+    index.add("a1", ANSWER, owner="s1")
+    index.add("a1", UNRELATED, owner="s1")
+
+    assert index.query(EDITED) == []
+    assert [match["answer_id"] for match in index.query(UNRELATED)] == ["a1"]
+
+
+def test_signature_fills_every_bin():
+    index = MinHashLSHIndex()
+    signature = index.signature(ANSWER)
+
+    assert len(signature) == index.num_perm
+    assert signature == index.signature(ANSWER.upper())
+
+
+def test_hot_bucket_only_compares_its_most_recent_answers():
+    index = MinHashLSHIndex(max_bucket_candidates=4)
+    for number in range(50):
+        index.add(f"a{number}", ANSWER, owner=f"s{number}")
+
+    matches = index.query(ANSWER, limit=50)
+
+    assert {match["answer_id"] for match in matches} == {"a46", "a47", "a48", "a49"}
+
+
+class RecordingExecutor:
+    """Keeps submitted calls instead of running them."""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, *args):
+        self.submitted.append(args)
+
+
+def test_turn_does_not_wait_for_the_other_workers(client, interview_id, monkeypatch):
+    def unreachable(*args, **kwargs):
+        raise AssertionError("peer call on the request path")
+
+    executor = RecordingExecutor()
+    monkeypatch.setattr(app_module, "_peer_nodes", lambda: ["http://peer"])
+    monkeypatch.setattr(app_module, "_gather", unreachable)
+    monkeypatch.setattr(app_module, "get_duplicate_check_executor", lambda: executor)
+
+    response = client.post("/api/chat", json={"session_id": interview_id, "message": GOOD_ANSWER})
+
+    assert response.status_code == 200
+    assert executor.submitted == [(app_module._check_peer_duplicates, interview_id, 1, 1, GOOD_ANSWER)]
+
+
+def test_peer_matches_are_merged_after_the_turn(client, interview_id, monkeypatch):
+    client.post("/api/chat", json={"session_id": interview_id, "message": GOOD_ANSWER})
+    peer_match = {"answer_id": "other:1:1", "session_id": "other", "similarity": 0.9}
+    monkeypatch.setattr(app_module, "_gather", lambda path, payload: ({"http://peer": {"matches": [peer_match]}}, []))
+
+    app_module._check_peer_duplicates(interview_id, 1, 1, GOOD_ANSWER)
+
+    qa = app_module.get_session_store()[interview_id].rounds[1].questions[0]
+    assert qa.near_duplicate
+    assert qa.duplicate_matches == [peer_match]
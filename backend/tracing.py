@@ -0,0 +1,310 @@
+"""
+Lightweight span tracing for interview requests with local exporters.
+
+A root span is opened per request and child spans are opened around prompt
+building, provider calls, scoring and serialization. Finished traces are
+handed to a background thread that writes them as JSON lines or posts them
+to an OTLP/HTTP collector. Unsampled requests only pay for a context
+variable lookup per span.
+
+Configuration (environment variables):
+    TRACE_EXPORTER       none (default), jsonl or otlp
+    TRACE_FILE           JSON-lines output path (default: traces.jsonl)
+    TRACE_OTLP_ENDPOINT  Collector base URL (default: http://localhost:4318)
+    TRACE_SAMPLE_RATE    Fraction of requests to trace (default: 0.05)
+"""
+
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    sampled = True
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns",
+                 "attributes", "status", "_trace")
+
+    def __init__(self, name: str, trace: "Trace", parent_id: Optional[str], attributes: Dict):
+        self.name = name
+        self.trace_id = trace.trace_id
+        self.span_id = "%016x" % random.getrandbits(64)
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = dict(attributes)
+        self.status = "ok"
+        self._trace = trace
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes):
+        self.attributes.update(attributes)
+
+    def set_error(self, error: BaseException):
+        self.status = "error"
+        self.attributes["error.type"] = type(error).__name__
+        self.attributes["error.message"] = str(error)
+
+    def to_dict(self) -> Dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3) if self.end_ns else None,
+            "status": self.status,
+            "attributes": self.attributes
+        }
+
+
+class _NoopSpan:
+    """Stand-in for spans of unsampled requests."""
+
+    sampled = False
+    trace_id = None
+    span_id = None
+
+    def set_attribute(self, key: str, value):
+        pass
+
+    def set_attributes(self, **attributes):
+        pass
+
+    def set_error(self, error: BaseException):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    """Collects the finished spans of one request."""
+
+    def __init__(self, trace_id: Optional[str] = None):
+        self.trace_id = trace_id or "%032x" % random.getrandbits(128)
+        self.spans: List[Span] = []
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+# ----------------------------------------------------------------------
+# Exporters
+# ----------------------------------------------------------------------
+
+class JsonLinesExporter:
+    """Appends one JSON object per span to a local file."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, spans: List[Span]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            for span in spans:
+                f.write(json.dumps(span.to_dict(), default=str) + "\n")
+
+
+class OTLPHttpExporter:
+    """Posts spans in OTLP/JSON format to a collector's /v1/traces endpoint."""
+
+    def __init__(self, endpoint: str, service_name: str = "interview-backend", timeout: float = 5.0):
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.service_name = service_name
+        self.timeout = timeout
+
+    @staticmethod
+    def _attribute(key: str, value) -> Dict:
+        if isinstance(value, bool):
+            encoded = {"boolValue": value}
+        elif isinstance(value, int):
+            encoded = {"intValue": str(value)}
+        elif isinstance(value, float):
+            encoded = {"doubleValue": value}
+        else:
+            encoded = {"stringValue": str(value)}
+        return {"key": key, "value": encoded}
+
+    def _encode(self, spans: List[Span]) -> Dict:
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [self._attribute("service.name", self.service_name)]},
+                "scopeSpans": [{
+                    "scope": {"name": "interview-backend.tracing"},
+                    "spans": [
+                        {
+                            "traceId": span.trace_id,
+                            "spanId": span.span_id,
+                            "parentSpanId": span.parent_id or "",
+                            "name": span.name,
+                            "kind": 1,
+                            "startTimeUnixNano": str(span.start_ns),
+                            "endTimeUnixNano": str(span.end_ns),
+                            "attributes": [
+                                self._attribute(key, value) for key, value in span.attributes.items()
+                            ],
+                            "status": {"code": 2 if span.status == "error" else 1}
+                        }
+                        for span in spans
+                    ]
+                }]
+            }]
+        }
+
+    def export(self, spans: List[Span]):
+        import requests
+
+        requests.post(self.url, json=self._encode(spans), timeout=self.timeout)
+
+
+# ----------------------------------------------------------------------
+# Tracer
+# ----------------------------------------------------------------------
+
+class Tracer:
+    """Creates sampled span trees and exports finished traces off the request thread."""
+
+    def __init__(self, exporter=None, sample_rate: float = 0.05, max_pending: int = 1000):
+        """
+        Args:
+            exporter: Object with export(spans), or None to disable tracing
+            sample_rate: Fraction of root spans that are recorded
+            max_pending: Finished traces buffered for export before new ones are dropped
+        """
+        self.exporter = None
+        self.sample_rate = sample_rate
+        self.dropped = 0
+        self.exported = 0
+        self._queue: "queue.Queue[List[Span]]" = queue.Queue(maxsize=max_pending)
+        self._worker: Optional[threading.Thread] = None
+        self.configure(exporter, sample_rate)
+
+    def configure(self, exporter, sample_rate: float):
+        """Replace the exporter and sample rate, starting the export thread if needed."""
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        if exporter is not None and self._worker is None:
+            self._worker = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+            self._worker.start()
+
+    def configure_from_env(self):
+        """Configure the tracer from the TRACE_* environment variables."""
+        kind = os.getenv("TRACE_EXPORTER", "none").lower()
+        sample_rate = float(os.getenv("TRACE_SAMPLE_RATE", 0.05))
+
+        if kind == "jsonl":
+            exporter = JsonLinesExporter(os.getenv("TRACE_FILE", "traces.jsonl"))
+        elif kind == "otlp":
+            exporter = OTLPHttpExporter(os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318"))
+        else:
+            exporter = None
+
+        self.configure(exporter, sample_rate)
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def _should_sample(self, traceparent: Optional[str], force: bool) -> Tuple:
+        """Decide sampling, honouring an incoming W3C traceparent header."""
+        if traceparent:
+            parts = traceparent.split("-")
+            if len(parts) == 4 and len(parts[1]) == 32 and len(parts[2]) == 16:
+                return parts[3] == "01" or force, parts[1], parts[2]
+        return force or random.random() < self.sample_rate, None, None
+
+    def start_root(self, name: str, traceparent: Optional[str] = None, force: bool = False,
+                   **attributes):
+        """
+        Open the root span of a request.
+
+        Returns:
+            (span, token) - pass both to end_root when the request finishes
+        """
+        if not self.enabled:
+            return NOOP_SPAN, None
+
+        sampled, trace_id, parent_id = self._should_sample(traceparent, force)
+        if not sampled:
+            return NOOP_SPAN, None
+
+        span = Span(name, Trace(trace_id), parent_id, attributes)
+        return span, _current_span.set(span)
+
+    def end_root(self, span, token, error: Optional[BaseException] = None):
+        """Close a root span and queue its trace for export."""
+        if token is None:
+            return
+
+        _current_span.reset(token)
+        if error is not None:
+            span.set_error(error)
+        span.end_ns = time.time_ns()
+        trace = span._trace
+        trace.spans.append(span)
+
+        try:
+            self._queue.put_nowait(trace.spans)
+        except queue.Full:
+            self.dropped += 1
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator:
+        """Open a child span of the current span (no-op when the request is unsampled)."""
+        parent = _current_span.get()
+        if parent is None:
+            yield NOOP_SPAN
+            return
+
+        span = Span(name, parent._trace, parent.span_id, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_ns = time.time_ns()
+            parent._trace.spans.append(span)
+
+    def current_span(self):
+        """Get the active span, or a no-op span if none is recording."""
+        return _current_span.get() or NOOP_SPAN
+
+    def _run(self):
+        while True:
+            spans = self._queue.get()
+            try:
+                self.exporter.export(spans)
+                self.exported += 1
+            except Exception as e:
+                self.dropped += 1
+                logger.warning("Error exporting trace: %s", e)
+
+    def stats(self) -> Dict:
+        """Get sampling and export counters."""
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "exported_traces": self.exported,
+            "dropped_traces": self.dropped,
+            "pending_traces": self._queue.qsize()
+        }
+
+
+# Shared tracer; disabled until configure_from_env() runs at app startup
+tracer = Tracer()
@@ -0,0 +1,37 @@
+"""
+Live events emitted while a chat turn is processed.
+
+Provider tokens, question scores and round results are pushed to the
+listener installed for the current turn (the WebSocket transport). Turns
+handled over plain HTTP have no listener and emitting is a no-op.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, Optional
+
+EventListener = Callable[[Dict], None]
+
+_current_listener: ContextVar[Optional[EventListener]] = ContextVar("turn_event_listener", default=None)
+
+
+def has_listener() -> bool:
+    """Whether events emitted by the current turn are delivered anywhere."""
+    return _current_listener.get() is not None
+
+
+def emit(event_type: str, **fields):
+    """Deliver an event to the current turn's listener, if any."""
+    listener = _current_listener.get()
+    if listener is not None:
+        listener({"type": event_type, **fields})
+
+
+@contextmanager
+def event_scope(listener: EventListener) -> Iterator[None]:
+    """Deliver events emitted within the block to a listener."""
+    token = _current_listener.set(listener)
+    try:
+        yield
+    finally:
+        _current_listener.reset(token)
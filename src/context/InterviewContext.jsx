@@ -1,4 +1,4 @@
-import React, { createContext, useContext, useState, useCallback } from 'react';
+import React, { createContext, useContext, useState, useCallback, useEffect, useRef } from 'react';
 import { interviewAPI } from '../services/api';
 
 /**
@@ -47,6 +47,62 @@ export const InterviewProvider = ({ children }) => {
   const [roundFeedback, setRoundFeedback] = useState(null);
   const [finalEvaluation, setFinalEvaluation] = useState(null);
 
+  // Answer still waiting for a successful response, with its Idempotency-Key.
+  // Resending it reuses the key, so the backend processes the answer only once.
+  const pendingAnswer = useRef(null);
+
+  // WebSocket of the current session; answers fall back to fetch while it is not open
+  const connection = useRef(null);
+
+  useEffect(() => {
+    if (!sessionId) return undefined;
+
+    const handleEvent = (event) => {
+      if (event.type === 'token') {
+        // Show the AI reply as it streams in; replaced by the final message when the turn ends
+        setMessages(prev => {
+          const last = prev[prev.length - 1];
+          if (last?.streaming) {
+            return [...prev.slice(0, -1), { ...last, text: last.text + event.text }];
+          }
+          return [...prev, {
+            id: prev.length + 1,
+            sender: 'ai',
+            text: event.text,
+            timestamp: new Date(),
+            streaming: true
+          }];
+        });
+      }
+    };
+
+    // The greeting (history message 0) is already shown
+    const socket = interviewAPI.connectInterview(sessionId, handleEvent, 1);
+    connection.current = socket;
+    return () => {
+      socket.close();
+      if (connection.current === socket) {
+        connection.current = null;
+      }
+    };
+  }, [sessionId]);
+
+  /**
+   * Deliver an answer over the WebSocket, or over HTTP when the socket is unavailable
+   * @returns {Promise<Object>} - The /api/chat response body
+   */
+  const deliverAnswer = useCallback(async (text, idempotencyKey) => {
+    if (connection.current?.isOpen()) {
+      try {
+        return await connection.current.sendAnswer(text, idempotencyKey);
+      } catch (err) {
+        if (!err.socketClosed) throw err;
+        // Dropped mid-turn; the same key makes the HTTP resend safe
+      }
+    }
+    return interviewAPI.sendMessage(sessionId, text, idempotencyKey);
+  }, [sessionId]);
+
   /**
    * Start a new interview session
    * @param {string} role - Job role for the interview
@@ -94,6 +150,11 @@ export const InterviewProvider = ({ children }) => {
   const sendMessage = useCallback(async (messageText) => {
     if (!sessionId || !messageText.trim()) return;
 
+    const text = messageText.trim();
+    if (pendingAnswer.current?.sessionId !== sessionId || pendingAnswer.current?.text !== text) {
+      pendingAnswer.current = { sessionId, text, idempotencyKey: crypto.randomUUID() };
+    }
+
     try {
       setIsLoading(true);
       setError(null);
@@ -102,14 +163,15 @@ export const InterviewProvider = ({ children }) => {
       const userMessage = {
         id: messages.length + 1,
         sender: 'user',
-        text: messageText.trim(),
+        text: text,
         timestamp: new Date(),
         round: currentRound
       };
       setMessages(prev => [...prev, userMessage]);
 
       // Send to backend
-      const response = await interviewAPI.sendMessage(sessionId, messageText.trim());
+      const response = await deliverAnswer(text, pendingAnswer.current.idempotencyKey);
+      pendingAnswer.current = null;
       
       // Add AI response
       const aiMessage = {
@@ -119,7 +181,7 @@ export const InterviewProvider = ({ children }) => {
         timestamp: new Date(),
         round: response.current_round
       };
-      setMessages(prev => [...prev, aiMessage]);
+      setMessages(prev => [...prev.filter(message => !message.streaming), aiMessage]);
 
       // Update round state
       setCurrentRound(response.current_round);
@@ -156,13 +218,13 @@ export const InterviewProvider = ({ children }) => {
         round: currentRound,
         isError: true
       };
-      setMessages(prev => [...prev, errorMessage]);
+      setMessages(prev => [...prev.filter(message => !message.streaming), errorMessage]);
       
       throw err;
     } finally {
       setIsLoading(false);
     }
-  }, [sessionId, messages, currentRound]);
+  }, [sessionId, messages, currentRound, deliverAnswer]);
 
   /**
    * Reset the interview to start over
@@ -183,6 +245,7 @@ export const InterviewProvider = ({ children }) => {
     setRoundPassed(null);
     setRoundFeedback(null);
     setFinalEvaluation(null);
+    pendingAnswer.current = null;
   }, []);
 
   /**
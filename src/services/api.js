@@ -5,6 +5,40 @@
 
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:5000/api';
 
+// Requests that wait on the AI provider give up after this long; the backend
+// receives the same budget so it stops work nobody will read
+const LLM_REQUEST_TIMEOUT_MS = 60000;
+
+// WebSocket endpoint for streamed interview turns
+const WS_BASE_URL = API_BASE_URL.replace(/^http/, 'ws').replace(/\/api$/, '/ws');
+
+// Delay before reconnecting a dropped interview socket
+const WS_RECONNECT_DELAY_MS = 1000;
+
+/**
+ * Fetch with a deadline that is shared with the backend
+ * @param {string} url - Request URL
+ * @param {Object} options - fetch options
+ * @returns {Promise<Response>}
+ */
+async function fetchWithDeadline(url, options = {}) {
+  const controller = new AbortController();
+  const timeoutId = setTimeout(() => controller.abort(), LLM_REQUEST_TIMEOUT_MS);
+
+  try {
+    return await fetch(url, {
+      ...options,
+      signal: controller.signal,
+      headers: {
+        ...options.headers,
+        'X-Request-Timeout-Ms': String(LLM_REQUEST_TIMEOUT_MS),
+      },
+    });
+  } finally {
+    clearTimeout(timeoutId);
+  }
+}
+
 /**
  * Interview API Service
  * All methods for interacting with the interview backend
@@ -18,7 +52,7 @@ export const interviewAPI = {
    */
   async startInterview(jobRole, candidateName = null) {
     try {
-      const response = await fetch(`${API_BASE_URL}/start-interview`, {
+      const response = await fetchWithDeadline(`${API_BASE_URL}/start-interview`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -45,14 +79,16 @@ export const interviewAPI = {
    * Send a chat message during the interview
    * @param {string} sessionId - Current session ID
    * @param {string} message - User's message
+   * @param {string} idempotencyKey - One key per answer; pass the same key when resending it so it is only processed once
    * @returns {Promise<Object>} - AI response and session status
    */
-  async sendMessage(sessionId, message) {
+  async sendMessage(sessionId, message, idempotencyKey = crypto.randomUUID()) {
     try {
-      const response = await fetch(`${API_BASE_URL}/chat`, {
+      const response = await fetchWithDeadline(`${API_BASE_URL}/chat`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
+          'Idempotency-Key': idempotencyKey,
         },
         body: JSON.stringify({
           session_id: sessionId,
@@ -72,6 +108,96 @@ export const interviewAPI = {
     }
   },
 
+  /**
+   * Open a WebSocket for an interview session
+   * Streams tokens and round/score events as a turn is processed, and reconnects
+   * after a drop, resuming from the last message already received.
+   * @param {string} sessionId - Current session ID
+   * @param {Function} onEvent - Called with every server event ({ type, ... })
+   * @param {number} since - Index of the first history message to replay on connect
+   * @returns {Object} - { sendAnswer(message, idempotencyKey), isOpen(), close() }
+   */
+  connectInterview(sessionId, onEvent, since = 0) {
+    let socket = null;
+    let closed = false;
+    let messageIndex = since;
+    // Answer waiting for its turn or error event: { resolve, reject }
+    let pendingTurn = null;
+
+    const settle = (outcome, value) => {
+      const turn = pendingTurn;
+      pendingTurn = null;
+      if (turn) {
+        turn[outcome](value);
+      }
+    };
+
+    const connect = () => {
+      socket = new WebSocket(`${WS_BASE_URL}/interview/${sessionId}?since=${messageIndex}`);
+
+      socket.onmessage = (event) => {
+        const data = JSON.parse(event.data);
+        if (data.type === 'history') {
+          messageIndex = data.since + data.messages.length;
+        } else if (data.type === 'turn') {
+          messageIndex = data.message_index;
+          if (data.status >= 400) {
+            settle('reject', new Error(data.response.error || 'Failed to send message'));
+          } else {
+            settle('resolve', data.response);
+          }
+        } else if (data.type === 'error') {
+          settle('reject', new Error(data.error || 'Failed to send message'));
+        }
+        onEvent(data);
+      };
+
+      socket.onclose = () => {
+        // The turn may or may not have run; resending with the same key is safe
+        const error = new Error('Interview connection closed');
+        error.socketClosed = true;
+        settle('reject', error);
+        if (!closed) {
+          setTimeout(connect, WS_RECONNECT_DELAY_MS);
+        }
+      };
+    };
+
+    connect();
+
+    return {
+      /**
+       * Send an answer over the socket
+       * @returns {Promise<Object>} - The /api/chat response body of the turn; rejects with
+       *   error.socketClosed set if the connection dropped before the turn finished
+       */
+      sendAnswer(message, idempotencyKey = crypto.randomUUID()) {
+        return new Promise((resolve, reject) => {
+          if (socket.readyState !== WebSocket.OPEN) {
+            const error = new Error('Interview connection is not open');
+            error.socketClosed = true;
+            reject(error);
+            return;
+          }
+          pendingTurn = { resolve, reject };
+          socket.send(JSON.stringify({
+            type: 'answer',
+            message: message,
+            idempotency_key: idempotencyKey,
+            timeout_ms: LLM_REQUEST_TIMEOUT_MS
+          }));
+        });
+      },
+      isOpen() {
+        return socket.readyState === WebSocket.OPEN;
+      },
+      close() {
+        closed = true;
+        socket.close();
+      }
+    };
+  },
+
   /**
    * Get current session status
    * @param {string} sessionId - Session ID to query